@@ -44,19 +44,43 @@ import vis_module       as vis
 import reanalysis_data  as radata                                              
 import fluxnet_data     as flnt                                                             
 import cosmo_data       as csm_data                                            
+import time_window      as twin
+import resample_cache   as rcache
 import system_operation as stmo                                                
 
 
 # Start programm
 
 # Special function for FLUXNET and EURONET data corrections
-def get_ts(data_series, period, timestep, name, change_on):
+# (the columns of dataframe are resampled in one pass, the result is saved in
+# the cache of resampling with the key of station data)
+def get_ts(data_series, period, timestep, name, change_on, columns = None):
+    if columns is None:
+        columns = list(data_series.columns)
     try:
-        data = data_series[period].resample(timestep).mean() 
+        twin.get_rows(data_series.index, period)
+        key  = (name, tuple(columns), rcache.period_key(period), timestep, 'mean', None)
+        data = rcache.CACHE.memo(key, lambda: twin.aggregate(data_series[columns], period,
+                                                             [timestep])[timestep, 'all'].mean(),
+                                 data_series)
         return data
     except KeyError as error:
         print(f'No {name} for this time period')          
-        data = change_on    
+        data = pd.DataFrame({col: change_on for col in columns})
+        return data
+
+
+# Special function for daily datasets (HYRAS, E-OBS, GLEAM): the mean values
+# from the index with cumulative sums (twin.WindowIndex), all days of the
+# period have to be in data like for get_ts
+def get_daily(ix_data, period, timestep, name, change_on):
+    try:
+        twin.get_rows(ix_data.time, period)
+        data = ix_data.resample(timestep, 'mean', period.start, period.stop)
+        return data
+    except KeyError as error:
+        print(f'No {name} for this time period')          
+        data = pd.DataFrame({col: change_on for col in ix_data.columns})
         return data
 
 
@@ -149,6 +173,15 @@ sf_gleam      = mf_com +'REANALYSIS/GLEAM/'                                    #
 
 fn_cosmo      = '_ts_mean_1999_2015.csv'                                       # General part in file name for COSMO
                                                                                # and experiments
+n_workers     = 4                                                              # Number of workers for reading COSMO files
+lcube         = False                                                          # Use the memory mapped store for COSMO experiments
+lchunk        = False                                                          # Read COSMO data for each time period of the loop
+                                                                               # (only one period in memory, long COSMO runs)
+lcompact      = False                                                          # Store values as float32 (compact mode)
+cosmo_start   = None                                                           # Time window of COSMO data, only these months
+cosmo_stop    = None                                                           # are read from the COSMO files (None - all data)
+sf_cube       = mf_com + 'COSMO/' + sf_region + 'CUBE/'                        # The memory mapped store (CCLMref, v3.5, v4.5, v4.5e)
+exp_name      = ['CCLMref', 'CCLMv3.5', 'CCLMv4.5', 'CCLMv4.5e']               # Names of COSMO experiments
 
 #------------------------------------------------------------------------------ 
 # Names of parameters for COSMO data
@@ -289,19 +322,42 @@ while True:
 #------------------------------------------------------------------------------
 
 # The COSMO data has a hourly timestep
-df_cclm_ref  = csm_data.cosmo_data(sf_cclm_ref , fn_cosmo, clm_name)
-df_cclm_v35  = csm_data.cosmo_data(sf_cclm_v35 , fn_cosmo, clm_name)
-df_cclm_v45  = csm_data.cosmo_data(sf_cclm_v45 , fn_cosmo, clm_name)
-df_cclm_v45e = csm_data.cosmo_data(sf_cclm_v45e, fn_cosmo, clm_name)
+sf_exp = [sf_cclm_ref, sf_cclm_v35, sf_cclm_v45, sf_cclm_v45e]                 # Paths for COSMO experiments
+
+if lchunk == True:                                                             # COSMO data are read in the loop by periods
+    print('COSMO data are read for each time period')
+elif lcube == True:                                                            # COSMO data from the memory mapped store
+    store = csm_data.cosmo_store(sf_cube, [sf_cclm_ref, sf_cclm_v35, sf_cclm_v45, sf_cclm_v45e],
+                                 exp_name, fn_cosmo, clm_name, workers = n_workers,
+                                 compact = lcompact, start = cosmo_start, stop = cosmo_stop)
+    df_cclm_ref  = store.frame('CCLMref'  )
+    df_cclm_v35  = store.frame('CCLMv3.5' )
+    df_cclm_v45  = store.frame('CCLMv4.5' )
+    df_cclm_v45e = store.frame('CCLMv4.5e')
+else:
+    df_cclm_ref  = csm_data.cosmo_data(sf_cclm_ref , fn_cosmo, clm_name, workers = n_workers,
+                                       compact = lcompact, start = cosmo_start, stop = cosmo_stop)
+    df_cclm_v35  = csm_data.cosmo_data(sf_cclm_v35 , fn_cosmo, clm_name, workers = n_workers,
+                                       compact = lcompact, start = cosmo_start, stop = cosmo_stop)
+    df_cclm_v45  = csm_data.cosmo_data(sf_cclm_v45 , fn_cosmo, clm_name, workers = n_workers,
+                                       compact = lcompact, start = cosmo_start, stop = cosmo_stop)
+    df_cclm_v45e = csm_data.cosmo_data(sf_cclm_v45e, fn_cosmo, clm_name, workers = n_workers,
+                                       compact = lcompact, start = cosmo_start, stop = cosmo_stop)
 
 # The FLUXNET and EURONET has a hourly timestep
-df_fluxnet, station_name_plot = flnt.fluxnet_data(sf_fluxnet, input_station)   # get FLUXNET data
-df_euronet                    = flnt.euronet_data(sf_euronet, input_station)   # get EORONET data      
+df_fluxnet, station_name_plot = flnt.fluxnet_data(sf_fluxnet, input_station, lcompact) # get FLUXNET data
+df_euronet                    = flnt.euronet_data(sf_euronet, input_station, lcompact) # get EORONET data      
        
 # The GLEAM, E-OBS and HYRAS datasets has a daily timestep
-df_eobs          = radata.eobs_data(sf_eobs, fn_region)                        # get E-OBS data
-df_hyras         = radata.hyras_data(sf_hyras, fn_region)                      # get HYRAS data
-df_v35a, df_v35b = radata.gleam_data(sf_gleam, fn_region)                      # get GLEAM data
+df_eobs          = radata.eobs_data(sf_eobs, fn_region, lcompact)              # get E-OBS data
+df_hyras         = radata.hyras_data(sf_hyras, fn_region, lcompact)            # get HYRAS data
+df_v35a, df_v35b = radata.gleam_data(sf_gleam, fn_region, lcompact)            # get GLEAM data
+
+# Indices with cumulative sums of daily datasets (mean values for any period)
+ix_eobs  = twin.WindowIndex(df_eobs )
+ix_hyras = twin.WindowIndex(df_hyras)
+ix_v35a  = twin.WindowIndex(df_v35a )
+ix_v35b  = twin.WindowIndex(df_v35b )
 
 #------------------------------------------------------------------------------
 # Get time periods
@@ -330,22 +386,36 @@ for  index in range(len(time_start)):
     #--------------------------------------------------------------------------
     # Create time periods 
     #-------------------------------------------------------------------------- 
-    hourly_period = pd.date_range(time_start[index], time_stop[index], freq = 'H')  # hourly timesteps
-    daily_period  = pd.date_range(time_start[index], time_stop[index], freq = 'D')  # dayly timesteps 
-    
-    # General time period for COSMO, FLUXNET and EURONET data
-    res_period   = [x for x in hourly_period if x.hour >= t_start and x.hour <= t_stop]
+    # General time period for COSMO, FLUXNET and EURONET data (hourly timesteps
+    # from t_start to t_stop)
+    res_period = twin.Period(time_start[index], time_stop[index], 'H', 
+                             range(t_start, t_stop + 1))
 
     
     #--------------------------------------------------------------------------
     # Subsection: Create data for plots
     #--------------------------------------------------------------------------
 
-    # COSMO data --> daily mean
-    cclm_ref  = csm_data.get_timeseries(df_cclm_ref , clm_name, res_period, 'D')   # CCLMref  --> original COSMO     
-    cclm_v35  = csm_data.get_timeseries(df_cclm_v35 , clm_name, res_period, 'D')   # CCLMv35  --> experiment    
-    cclm_v45  = csm_data.get_timeseries(df_cclm_v45 , clm_name, res_period, 'D')   # CCLMv45  --> experiment           
-    cclm_v45e = csm_data.get_timeseries(df_cclm_v45e, clm_name, res_period, 'D')   # CCLMv45e --> previous version parc_v45  
+    # COSMO data --> daily mean (all experiments at once)
+    if lchunk == True:
+        frames   = [csm_data.cosmo_data(sf_path, fn_cosmo, clm_name, cache = False,
+                                        workers = n_workers, compact = lcompact,
+                                        start = res_period)
+                    for sf_path in sf_exp]                                     # only COSMO data of the period (no cache)
+        cclm_exp = csm_data.get_timeseries_exp(frames, exp_name, clm_name, res_period, 'D',
+                                               dataset = 'COSMO')
+        del frames
+    elif lcube == True:
+        cclm_exp = csm_data.get_timeseries_exp(store, exp_name, clm_name, res_period, 'D',
+                                               dataset = 'COSMO')
+    else:
+        cclm_exp = csm_data.get_timeseries_exp([df_cclm_ref, df_cclm_v35, df_cclm_v45, df_cclm_v45e],
+                                               exp_name, clm_name, res_period, 'D',
+                                               dataset = 'COSMO')
+    cclm_ref  = cclm_exp['CCLMref'  ]                                          # CCLMref  --> original COSMO     
+    cclm_v35  = cclm_exp['CCLMv3.5' ]                                          # CCLMv35  --> experiment    
+    cclm_v45  = cclm_exp['CCLMv4.5' ]                                          # CCLMv45  --> experiment           
+    cclm_v45e = cclm_exp['CCLMv4.5e']                                          # CCLMv45e --> previous version parc_v45  
     
     # Get COSMO values for 
     cclm_mean      = cclm_ref.resample(ts).mean()
@@ -354,34 +424,40 @@ for  index in range(len(time_start)):
     cclm_v45e_mean = cclm_v45e.resample(ts).mean()
     
     
-    s_zero = pd.Series(-1, index = res_period)
+    s_zero = pd.Series(-1, index = res_period.to_index())
     #FLUXNET data    
-    t2m_flux = get_ts(df_fluxnet['T2m'], res_period, ts, 'T2m FLUXNET', s_zero)  
-    le_flux  = get_ts(df_fluxnet['LE'] , res_period, ts, 'LE FLUXNET' , s_zero) 
-    ts_flux  = get_ts(df_fluxnet['Ts'] , res_period, ts, 'Ts FLUXNET' , s_zero) 
-    pa_flux  = get_ts(df_fluxnet['Pa'] , res_period, ts, 'Pa FLUXNET' , s_zero) 
+    flux     = get_ts(df_fluxnet, res_period, ts, 'FLUXNET', s_zero,
+                      ['T2m', 'LE', 'Ts', 'Pa'])
+    t2m_flux = flux['T2m']
+    le_flux  = flux['LE' ]
+    ts_flux  = flux['Ts' ]
+    pa_flux  = flux['Pa' ]
 
     #EURONET data
-    t2m_euro = get_ts(df_euronet['TA'] , res_period, ts, 'TA EURONET' , s_zero)
-    le_euro  = get_ts(df_euronet['LE'] , res_period, ts, 'LE EURONET' , s_zero)
-    t_s_euro = get_ts(df_euronet['TS'] , res_period, ts, 'TS EURONET' , s_zero)    
-    rh_euro  = get_ts(df_euronet['RH'] , res_period, ts, 'RH EURONET' , s_zero)
-    h_euro   = get_ts(df_euronet['H']  , res_period, ts, 'H EURONET'  , s_zero)
+    euro     = get_ts(df_euronet, res_period, ts, 'EURONET', s_zero,
+                      ['TA', 'LE', 'TS', 'RH', 'H'])
+    t2m_euro = euro['TA']
+    le_euro  = euro['LE']
+    t_s_euro = euro['TS']    
+    rh_euro  = euro['RH']
+    h_euro   = euro['H' ]
     #pa_euro  = df_euronet['PA'][res_period].resample(ts).mean() * 10.0
       
     # HYRAS data
-    t2m_hyras = df_hyras['T_2M'][daily_period].resample(ts).mean()        
+    t2m_hyras = get_daily(ix_hyras, res_period.days(), ts, 'HYRAS', s_zero)['T_2M']
 
     #E-OBS data
-    t2m_eobs  = df_eobs['T_2M'][daily_period].resample(ts).mean()       
+    t2m_eobs  = get_daily(ix_eobs, res_period.days(), ts, 'E-OBS', s_zero)['T_2M']
                    
     #GLEAM data v3.5a        
-    ep_v35a = df_v35a['Ep'][daily_period].resample(ts).mean()                  
-    et_v35a = df_v35a['Et'][daily_period].resample(ts).mean()                  
+    gleam_a = get_daily(ix_v35a, res_period.days(), ts, 'GLEAM v3.5a', s_zero)
+    ep_v35a = gleam_a['Ep']                  
+    et_v35a = gleam_a['Et']                  
    
     #GLEAM data v3.5b 
-    ep_v35b = df_v35b['Ep'][daily_period].resample(ts).mean()
-    et_v35b = df_v35b['Et'][daily_period].resample(ts).mean()                  
+    gleam_b = get_daily(ix_v35b, res_period.days(), ts, 'GLEAM v3.5b', s_zero)
+    ep_v35b = gleam_b['Ep']
+    et_v35b = gleam_b['Et']                  
       
     #--------------------------------------------------------------------------
     # Subsection: Data vizualization - Plots for all parameters   
@@ -502,4 +578,6 @@ for  index in range(len(time_start)):
 
         plt.close(fig)        
         plt.gcf().clear()  
-       
\ No newline at end of file
+       
+# Information about the cache of resampling (hits, misses, evictions)
+print('Resample cache: ', rcache.CACHE.info())
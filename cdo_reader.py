@@ -0,0 +1,506 @@
+# -*- coding: utf-8 -*-
+"""
+The cdo_reader is the program for reading time series files which were
+created by 'cdo outputts' (COSMO, HYRAS, E-OBS, GLEAM and DAV data).
+
+Each line of the file has the fixed layout:
+    YYYY-MM-DD hh:mm:ss value
+
+The file is splitted on the fields with NumPy, the dates and the values are
+converted to arrays and the time index is calculated from the integer year,
+month, day, hour and minute values without any datetime inference.
+
+For reading of the time window the sidecar index with byte offsets of each
+month is created next to the file (.<file name>.idx.json). The index is
+created once and updated automatically if the file was changed, only the
+months which overlap the time window are read from the file.
+
+The progam contains several subroutines:
+    get_tokens     ---> The subroutine needs for splitting of the text buffer
+                        on the date, time and value fields
+    get_values     ---> The subroutine needs for converting of the value 
+                        fields to float numbers
+    parse_outputts ---> The subroutine needs for parsing of the text buffer
+                        with 'cdo outputts' data
+    build_index    ---> The subroutine needs for getting byte offsets of
+                        months in the text buffer
+    get_index      ---> The subroutine needs for getting the sidecar index
+                        of the file (the index is created or updated)
+    read_window    ---> The subroutine needs for reading of the months which
+                        overlap the time window
+    get_segments   ---> The subroutine needs for getting byte offsets of the
+                        months which overlap the time window
+    read_outputts  ---> The subroutine needs for reading of the file with
+                        'cdo outputts' data
+    read_blocks    ---> The subroutine needs for reading of the file by blocks
+    stream_outputts---> The subroutine needs for reading of the file with
+                        the resampling on the fly (sums and numbers of values)
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Center for Enviromental System
+                                                   Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+# Import standart liblaries
+import os
+import json
+import numpy as np
+import pandas as pd
+
+# Import personal libraries
+import time_window as twin
+
+
+# The missing values in COSMO data
+NA_VALUES = ['9990', '********', '***', '******']
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_tokens
+#------------------------------------------------------------------------------
+# The subroutine needs for splitting of the text buffer on the date, time and
+# value fields. If all lines have the same length (the usual case for cdo
+# outputts) the buffer is reshaped to the matrix and the fields are the
+# columns of the matrix, otherwise the buffer is splitted by the positions
+# of blank symbols.
+#
+# Input parameters : raw - the text buffer as uint8 array
+#
+# Output parameters: dates  - matrix with symbols of dates  (YYYY-MM-DD)
+#                    times  - matrix with symbols of times  (hh:mm:ss)
+#                    values - matrix with symbols of values (blank padded)
+#------------------------------------------------------------------------------
+def get_tokens(raw):
+    # Option 1: lines with fixed length
+    newline = np.flatnonzero(raw == 10)
+    length  = newline[0] + 1 if newline.size > 0 else 0
+    if length > 0 and newline.size * length == raw.size:
+        lines  = raw.reshape(-1, length)
+        c0     = int(np.argmax(lines[0] != 32))
+        c1     = c0 + 11
+        if (c1 + 8 < length and np.all(newline == np.arange(1, newline.size + 1) * length - 1)
+                            and np.all(lines[:, c0 + 4] == 45) and np.all(lines[:, c0 + 7] == 45)
+                            and np.all(lines[:, c1 + 2] == 58) and np.all(lines[:, c1 + 8] == 32)):
+            dates  = lines[:, c0:c0 + 10]
+            times  = lines[:, c1:c1 + 8]
+            values = np.ascontiguousarray(lines[:, c1 + 8:length - 1])
+            return dates, times, values
+
+    # Option 2: lines with different length
+    blank = (raw == 32) | (raw == 10) | (raw == 13) | (raw == 9)
+    prev  = np.concatenate(([True], blank[:-1]))
+    post  = np.concatenate((blank[1:], [True]))
+    start = np.flatnonzero(~blank & prev)
+    end   = np.flatnonzero(~blank & post) + 1
+
+    # Check the layout of the file: three tokens in each line
+    lines = np.searchsorted(newline, start)
+    if start.size % 3 != 0 or np.any(lines[0::3] != lines[2::3]):
+        raise ValueError('The file is not in the format of cdo outputts')
+    start = start.reshape(-1, 3)
+    end   = end.reshape(-1, 3)
+
+    dates  = raw[start[:, 0, None] + np.arange(10)]
+    times  = raw[start[:, 1, None] + np.arange( 8)]
+    width  = int((end[:, 2] - start[:, 2]).max())
+    pos    = start[:, 2, None] + np.arange(width)
+    values = raw[np.minimum(pos, raw.size - 1)]
+    values[pos >= end[:, 2, None]] = 32
+    return dates, times, values
+# end def get_tokens
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_values
+#------------------------------------------------------------------------------
+# The subroutine needs for converting of the value fields to float numbers.
+# The numeric missing values (9990) are compared with numbers, the other
+# missing values (********) are compared with the symbols of fields.
+#
+# Input parameters : field     - matrix with symbols of values (blank padded)
+#                    na_values - list with values which are missing values
+#
+# Output parameters: values - array with values
+#------------------------------------------------------------------------------
+def get_values(field, na_values):
+    width  = field.shape[1]
+    filled = (field != 32) & (field != 13) & (field != 0)
+    first  = np.argmax(filled, axis = 1)
+    size   = width - first - np.argmax(filled[:, ::-1], axis = 1)
+    
+    # Missing values: empty fields and symbolic missing values
+    missing  = ~filled.any(axis = 1)
+    na_float = []
+    for na in na_values:
+        try:
+            na_float.append(float(na))
+            continue
+        except ValueError:
+            pass
+        na   = np.frombuffer(str(na).encode(), dtype = np.uint8)
+        rows = np.flatnonzero((size == na.size) & ~missing)
+        if rows.size > 0 and first[rows].max() + na.size <= width:
+            same = field[rows[:, None], first[rows, None] + np.arange(na.size)] == na
+            missing[rows[same.all(axis = 1)]] = True
+
+    values = np.full(field.shape[0], np.nan)
+    values[~missing] = field[~missing].view(f'S{width}').ravel().astype(np.float64)
+    if len(na_float) > 0:
+        values[np.isin(values, na_float)] = np.nan
+    return values
+# end def get_values
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: parse_outputts
+#------------------------------------------------------------------------------
+# The subroutine needs for parsing of the text buffer with 'cdo outputts' data
+#
+# Input parameters : buffer    - bytes with the lines of the file
+#                    name      - name of the timeseries
+#                    na_values - list with values which are missing values
+#                    unique    - delete duplicated timesteps (the first
+#                                value is used)
+#                    dtype     - type of values (float64 or float32)
+#
+# Output parameters: ts - the timeseries with data
+#------------------------------------------------------------------------------
+def parse_outputts(buffer, name = None, na_values = NA_VALUES, unique = True,
+                   dtype = np.float64):
+    raw = np.frombuffer(buffer, dtype = np.uint8)
+    if raw.size == 0:
+        index = pd.DatetimeIndex([], dtype = 'datetime64[ns]', name = 'Date')
+        return pd.Series([], index = index, name = name, dtype = dtype)
+
+    dates, times, field = get_tokens(raw)
+
+    # Get digits of the dates and times (YYYY-MM-DD and hh:mm:ss)
+    dates = dates.astype(np.int64) - 48
+    times = times.astype(np.int64) - 48
+
+    year   = dates[:, 0] * 1000 + dates[:, 1] * 100 + dates[:, 2] * 10 + dates[:, 3]
+    month  = dates[:, 5] * 10 + dates[:, 6]
+    day    = dates[:, 8] * 10 + dates[:, 9]
+    hour   = times[:, 0] * 10 + times[:, 1]
+    minute = times[:, 3] * 10 + times[:, 4]
+
+    # Get time index: months --> days --> nanoseconds
+    months = ((year - 1970) * 12 + month - 1).astype('datetime64[M]')
+    days   = months.astype('datetime64[D]').astype(np.int64) + day - 1
+    stamps = (days * 24 + hour) * 3600 + minute * 60
+    index  = pd.DatetimeIndex((stamps * 10**9).view('datetime64[ns]'),
+                              name = 'Date')
+
+    # Get values
+    values = get_values(field, na_values).astype(dtype, copy = False)
+
+    ts = pd.Series(values, index = index, name = name)
+    if unique == True:
+        ts = ts[~index.duplicated()]
+    return ts
+# end def parse_outputts
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: build_index
+#------------------------------------------------------------------------------
+# The subroutine needs for getting byte offsets of months in the text buffer.
+# The lines of one month in a row are the one segment of the file, the
+# segments are saved in the order of the file.
+#
+# Input parameters : raw - the text buffer as uint8 array
+#
+# Output parameters: months - number of month for each segment (year*12+month-1)
+#                    starts - the first byte of each segment
+#                    stops  - the last byte of each segment (not included)
+#------------------------------------------------------------------------------
+def build_index(raw):
+    empty = np.array([], dtype = np.int64)
+    if raw.size == 0:
+        return empty, empty, empty
+
+    # The first symbol of the date in each line
+    newline = np.flatnonzero(raw == 10)
+    lines   = np.concatenate(([0], newline + 1))
+    lines   = lines[lines < raw.size]
+    filled  = np.flatnonzero((raw != 32) & (raw != 10) & (raw != 13) & (raw != 9))
+    pos     = np.searchsorted(filled, lines)
+    valid   = pos < filled.size
+    lines   = lines[valid]
+    first   = filled[pos[valid]]
+    valid   = first + 7 <= raw.size
+    valid[:-1] &= first[:-1] < lines[1:]                                       # skip empty lines
+    lines   = lines[valid]
+    first   = first[valid]
+    if lines.size == 0:
+        return empty, empty, empty
+
+    # Get number of month (YYYY-MM)
+    digits = raw[first[:, None] + np.array([0, 1, 2, 3, 5, 6])].astype(np.int64) - 48
+    year   = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + digits[:, 3]
+    month  = digits[:, 4] * 10 + digits[:, 5]
+    number = year * 12 + month - 1
+
+    # Get segments with the same month
+    change = np.concatenate(([0], np.flatnonzero(number[1:] != number[:-1]) + 1))
+    months = number[change]
+    starts = lines[change]
+    starts[0] = 0
+    stops  = np.concatenate((starts[1:], [raw.size]))
+    return months, starts, stops
+# end def build_index
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_index
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the sidecar index of the file. The index
+# is created if it is missing or if the size or mtime of the file was changed.
+#
+# Input parameters : path - path for data
+#
+# Output parameters: months - number of month for each segment
+#                    starts - the first byte of each segment
+#                    stops  - the last byte of each segment (not included)
+#------------------------------------------------------------------------------
+def get_index(path):
+    folder, name = os.path.split(path)
+    path_index   = os.path.join(folder, f'.{name}.idx.json')
+    info         = os.stat(path)
+    signature    = [info.st_size, info.st_mtime_ns]
+
+    # Check the sidecar index
+    if os.path.isfile(path_index):
+        try:
+            with open(path_index, 'r') as stream:
+                index = json.load(stream)
+            if index['signature'] == signature:
+                return (np.array(index['months'], dtype = np.int64),
+                        np.array(index['starts'], dtype = np.int64),
+                        np.array(index['stops' ], dtype = np.int64))
+        except (OSError, ValueError, KeyError) as error:
+            print('Index was not read: ', error)
+
+    # Create the sidecar index
+    with open(path, 'rb') as stream:
+        raw = np.frombuffer(stream.read(), dtype = np.uint8)
+    months, starts, stops = build_index(raw)
+    index = {'signature': signature,
+             'months'   : months.tolist(),
+             'starts'   : starts.tolist(),
+             'stops'    : stops.tolist()}
+    try:
+        with open(f'{path_index}.tmp', 'w') as stream:
+            json.dump(index, stream)
+        os.replace(f'{path_index}.tmp', path_index)
+    except OSError as error:
+        print('Index was not written: ', error)
+    return months, starts, stops
+# end def get_index
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: read_window
+#------------------------------------------------------------------------------
+# The subroutine needs for reading of the months which overlap the time window.
+# The neighbouring segments are read as one block.
+#
+# Input parameters : path  - path for data
+#                    start - the first date of the window (None - no limit)
+#                    stop  - the last date of the window  (None - no limit)
+#
+# Output parameters: buffer - bytes with the lines of the months
+#------------------------------------------------------------------------------
+def read_window(path, start = None, stop = None):
+    blocks = []
+    with open(path, 'rb') as stream:
+        for i1, i2 in zip(*get_segments(path, start, stop)):
+            stream.seek(int(i1))
+            block = stream.read(int(i2 - i1))
+            if len(block) > 0 and block[-1:] != b'\n':
+                block = block + b'\n'
+            blocks.append(block)
+    buffer = b''.join(blocks)
+    return buffer
+# end def read_window
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_segments
+#------------------------------------------------------------------------------
+# The subroutine needs for getting byte offsets of the months which overlap
+# the time window (the neighbouring segments are joined)
+#
+# Input parameters : path  - path for data
+#                    start - the first date of the window (None - no limit)
+#                    stop  - the last date of the window  (None - no limit)
+#
+# Output parameters: starts - the first byte of each block
+#                    stops  - the last byte of each block (not included)
+#------------------------------------------------------------------------------
+def get_segments(path, start = None, stop = None):
+    if start is None and stop is None:
+        return np.array([0]), np.array([os.path.getsize(path)])
+    months, starts, stops = get_index(path)
+
+    select = np.ones(months.size, dtype = bool)
+    if start is not None:
+        start   = pd.Timestamp(start)
+        select &= months >= start.year * 12 + start.month - 1
+    if stop is not None:
+        stop    = pd.Timestamp(stop)
+        select &= months <= stop.year * 12 + stop.month - 1
+    starts = starts[select]
+    stops  = stops[select]
+
+    # Join the neighbouring segments
+    if starts.size > 0:
+        join   = np.concatenate(([True], starts[1:] != stops[:-1]))
+        starts = starts[join]
+        stops  = stops[np.concatenate((join[1:], [True]))]
+    return starts, stops
+# end def get_segments
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: read_outputts
+#------------------------------------------------------------------------------
+# The subroutine needs for reading of the file with 'cdo outputts' data. If
+# the time window is set only the months of the window are read and the
+# timeseries is cut to the window. If the offset is set only the end of the
+# file (new lines after the offset) is read.
+#
+# Input parameters : path      - path for data
+#                    name      - name of the timeseries
+#                    na_values - list with values which are missing values
+#                    unique    - delete duplicated timesteps
+#                    dtype     - type of values (float64 or float32)
+#                    start     - the first date of the window (optional)
+#                    stop      - the last date of the window  (optional)
+#                    offset    - the first byte for reading (start of line)
+#
+# Output parameters: ts - the timeseries with data
+#------------------------------------------------------------------------------
+def read_outputts(path, name = None, na_values = NA_VALUES, unique = True,
+                  dtype = np.float64, start = None, stop = None, offset = 0):
+    if offset > 0 or (start is None and stop is None):
+        with open(path, 'rb') as stream:
+            stream.seek(offset)
+            buffer = stream.read()
+        ts = parse_outputts(buffer, name, na_values, unique, dtype)
+        if start is None and stop is None:
+            return ts
+    else:
+        buffer = read_window(path, start, stop)
+        ts     = parse_outputts(buffer, name, na_values, unique, dtype)
+
+    window = np.ones(len(ts), dtype = bool)
+    if start is not None:
+        window &= ts.index >= pd.Timestamp(start)
+    if stop is not None:
+        window &= ts.index <= pd.Timestamp(stop)
+    ts = ts[window]
+    return ts
+# end def read_outputts
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: read_blocks
+#------------------------------------------------------------------------------
+# The subroutine needs for reading of the file by blocks. Each block contains
+# only full lines (the end of the last line is moved to the next block).
+#
+# Input parameters : path  - path for data
+#                    start - the first date of the window (None - no limit)
+#                    stop  - the last date of the window  (None - no limit)
+#                    chunk - size of block in bytes
+#
+# Output parameters: block - bytes with the lines of the file (generator)
+#------------------------------------------------------------------------------
+def read_blocks(path, start = None, stop = None, chunk = 2**24):
+    with open(path, 'rb') as stream:
+        for i1, i2 in zip(*get_segments(path, start, stop)):
+            stream.seek(int(i1))
+            rest = b''
+            size = int(i2 - i1)
+            while size > 0:
+                block = stream.read(min(chunk, size))
+                if len(block) == 0:
+                    break
+                size -= len(block)
+                block = rest + block
+                end   = block.rfind(b'\n') + 1
+                rest  = block[end:]
+                if end > 0:
+                    yield block[:end]
+            if len(rest) > 0:
+                yield rest + b'\n'
+# end def read_blocks
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: stream_outputts
+#------------------------------------------------------------------------------
+# The subroutine needs for reading of the file with 'cdo outputts' data with
+# the resampling on the fly. The file is read by blocks and each block is
+# added to the sums and the numbers of values for the steps, so the hourly
+# timeseries is not created. The lines of the file have to be in time order
+# (like in 'cdo outputts'), the duplicated timesteps are deleted (the first
+# value is used).
+#
+# Input parameters : path      - path for data
+#                    freq      - step for resampling ('D', '5D', '1M' ...)
+#                    name      - name of the timeseries
+#                    na_values - list with values which are missing values
+#                    table     - table of transformation (the limits of
+#                                values), optional
+#                    start     - the first date of the window (optional)
+#                    stop      - the last date of the window  (optional)
+#                    chunk     - size of block in bytes
+#
+# Output parameters: agg - sums and numbers of values (twin.Aggregate)
+#------------------------------------------------------------------------------
+def stream_outputts(path, freq = 'D', name = None, na_values = NA_VALUES,
+                    table = None, start = None, stop = None, chunk = 2**24):
+    acc  = twin.StepAccumulator(freq, table, name)
+    last = None
+    for block in read_blocks(path, start, stop, chunk):
+        ts = parse_outputts(block, name, na_values, unique = True)
+
+        # The time window and the duplicated timesteps of previous blocks
+        window = np.ones(len(ts), dtype = bool)
+        if start is not None:
+            window &= ts.index >= pd.Timestamp(start)
+        if stop is not None:
+            window &= ts.index <= pd.Timestamp(stop)
+        if last is not None:
+            window &= ts.index > last
+        ts = ts[window]
+        if len(ts) > 0:
+            last = ts.index.max()
+            acc.add(ts)
+    agg = acc.result('Date')
+    return agg
+# end def stream_outputts
+#------------------------------------------------------------------------------
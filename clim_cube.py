@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""
+The clim_cube is the program for calculation of climatic mean values (annual
+cycle, daily values of month, diurnal cycle) based on the aggregate cube.
+
+The cube is calculated in one pass over the hourly data and has the shape
+(year x month x day x hour x parameter). Each cell of the cube contains the
+sum and the number of values, moreover the number of timesteps in each hour
+is saved (the hour is a part of the analysed periods). The climatic values
+are the reductions of the cube:
+    monthly ---> mean values by month (annual cycle)
+    daily   ---> mean values by days of month (for example, June)
+    diurnal ---> mean values by hours (diurnal cycle)
+
+The reductions reproduce the scheme of the previous subroutines: the data
+are resampled to the step (hour, day or month) and after that the mean
+values are calculated. The type of resampling ('mean' or 'sum'), the limits
+of hourly values, the scale and the offset are set by the table of
+transformation (see cosmo_data.get_transform).
+
+The progam contains several subroutines:
+    get_level  ---> The subroutine needs for getting the level of the cube
+                    (hour, day or month) for the step of resampling
+    nan_mean   ---> The subroutine needs for getting mean values without
+                    missing values
+    get_keys   ---> The subroutine needs for getting years and months of
+                    the time periods
+    get_bins   ---> The subroutine needs for getting positions of timesteps
+                    in the cube
+    build_cube ---> The subroutine needs for calculation of the cube
+    merge_cubes --> The subroutine needs for joining of the cubes which were
+                    calculated for the blocks of data (blocks of years)
+    ClimCube   ---> The class with the cube and the reductions:
+                        select  - selection of years and months
+                        exist   - months, days or hours of the periods
+                        values  - values resampled to the level of the cube
+                        monthly - mean values by month
+                        daily   - mean values by days of month
+                        diurnal - mean values by hours
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Center for Enviromental System
+                                                   Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+# Import standart liblaries
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+# Import personal libraries
+import time_window as twin
+
+
+# Size of the cube axes: months, days, hours
+NM, ND, NH = 12, 31, 24
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_level
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the level of the cube for the step of
+# resampling
+#
+# Input parameters : ts - step for resampling ('1H', '1D', '1M' ...)
+#
+# Output parameters: level - the level of the cube ('H', 'D' or 'M')
+#------------------------------------------------------------------------------
+def get_level(ts):
+    offset = to_offset(ts)
+    if offset.n == 1 and offset.name in ('H', 'h'):
+        return 'H'
+    if offset.n == 1 and offset.name == 'D':
+        return 'D'
+    if offset.n == 1 and offset.name in ('M', 'MS', 'ME'):
+        return 'M'
+    raise ValueError(f'The step {ts} is not supported by the cube (1H, 1D or 1M)')
+# end def get_level
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: nan_mean
+#------------------------------------------------------------------------------
+# The subroutine needs for getting mean values without missing values (the
+# result is NaN if all values are missing)
+#
+# Input parameters : data - array with values
+#                    axis - axes for calculation
+#
+# Output parameters: mean - array with mean values
+#------------------------------------------------------------------------------
+def nan_mean(data, axis):
+    valid = ~np.isnan(data)
+    total = np.where(valid, data, 0.0).sum(axis = axis)
+    count = valid.sum(axis = axis)
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        mean = np.where(count > 0, total / count, np.nan)
+    return mean
+# end def nan_mean
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_keys
+#------------------------------------------------------------------------------
+# The subroutine needs for getting years and months of the time periods (the
+# selection of the cube which was calculated for the longer period)
+#
+# Input parameters : periods - list with time periods (lists of timesteps or
+#                              twin.Period)
+#
+# Output parameters: years  - years of the periods
+#                    months - months of the periods
+#------------------------------------------------------------------------------
+def get_keys(periods):
+    time   = pd.DatetimeIndex(np.concatenate([twin.get_index(p).values
+                                              for p in periods]))
+    years  = np.unique(time.year)
+    months = np.unique(time.month)
+    return years, months
+# end def get_keys
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_bins
+#------------------------------------------------------------------------------
+# The subroutine needs for getting positions of timesteps in the cube. The
+# timesteps are selected by the periods (if periods are set).
+#
+# Input parameters : index   - time index of data
+#                    periods - list with time periods (lists of timesteps or
+#                              twin.Period), optional
+#
+# Output parameters: rows  - positions of the selected timesteps in data
+#                    bins  - positions of the selected timesteps in the cube
+#                    years - years of the cube
+#------------------------------------------------------------------------------
+def get_bins(index, periods = None):
+    index = pd.DatetimeIndex(index)
+    if periods is None:
+        rows = np.arange(len(index))
+    elif all(isinstance(p, twin.Period) for p in periods):
+        rows   = np.unique(np.concatenate([p.rows(index) for p in periods]))
+    else:
+        period = pd.DatetimeIndex(np.concatenate([twin.get_index(p).values
+                                                  for p in periods]))
+        rows   = np.flatnonzero(index.isin(period))
+    time  = index[rows]
+    if len(time) == 0:
+        return rows, rows, np.array([], dtype = np.int64)
+
+    years = np.arange(time.year.min(), time.year.max() + 1)
+    bins  = ((((time.year.values - years[0]) * NM + time.month.values - 1) * ND +
+                time.day.values - 1) * NH + time.hour.values).astype(np.int64)
+    return rows, bins, years
+# end def get_bins
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: build_cube
+#------------------------------------------------------------------------------
+# The subroutine needs for calculation of the cube in one pass over the data.
+# The same bins can be used for the several datasets with the same time index
+# (COSMO experiments).
+#
+# Input parameters : data     - dataframe or timeseries with data
+#                    clm_name - names of parameters (None - all columns)
+#                    periods  - list with time periods (None - all data)
+#                    table    - table of transformation (None - mean values)
+#                    bins     - the result of get_bins (optional)
+#
+# Output parameters: cube - the object of ClimCube
+#------------------------------------------------------------------------------
+def build_cube(data, clm_name = None, periods = None, table = None, bins = None):
+    if isinstance(data, pd.Series):
+        data = data.to_frame(0 if data.name is None else data.name)
+    clm_name = list(data.columns) if clm_name is None else list(clm_name)
+    if table is None:
+        table = pd.DataFrame({'how'   : 'mean', 'scale': 1.0 , 'offset': 0.0,
+                              'lower' : -np.inf, 'upper': np.inf},
+                             index = clm_name)
+
+    rows, bins, years = get_bins(data.index, periods) if bins is None else bins
+    size   = len(years) * NM * ND * NH
+    shape  = (len(years), NM, ND, NH)
+    hours  = np.bincount(bins, minlength = size).reshape(shape)
+    sums   = np.zeros(shape + (len(clm_name),))
+    counts = np.zeros(shape + (len(clm_name),), dtype = np.int64)
+    for j, param in enumerate(clm_name):
+        values = np.asarray(data[param].values, dtype = np.float64)[rows]
+        values = np.clip(values, table.loc[param, 'lower'], table.loc[param, 'upper'])
+        valid  = ~np.isnan(values)
+        sums[..., j]   = np.bincount(bins[valid], weights = values[valid],
+                                     minlength = size).reshape(shape)
+        counts[..., j] = np.bincount(bins[valid], minlength = size).reshape(shape)
+
+    cube = ClimCube(sums, counts, hours, years, clm_name, table)
+    return cube
+# end def build_cube
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: merge_cubes
+#------------------------------------------------------------------------------
+# The subroutine needs for joining of the cubes which were calculated for the
+# blocks of data (for example, one cube for each year). The sums, the numbers
+# of values and the numbers of timesteps of the same years are added.
+#
+# Input parameters : cubes - list with the cubes (the same parameters)
+#
+# Output parameters: cube - the object of ClimCube for all years
+#------------------------------------------------------------------------------
+def merge_cubes(cubes):
+    first  = cubes[0]
+    years  = np.unique(np.concatenate([c.years for c in cubes])).astype(np.int64)
+    shape  = (len(years), NM, ND, NH)
+    hours  = np.zeros(shape, dtype = first.hours.dtype)
+    sums   = np.zeros(shape + (len(first.parameters),))
+    counts = np.zeros(shape + (len(first.parameters),), dtype = np.int64)
+    for c in cubes:
+        if len(c.years) == 0:
+            continue
+        pos = np.searchsorted(years, c.years)
+        np.add.at(hours , pos, c.hours )
+        np.add.at(sums  , pos, c.sums  )
+        np.add.at(counts, pos, c.counts)
+
+    cube = ClimCube(sums, counts, hours, years, first.parameters, first.table)
+    return cube
+# end def merge_cubes
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Class: ClimCube
+#------------------------------------------------------------------------------
+# The class with the aggregate cube (year x month x day x hour x parameter)
+#
+# Input parameters : sums       - sums of values
+#                    counts     - number of values
+#                    hours      - number of timesteps in each hour
+#                    years      - years of the cube
+#                    parameters - names of parameters
+#                    table      - table of transformation
+#------------------------------------------------------------------------------
+class ClimCube(object):
+
+    def __init__(self, sums, counts, hours, years, parameters, table):
+        self.sums       = sums
+        self.counts     = counts
+        self.hours      = hours
+        self.years      = years
+        self.parameters = list(parameters)
+        self.table      = table.loc[self.parameters]
+
+    # Selection of years and months (the first two axes of array)
+    def select(self, data, years = None, months = None):
+        if years is not None:
+            data = data[np.isin(self.years, years)]
+        if months is not None:
+            data = data[:, np.isin(np.arange(1, NM + 1), months)]
+        return data
+
+    # Months, days or hours which are a part of the periods
+    def exist(self, axis, years = None, months = None):
+        hours = self.select(self.hours, years, months)
+        axes  = tuple(i for i in range(4) if i != axis)
+        return hours.sum(axis = axes) > 0
+
+    # Values resampled to the level of the cube ('H', 'D' or 'M'), the values
+    # are NaN for the hours (days, months) out of the periods
+    def values(self, level, years = None, months = None):
+        axes    = {'H': (), 'D': (3,), 'M': (2, 3)}[level]
+        sums    = self.sums.sum(axis = axes) if axes else self.sums
+        counts  = self.counts.sum(axis = axes) if axes else self.counts
+        present = (self.hours.sum(axis = axes) if axes else self.hours) > 0
+
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            mean = sums / counts
+        mean[counts == 0] = np.nan
+        total = (self.table['how'] == 'sum').values
+        data  = np.where(total, sums, mean)
+        data[~present] = np.nan
+        data = self.select(data, years, months)
+        return data
+
+    # Scale and offset of the parameters
+    def transform(self, data):
+        return data * self.table['scale'].values + self.table['offset'].values
+
+    # Mean values by month (annual cycle)
+    def monthly(self, ts = '1D', years = None):
+        data  = self.values(get_level(ts), years)
+        data  = data.reshape(data.shape[0], NM, -1, len(self.parameters))
+        mean  = nan_mean(data, axis = (0, 2))
+        exist = self.exist(1, years)
+        names = pd.date_range('1/1/2019', '12/1/2019', freq = 'MS').strftime('%B')
+        df    = pd.DataFrame(self.transform(mean[exist]), index = names[exist],
+                             columns = self.parameters)
+        return df
+
+    # Mean values by days of month (the mean values for each year and after
+    # that the mean values for all years)
+    def daily(self, ts = '1D', years = None, months = None):
+        level = get_level(ts)
+        if level == 'M':
+            raise ValueError(f'The step {ts} is not supported for daily values')
+        nh    = NH if level == 'H' else 1
+        data  = self.values(level, years, months)
+        data  = data.reshape(data.shape[0], -1, ND, nh, len(self.parameters))
+        mean  = nan_mean(data, axis = (1, 3))
+        mean  = nan_mean(mean, axis = 0)
+        exist = self.exist(2, years, months)
+        index = pd.Index(np.arange(1, ND + 1)[exist], name = 'index')
+        df    = pd.DataFrame(self.transform(mean[exist]), index = index,
+                             columns = self.parameters)
+        return df
+
+    # Mean values by hours (the mean values for each year and after that the
+    # mean values for all years)
+    def diurnal(self, years = None, months = None):
+        data  = self.values('H', years, months)
+        data  = data.reshape(data.shape[0], -1, NH, len(self.parameters))
+        mean  = nan_mean(data, axis = 1)
+        mean  = nan_mean(mean, axis = 0)
+        exist = self.exist(3, years, months)
+        index = pd.Index(np.arange(NH)[exist], name = 'index')
+        df    = pd.DataFrame(self.transform(mean[exist]), index = index,
+                             columns = self.parameters)
+        return df
+# end class ClimCube
+#------------------------------------------------------------------------------
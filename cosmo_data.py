@@ -5,13 +5,39 @@ The cosmo_data is the program for work with COSMO data.
 The progam contains several additional subroutines:
     get_data          ---> The subroutine needs for getting actual COSMO data
     cosmo_data        ---> The subroutine needs for getting actual COSMO data 
+                           (with binary cache of the assembled dataframe
+                           and parallel reading of COSMO files)
+    cosmo_tail        ---> The subroutine needs for adding of new COSMO data
+                           (extended COSMO runs) to the cached dataframe
+    cosmo_stream      ---> The subroutine needs for getting COSMO data with
+                           the resampling on the fly
+    LazyCosmoFrame    ---> The class with COSMO data which are read on demand
+    cosmo_store       ---> The subroutine needs for getting COSMO experiments
+                           from the memory mapped store
+    get_transform     ---> The subroutine needs for getting the table with
+                           transformation of COSMO parameters
     get_timeseries    ---> The subroutine needs for getting actual timeseries 
                            from COSMO dataframes 
+    get_timeseries_exp---> The subroutine needs for getting actual timeseries
+                           for several COSMO experiments at once
+    cosmo_aggregate   ---> The subroutine needs for getting COSMO data for
+                           several steps and hours of day in one pass
+    cosmo_cubes       ---> The subroutine needs for getting climatic cubes for
+                           COSMO experiments
+    cosmo_cubes_blocks --> The subroutine needs for getting climatic cubes
+                           for COSMO experiments by blocks of years
     cosmo_montly_data ---> Get mean values by month (climatic mean - annual cycles) 
     cosmo_daily_data  ---> Get mean daily values by days for each June
     cosmo_hourly_data ---> Get mean hourly data (duirnal cycle)
+    stat_cosmo_exp    ---> The subroutine needs for getting actual statistical
+                           parameters acording to COSMO data (for several
+                           COSMO experiments at once)
+    stat_cosmo_add    ---> The subroutines need for getting statistical
+    stat_cosmo_frame       parameters of COSMO experiments by blocks of data
     stat_cosmo        ---> The subroutine needs for getting actual statistical
                            parameters acording to COSMO data 
+    data4month        ---> The subroutine needs for getting COSMO data for
+                           several time periods in one dataframe
   
 Autors of project: Evgenii Churiulin, Merja Tölle, Center for Enviromental System
                                                    Research (CESR) 
@@ -32,13 +58,21 @@ Version    Date       Name
 """
 
 # Import standart liblaries
-import gc
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
 import numpy as np
 import pandas as pd
 
-# Improt methods for statistical analysis
-from sklearn.metrics import mean_absolute_error
-from sklearn.metrics import mean_squared_error
+# Import personal libraries
+import data_cache as dcache
+import cdo_reader as cdo
+import cube_store as cube
+import data_types as dtp
+import clim_cube as clim
+import time_window as twin
+import time_axis as tax
+import year_chunks as ychunk
+import resample_cache as rcache
 
 
 #------------------------------------------------------------------------------
@@ -48,107 +82,588 @@ from sklearn.metrics import mean_squared_error
 # 
 # Input parameters : data_path         - path for COSMO data
 #                    parameter_name    - name of parameter   
+#                    compact           - use the compact mode (float32)
+#                    start, stop       - the time window (only the months of
+#                                        the window are read from the file)
+#                    offset            - the first byte for reading (only new
+#                                        lines of the file are read)
 #
 # Output parameters: ts - the timeseries with data
 #------------------------------------------------------------------------------
 
-def get_data(data_path, parameter_name):
-    
-    df = pd.read_csv(data_path, skiprows = 0, sep=' ', parse_dates = {'Date':[0,1]},
-                     header = None, index_col = 0, skipinitialspace = True, 
-                     na_values = ['9990','********','***','******'])
-    df.columns = [parameter_name]
-    ts = df[parameter_name]
-    #print(parameter_name)
-    #ts = ts[ts.index.duplicated()]
-    ts = ts[~ts.index.duplicated()]
+def get_data(data_path, parameter_name, compact = False, start = None, stop = None,
+             offset = 0):
+    # Read data in the format of 'cdo outputts', the duplicated timesteps
+    # are deleted
+    dtype = dtp.COMPACT_DTYPE if compact == True else dtp.ACCUM_DTYPE
+    ts = cdo.read_outputts(data_path, parameter_name, na_values = cdo.NA_VALUES,
+                           unique = True, dtype = dtype, start = start, stop = stop,
+                           offset = offset)
     return ts
-    gc.collect() 
 # end def get data
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
 # Subroutine: cosmo_data
 #------------------------------------------------------------------------------
-# The subroutine needs for getting actual COSMO data
+# The subroutine needs for getting actual COSMO data. The assembled dataframe
+# is saved to the binary cache next to the COSMO files and is used in the next
+# runs. The cache is updated automatically if any COSMO file was changed. If
+# the COSMO files were only extended (new lines at the end) only the new lines
+# are read and added to the cached dataframe.
 # 
 # Input parameters : sf_path   - path for COSMO data  
 #                    fn_prefix - name of COSMO run (original or experiment)
 #                    clm_name  - names of COSMO parameters   
+#                    cache     - use the binary cache (True or False)
+#                    workers   - number of workers for parallel reading of
+#                                COSMO files (1 - serial reading)
+#                    pool      - type of workers ('thread' or 'process')
+#                    lazy      - return the lazy frame, COSMO files are read
+#                                only on the first access to the parameter
+#                    compact   - use the compact mode, values are stored as
+#                                float32 (the binary cache is separate)
+#                    start     - the first date of the time window or the
+#                                time period (twin.Period), optional
+#                    stop      - the last date of the time window (optional),
+#                                only the months of the window are read
+#                    freq      - step for resampling on the fly (optional),
+#                                the hourly data are not kept in memory and
+#                                the result is twin.Aggregate (see cosmo_stream)
 #
 # Output parameters: df_cosmo - the data frame with information about COSMO data
+#                               (on the common hourly axis, see time_axis)
 #------------------------------------------------------------------------------
-def cosmo_data(sf_path, fn_prefix, clm_name):
-    # list with COSMO data --> timeseries
-    cosmo_data = []
+def cosmo_data(sf_path, fn_prefix, clm_name, cache = True, workers = 1,
+               pool = 'thread', lazy = False, compact = False, start = None,
+               stop = None, freq = None):
+    # paths for COSMO data and time window
+    paths = [f'{sf_path}{param}{fn_prefix}' for param in clm_name]
+    start, stop = twin.get_limits(start, stop)
+
+    # COSMO data are resampled on the fly
+    if freq is not None:
+        return cosmo_stream(paths, clm_name, freq, workers, start, stop)
+
+    # Check the binary cache
+    if cache == True:
+        dataset    = 'cosmo_f32' if compact == True else 'cosmo'
+        window     = None if start is None and stop is None else [start, stop]
+        path_cache = dcache.cache_path(sf_path, dataset, fn_prefix, clm_name, window)
+        key_cache  = dcache.cache_key(paths, clm_name)
+        df_cosmo, meta = dcache.load_frame(path_cache, key_cache)
+        if df_cosmo is not None:
+            return tax.to_axis(df_cosmo, 'H')                                  # common time axis of datasets
+
+    # COSMO data will be read on demand
+    if lazy == True:
+        return LazyCosmoFrame(paths, clm_name, compact, start, stop)
+
+    # COSMO files were extended --> read only new lines
+    if cache == True and meta is not None:
+        df_cosmo = cosmo_tail(path_cache, meta, paths, clm_name, compact, start, stop)
+        if df_cosmo is not None:
+            meta = {'files': [dcache.file_state(path) for path in paths]}
+            dcache.save_frame(path_cache, df_cosmo, key_cache, meta)
+            return tax.to_axis(df_cosmo, 'H')
 
-    for param in clm_name:
-        filename = f'{param}{fn_prefix}'
-        path     = f'{sf_path}{filename}'
-        cosmo_data.append(get_data(path, param))                               # use COSMO function --> get_data
+    # list with COSMO data --> timeseries
+    reader = partial(get_data, compact = compact, start = start, stop = stop)
+    if workers > 1:
+        if pool == 'process':
+            executor = ProcessPoolExecutor(max_workers = workers)
+        else:
+            executor = ThreadPoolExecutor(max_workers = workers)
+        with executor:
+            cosmo_data = list(executor.map(reader, paths, clm_name))           # use COSMO function --> get_data
+    else:
+        cosmo_data = []
+        for param, path in zip(clm_name, paths):
+            cosmo_data.append(reader(path, param))                             # use COSMO function --> get_data
     df_cosmo = pd.concat(cosmo_data, axis = 1)
+    df_cosmo = tax.to_axis(df_cosmo, 'H')                                      # common time axis of datasets
+
+    if cache == True:
+        meta = {'files': [dcache.file_state(path) for path in paths]}
+        dcache.save_frame(path_cache, df_cosmo, key_cache, meta)
     return df_cosmo  
 # end def cosmo_data
 #------------------------------------------------------------------------------
 
 
+#------------------------------------------------------------------------------
+# Subroutine: cosmo_tail
+#------------------------------------------------------------------------------
+# The subroutine needs for adding of new COSMO data to the cached dataframe.
+# The COSMO files are checked with the old size and the checksum of the old
+# content, if the old content of any file was changed the COSMO files have to
+# be read again.
+# 
+# Input parameters : path_cache - path for the binary cache
+#                    meta       - information from the cache (old states of
+#                                 COSMO files)
+#                    paths      - paths for COSMO data
+#                    clm_name   - names of COSMO parameters
+#                    compact    - use the compact mode (float32)
+#                    start      - the first date of the time window (optional)
+#                    stop       - the last date of the time window  (optional)
+#
+# Output parameters: df_cosmo - the data frame with COSMO data or None
+#------------------------------------------------------------------------------
+def cosmo_tail(path_cache, meta, paths, clm_name, compact = False, start = None,
+               stop = None):
+    states = meta.get('files') if isinstance(meta, dict) else None
+    if states is None or len(states) != len(paths):
+        return None
+    for path, state in zip(paths, states):
+        if not dcache.append_only(path, state):
+            return None
+
+    df_old, meta = dcache.load_frame(path_cache)
+    if df_old is None or list(df_old.columns) != list(clm_name):
+        return None
+
+    cosmo_data = []
+    for param, path, state in zip(clm_name, paths, states):
+        tail = get_data(path, param, compact, start, stop, offset = state[0])  # use COSMO function --> get_data
+        ts   = pd.concat([df_old[param], tail])
+        ts   = ts[~ts.index.duplicated()]
+        cosmo_data.append(ts)
+    df_cosmo = pd.concat(cosmo_data, axis = 1)
+    return df_cosmo
+# end def cosmo_tail
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: cosmo_stream
+#------------------------------------------------------------------------------
+# The subroutine needs for getting COSMO data with the resampling on the fly.
+# The COSMO files are read by blocks and the blocks are added to the sums and
+# the numbers of values for the steps (cdo.stream_outputts), so the memory
+# depends on the step and not on the length of COSMO runs. The limits of
+# hourly values (TRANSFORM) are applied before summation, the values are
+# result.values() and they are the same as get_timeseries(..., freq) for all
+# data. The binary cache is not used.
+# 
+# Input parameters : paths    - paths for COSMO data
+#                    clm_name - names of COSMO parameters
+#                    freq     - step for resampling ('D', '5D', '1M' ...)
+#                    workers  - number of workers for reading COSMO files
+#                    start    - the first date of the time window (optional)
+#                    stop     - the last date of the time window  (optional)
+#
+# Output parameters: result - sums and numbers of values (twin.Aggregate)
+#------------------------------------------------------------------------------
+def cosmo_stream(paths, clm_name, freq, workers = 1, start = None, stop = None):
+    clm_name = list(clm_name)
+    table    = get_transform(clm_name)
+
+    def reader(path, param):
+        return cdo.stream_outputts(path, freq, param, cdo.NA_VALUES, table.loc[[param]],
+                                   start, stop)
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers = workers) as executor:
+            cosmo_data = list(executor.map(reader, paths, clm_name))
+    else:
+        cosmo_data = [reader(path, param) for path, param in zip(paths, clm_name)]
+
+    # Join parameters (the steps without data are empty)
+    sums   = pd.concat([agg.sum    for agg in cosmo_data], axis = 1).fillna(0.0)
+    counts = pd.concat([agg.count  for agg in cosmo_data], axis = 1).fillna(0)
+    result = twin.Aggregate(sums, counts.astype(np.int64), table)
+    return result
+# end def cosmo_stream
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Class: LazyCosmoFrame
+#------------------------------------------------------------------------------
+# The class with COSMO data which are read on demand. The COSMO file is read
+# only on the first access to the parameter (df[param]) and the timeseries
+# is kept for the next access. The class has the same access pattern as
+# dataframe, so it can be used in get_timeseries and other subroutines.
+#
+# Input parameters : paths    - paths for COSMO data
+#                    clm_name - names of COSMO parameters
+#                    compact  - use the compact mode (float32)
+#                    start    - the first date of the time window (optional)
+#                    stop     - the last date of the time window  (optional)
+#------------------------------------------------------------------------------
+class LazyCosmoFrame(object):
+
+    def __init__(self, paths, clm_name, compact = False, start = None, stop = None):
+        self.paths   = dict(zip(clm_name, paths))
+        self.columns = pd.Index(clm_name)
+        self.reader  = partial(get_data, compact = compact, start = start, stop = stop)
+        self.data    = {}
+
+    def __getitem__(self, param):
+        # Several parameters --> dataframe
+        if isinstance(param, (list, tuple, pd.Index)):
+            return pd.concat([self[name] for name in param], axis = 1)
+        if param not in self.data:
+            if param not in self.paths:
+                raise KeyError(param)
+            self.data[param] = self.reader(self.paths[param], param)           # use COSMO function --> get_data
+        return self.data[param]
+
+    def __contains__(self, param):
+        return param in self.paths
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def __len__(self):
+        return len(self.index)
+
+    def keys(self):
+        return self.columns
+
+    # Time index of the first parameter
+    @property
+    def index(self):
+        return self[self.columns[0]].index
+
+    # Names of the parameters which were read
+    @property
+    def loaded(self):
+        return list(self.data.keys())
+
+    # Read all parameters and get dataframe
+    def to_frame(self):
+        return self[list(self.columns)]
+# end class LazyCosmoFrame
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: cosmo_store
+#------------------------------------------------------------------------------
+# The subroutine needs for getting COSMO experiments from the memory mapped
+# store (experiment x parameter x hour). The store is created from COSMO data
+# if it is missing or if any COSMO file was changed.
+# 
+# Input parameters : sf_store  - path for the store
+#                    sf_paths  - paths for COSMO experiments  
+#                    exp_name  - names of COSMO experiments
+#                    fn_prefix - general part of COSMO file names
+#                    clm_name  - names of COSMO parameters   
+#                    workers   - number of workers for reading COSMO files
+#                    mmap_mode - mode of memory mapping ('r' or 'c')
+#                    compact   - use the compact mode (float32 cube)
+#                    start     - the first date of the time window or the
+#                                time period (twin.Period), optional
+#                    stop      - the last date of the time window  (optional)
+#
+# Output parameters: store - the store with COSMO experiments
+#------------------------------------------------------------------------------
+def cosmo_store(sf_store, sf_paths, exp_name, fn_prefix, clm_name, workers = 1,
+                mmap_mode = 'r', compact = False, start = None, stop = None):
+    # Get key of COSMO files (the time window and the type of data are the
+    # parts of the key)
+    start, stop = twin.get_limits(start, stop)
+    dtype = dtp.COMPACT_DTYPE if compact == True else dtp.ACCUM_DTYPE
+    paths = [f'{sf_path}{param}{fn_prefix}' for sf_path in sf_paths 
+                                            for param in clm_name]
+    key   = dcache.cache_key(paths, list(exp_name) + list(clm_name) +
+                                    [str(start), str(stop), np.dtype(dtype).name])
+
+    store = cube.open_store(sf_store, key, mmap_mode)
+    if store is not None and store.cube.dtype != dtype:
+        store = None
+    if store is None:
+        frames = []
+        for sf_path in sf_paths:
+            frames.append(cosmo_data(sf_path, fn_prefix, clm_name, workers = workers,
+                                     compact = compact, start = start, stop = stop))
+        store  = cube.write_store(sf_store, frames, exp_name, clm_name, key,
+                                  dtype = dtype, mmap_mode = mmap_mode)
+    return store
+# end def cosmo_store
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Transformation of COSMO parameters for get_timeseries
+#------------------------------------------------------------------------------
+# how    - type of resampling ('mean' or 'sum')
+# scale  - multiplier of resampled values
+# offset - addend of resampled values (after the scale)
+# lower  - lower limit of hourly values (before resampling)
+# upper  - upper limit of hourly values (before resampling)
+#
+# The parameters which are not in the table are only averaged.
+#------------------------------------------------------------------------------
+t0melt = 273.15
+
+TRANSFORM = {
+    #  param       how     scale     offset    lower      upper
+    'ALHFL_BS': ('mean',  -1.0   ,   0.0   , -np.inf,   np.inf ),
+    'ALHFL_PL': ('mean',  -1.0   ,   0.0   , -np.inf,   np.inf ),
+    'ALHFL_S' : ('mean',  -1.0   ,   0.0   , -np.inf,   np.inf ),
+    'ASHFL_S' : ('mean',  -1.0   ,   0.0   , -np.inf,   np.inf ),
+    'T_2M'    : ('mean',   1.0   , -t0melt , -np.inf,   np.inf ),
+    'T_S'     : ('mean',   1.0   , -t0melt , -np.inf,   np.inf ),
+    'TMAX_2M' : ('mean',   1.0   , -t0melt , -np.inf,   np.inf ),
+    'TMIN_2M' : ('mean',   1.0   , -t0melt , -np.inf,   np.inf ),
+    'ZTRALEAV': ('mean',  -1.0e5 ,   0.0   , -np.inf,   np.inf ),
+    'ZTRANG'  : ('mean',  -1.0e5 ,   0.0   , -np.inf,   np.inf ),
+    'ZTRANGS' : ('mean',  -1.0e5 ,   0.0   , -np.inf,   np.inf ),
+    'ZVERBO'  : ('mean',  -1.0e5 ,   0.0   , -np.inf,   np.inf ),
+    'PS'      : ('mean',   0.01  ,   0.0   , -np.inf,   np.inf ),          # [hPa]
+    'AEVAP_S' : ('sum' ,  -1.0   ,   0.0   , -np.inf,   np.inf ),
+    'RSTOM'   : ('mean',   1.0   ,   0.0   , -np.inf,   20000.0),          # correct the stomatal resistance data
+}
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_transform
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the table with transformation of COSMO
+# parameters
+# 
+# Input parameters : clm_name - names of COSMO parameters 
+#
+# Output parameters: table - dataframe with transformation (index - parameters,
+#                            columns - how, scale, offset, lower, upper)
+#------------------------------------------------------------------------------
+def get_transform(clm_name):
+    default = ('mean', 1.0, 0.0, -np.inf, np.inf)
+    table   = pd.DataFrame([TRANSFORM.get(param, default) for param in clm_name],
+                           index = list(clm_name),
+                           columns = ['how', 'scale', 'offset', 'lower', 'upper'])
+    return table
+# end def get_transform
+#------------------------------------------------------------------------------
+
+
 #------------------------------------------------------------------------------
 # Subroutine: get_timeseries
 #------------------------------------------------------------------------------
-# The subroutine needs for getting actual timeseries from COSMO dataframes
+# The subroutine needs for getting actual timeseries from COSMO dataframes.
+# The transformation of parameters (TRANSFORM) is applied for all columns at
+# once, the input dataframe is not changed.
 # 
 # Input parameters : clm_name - name of COSMO parameters 
 #                    df_cosmo  - columns name from list 
-#                    period   - time period 
+#                    period   - time period (list of timesteps or twin.Period)
 #                    ts       - step for resampling
+#                    dataset  - name of dataset (optional), the result is
+#                               saved in the cache of resampling (read only,
+#                               the key includes the key of input data)
 #
 # Output parameters: parc_list - the list of COSMO parameters 
+#
+# Note: the resampling is done in float64 also for the compact data (float32)
 #------------------------------------------------------------------------------
-def get_timeseries(df_cosmo, clm_name, period, ts):   
-    
-    t0melt = 273.15
-
+def get_timeseries(df_cosmo, clm_name, period, ts, dataset = None):   
+    clm_name = list(clm_name)
+    table    = get_transform(clm_name)
+
+    # The result from the cache of resampling
+    if dataset is not None:
+        key = (dataset, tuple(clm_name), rcache.period_key(period), ts, 'table',
+               rcache.table_key(table))
+        return rcache.CACHE.memo(key, lambda: get_timeseries(df_cosmo, clm_name, period, ts),
+                                 df_cosmo)
+
+    # Get data for time period and limit hourly values (new dataframe)
+    data = df_cosmo[clm_name]
+    data = data.iloc[twin.get_rows(data.index, period)]
+    data = data.clip(lower = table['lower'], upper = table['upper'], axis = 1)
+
+    # Resampling: mean or sum
     cosmo_data = []
-    
-    for param in clm_name:
-        # Date where we have to use resample step
-        if param in ('ALHFL_BS', 'ALHFL_PL', 'ALHFL_S', 'ASHFL_S'):
-            new_data = df_cosmo[param][period].resample(ts).mean() * -1.0        
-             
-        elif param in ('T_2M', 'T_S', 'TMAX_2M', 'TMIN_2M'):
-            new_data = df_cosmo[param][period].resample(ts).mean() - t0melt             
-        
-        elif param in ('ZTRALEAV', 'ZTRANG', 'ZTRANGS', 'ZVERBO'):
-            new_data = df_cosmo[param][period].resample(ts).mean() * -1.0  * 10e4            
-        elif param == 'PS':
-            #new_data = ((data_ts[param][period].resample(ts).mean()) / 100.0).interpolate()  # [hPa]
-            new_data = (df_cosmo[param][period].resample(ts).mean()) / 100.0    # [hPa]          
-        
-        elif param == 'AEVAP_S':
-            new_data = df_cosmo[param][period].resample(ts).sum()  * -1.0  
-    
-        elif param == 'RSTOM':
-            # correct the stomatal resistance data
-            for j in range(len(df_cosmo[param])):
-                if df_cosmo[param][j] > 20000.0:
-                    df_cosmo[param][j] = 20000.0    
-            # calculate mean values                                      
-            new_data = df_cosmo[param][period].resample(ts).mean()         
+    for how in table['how'].unique():
+        columns = table.index[table['how'] == how]
+        cosmo_data.append(dtp.resample_data(data[columns], ts, how))
+    df = pd.concat(cosmo_data, axis = 1)[clm_name]
 
-        else:
-            new_data = df_cosmo[param][period].resample(ts).mean()            
-        
-        cosmo_data.append(new_data)
-    
-    df = pd.concat(cosmo_data, axis = 1)
-    
+    # Scale and offset
+    df = df * table['scale'] + table['offset']
     return df                
 # end def get_timeseries
 #------------------------------------------------------------------------------
 
 
+#------------------------------------------------------------------------------
+# Subroutine: get_timeseries_exp
+#------------------------------------------------------------------------------
+# The subroutine needs for getting actual timeseries for several COSMO
+# experiments at once. The experiments are stacked on the shared time axis
+# (experiment x hour x parameter) and the selection of period, the limits of
+# values, the resampling and the scale are done only one time for all
+# experiments.
+# 
+# Input parameters : frames   - list with COSMO dataframes or the store of
+#                               COSMO experiments (cube_store)
+#                    exp_name - names of COSMO experiments
+#                    clm_name - names of COSMO parameters 
+#                    period   - time period (list of timesteps or twin.Period)
+#                    ts       - step for resampling
+#                    dataset  - name of dataset (optional), the result is
+#                               saved in the cache of resampling (read only,
+#                               the key includes the key of input data)
+#
+# Output parameters: df - dataframe with columns (experiment, parameter), the
+#                         data of experiment is df[experiment]
+#------------------------------------------------------------------------------
+def get_timeseries_exp(frames, exp_name, clm_name, period, ts, dataset = None):
+    exp_name = list(exp_name)
+    clm_name = list(clm_name)
+    table    = get_transform(clm_name)
+
+    # The result from the cache of resampling
+    if dataset is not None:
+        key = ((dataset, tuple(exp_name)), tuple(clm_name), rcache.period_key(period),
+               ts, 'table', rcache.table_key(table))
+        return rcache.CACHE.memo(key, lambda: get_timeseries_exp(frames, exp_name, clm_name,
+                                                                 period, ts), frames)
+
+    # Stack experiments on the shared time axis: hour x experiment x parameter
+    if isinstance(frames, cube.CubeStore):
+        time = frames.time
+        rows = twin.get_rows(time, period)
+        i    = [frames.experiments.index(name) for name in exp_name]
+        j    = [frames.parameters.index(name) for name in clm_name]
+        data = frames.cube[np.ix_(i, j, rows)].transpose(2, 0, 1)
+    else:
+        time = frames[0].index
+        for df in frames[1:]:
+            if not df.index.equals(time):
+                time = time.union(df.index)
+        rows = twin.get_rows(time, period)
+        data = np.empty((len(rows), len(exp_name), len(clm_name)))
+        for i, df in enumerate(frames):
+            if not df.index.equals(time):
+                df = df[clm_name].reindex(time)
+            data[:, i, :] = np.asarray(df[clm_name].values)[rows]
+    
+    # Limits of hourly values (all experiments at once)
+    data = np.clip(data, table['lower'].values, table['upper'].values)
+
+    columns = pd.MultiIndex.from_product([exp_name, clm_name],
+                                         names = ['experiment', 'parameter'])
+    data    = pd.DataFrame(data.reshape(len(rows), -1), index = time[rows],
+                           columns = columns)
+
+    # Resampling: mean or sum
+    cosmo_data = []
+    for how in table['how'].unique():
+        columns = table.index[table['how'] == how]
+        select  = data.columns.get_level_values('parameter').isin(columns)
+        cosmo_data.append(dtp.resample_data(data.loc[:, select], ts, how))
+    df = pd.concat(cosmo_data, axis = 1)[data.columns]
+
+    # Scale and offset
+    scale  = table['scale'].values[np.tile(np.arange(len(clm_name)), len(exp_name))]
+    offset = table['offset'].values[np.tile(np.arange(len(clm_name)), len(exp_name))]
+    df     = df * scale + offset
+    return df
+# end def get_timeseries_exp
+#------------------------------------------------------------------------------
+
+
+
 
 
+#------------------------------------------------------------------------------
+# Subroutine: cosmo_aggregate
+#------------------------------------------------------------------------------
+# The subroutine needs for getting COSMO data for the several steps and the
+# several sets of hours of day in one pass over the data (see twin.aggregate).
+# The transformation of parameters (TRANSFORM) is the same as in
+# get_timeseries.
+# 
+# Input parameters : data     - COSMO data
+#                    clm_name - names of COSMO parameters 
+#                    periods  - time period (twin.Period) or list of periods
+#                    freqs    - steps for resampling
+#                    hours    - dictionary with sets of hours of day
+#                               (None - all hours)
+#
+# Output parameters: result - dictionary with twin.Aggregate for (step, hours),
+#                             the values are result[step, hours].values()
+#------------------------------------------------------------------------------
+def cosmo_aggregate(data, clm_name, periods, freqs, hours = None):
+    clm_name = list(clm_name)
+    result   = twin.aggregate(data[clm_name], periods, freqs, hours,
+                              get_transform(clm_name))
+    return result
+# end def cosmo_aggregate
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: cosmo_cubes
+#------------------------------------------------------------------------------
+# The subroutine needs for getting climatic cubes (year x month x day x hour x
+# parameter) for COSMO experiments. The positions of timesteps in the cube
+# are calculated once for the experiments with the same time index.
+# 
+# Input parameters : frames   - list with COSMO data (experiments)
+#                    clm_name - names of COSMO parameters
+#                    periods  - list with time periods (None - all data)
+#
+# Output parameters: cubes - list with climatic cubes
+#------------------------------------------------------------------------------
+def cosmo_cubes(frames, clm_name, periods = None):
+    table = get_transform(clm_name)
+    cubes = []
+    index = None
+    for data in frames:
+        if index is None or not data.index.equals(index):
+            index = data.index
+            bins  = clim.get_bins(index, periods)
+        cubes.append(clim.build_cube(data, clm_name, periods, table, bins))
+    return cubes
+# end def cosmo_cubes
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: cosmo_cubes_blocks
+#------------------------------------------------------------------------------
+# The subroutine needs for getting climatic cubes for COSMO experiments by
+# blocks of years (long COSMO runs). Only the COSMO data of one block are in
+# memory, the cubes of blocks are joined (see year_chunks).
+# 
+# Input parameters : sf_paths  - paths for COSMO data of experiments
+#                    fn_prefix - name of COSMO run
+#                    clm_name  - names of COSMO parameters
+#                    periods   - list with time periods
+#                    years     - number of years in one block
+#                    workers   - number of workers for reading of COSMO files
+#                    compact   - use the compact mode (float32)
+#                    cache     - use the binary cache (cache of each block,
+#                                by default is off, the files of blocks are not
+#                                saved next to the COSMO files)
+#
+# Output parameters: cubes - list with climatic cubes
+#------------------------------------------------------------------------------
+def cosmo_cubes_blocks(sf_paths, fn_prefix, clm_name, periods, years = 1,
+                       workers = 1, compact = False, cache = False):
+    limits = [twin.get_limits(p) if isinstance(p, twin.Period) else
+              (pd.Timestamp(p[0]), pd.Timestamp(p[-1])) for p in periods]
+    start  = min(limit[0] for limit in limits)
+    stop   = max(limit[1] for limit in limits)
+    blocks = [[] for sf_path in sf_paths]
+    for t_1, t_2 in ychunk.get_blocks(start, stop, years):
+        frames = [cosmo_data(sf_path, fn_prefix, clm_name, cache, workers,
+                             compact = compact, start = t_1, stop = t_2)
+                  for sf_path in sf_paths]
+        for i, cube in enumerate(cosmo_cubes(frames, clm_name, periods)):
+            blocks[i].append(cube)
+        del frames
+
+    cubes = [clim.merge_cubes(block) for block in blocks]
+    return cubes
+# end def cosmo_cubes_blocks
+#------------------------------------------------------------------------------
+
 
 #------------------------------------------------------------------------------
 # Subroutines: cosmo_montly_data, cosmo_daily_data, cosmo_hourly_data
@@ -159,88 +674,145 @@ def get_timeseries(df_cosmo, clm_name, period, ts):
 #       cosmo_daily_data  ---> mean daily values by days for one June
 #       cosmo_hourly_data ---> mean hourly data (duirnal cycle)  
 # 
+# The values are the reductions of the climatic cube (clim_cube). The cube is
+# calculated for the periods or the cube of cosmo_cubes can be used (only
+# years and months of the periods are selected from the cube).
+#
 # Input parameters : clm_name - parameters of COSMO fpr analysis
 #                    data     - COSMO data
 #                    period   - timeperiod for analysis
-#                    ts       - timestep for resampling
-#                    t1, t2   - dates for period
+#                    ts       - timestep for resampling (1H, 1D or 1M)
+#                    cube     - climatic cube for COSMO data (optional)
 #         
 # Output parameters: dataframe - dataframe with mean parameters 
 #------------------------------------------------------------------------------
 
-def cosmo_montly_data(data, clm_name, period, ts):   
-    df     = get_timeseries(data, clm_name, period, ts)             
-    df     = df.reset_index()
-    mon_id = df['index'].dt.month                                              # get the current number for each row based on timeindex
-    #mon_id  = df_parc['Date'].dt.month
-    df_montly = df.groupby(mon_id).mean()
-    # Re-indexing
-    time_index = pd.date_range('1/1/2019', '12/1/2019', freq='MS').strftime('%B')
-    df_montly.index  = time_index    
+def cosmo_montly_data(data, clm_name, period, ts, cube = None):   
+    if cube is None:
+        cube  = clim.build_cube(data, clm_name, [period], get_transform(clm_name))
+        years = None
+    else:
+        years, months = clim.get_keys([period])
+    df_montly = cube.monthly(ts, years)[list(clm_name)]
     return df_montly
 
 
 
-
-def cosmo_daily_data(data, clm_name, periods, ts):    
-    # Combine COSMO data for different monthes in one dataframe
-    cosmo_years = []   
-    for  index in range(len(periods)):
-        df = get_timeseries(data, clm_name, periods[index], ts)                  
-        cosmo_years.append(df)                                                 # Add year to general list for all year
-    df_period = pd.concat(cosmo_years, axis = 1)                               # Concat all year in on dataframe
-    
-    # Reset index
-    df_period = df_period.reset_index()    
-    # Get day index in June 
-    day_index = df_period['index'].dt.day   
-    # Get mean values for simular days
-    cosmo_param = []  
-    for param in clm_name:
-        # Get data for each parameter
-        new_data = df_period[param].groupby(day_index).mean()
-        new_data = new_data.mean(axis = 1)
-        new_data = new_data.rename(param)   
-        # Add data to lists     
-        cosmo_param.append(new_data)       
-    # Get data    
-    df_cosmo = pd.concat(cosmo_param, axis = 1)   
+def cosmo_daily_data(data, clm_name, periods, ts, cube = None):    
+    if cube is None:
+        cube   = clim.build_cube(data, clm_name, periods, get_transform(clm_name))
+        years  = None
+        months = None
+    else:
+        years, months = clim.get_keys(periods)
+    df_cosmo = cube.daily(ts, years, months)[list(clm_name)]
     return df_cosmo
 
 
 
-def cosmo_hd(data, clm_name, periods, ts):    
-    # Combine COSMO data for different monthes in one dataframe   
-    cosmo_years = []
-    for  index in range(len(periods)):
-        df = get_timeseries(data, clm_name, periods[index], ts)  
-        cosmo_years.append(df)    
-    df_period = pd.concat(cosmo_years, axis = 1)                                 # Concat all year in on dataframe
-
-    # Reset index
-    df_period = df_period.reset_index()    
-    # Get hour index
-    hour_index = df_period['index'].dt.hour
-    # Get mean values for simular hours
-    cosmo_param  = []     
-    for param in clm_name:
-        # Get data for each parameter
-        new_data = df_period[param].groupby(hour_index).mean()
-        new_data = new_data.mean(axis = 1)
-        new_data = new_data.rename(param)    
-        # Add data to lists     
-        cosmo_param.append(new_data)       
-    # Get data    
-    df_cosmo = pd.concat(cosmo_param, axis = 1)   
+def cosmo_hd(data, clm_name, periods, ts, cube = None):    
+    if cube is None:
+        cube   = clim.build_cube(data, clm_name, periods, get_transform(clm_name))
+        years  = None
+        months = None
+    else:
+        years, months = clim.get_keys(periods)
+    df_cosmo = cube.diurnal(years, months)[list(clm_name)]
     return df_cosmo
 #------------------------------------------------------------------------------
 
 
+#------------------------------------------------------------------------------
+# Subroutine: stat_cosmo_exp
+#------------------------------------------------------------------------------
+# The subroutine needs for getting actual statistical parameters acording to
+# COSMO data for several COSMO experiments at once. The data are stacked in
+# the array (time x experiment x parameter) and the statistical parameters
+# are calculated in one pass for all experiments and parameters. The missing
+# values are excluded in pairs: the timestep is used only if the values of the
+# reference and the experiment are present.
+#
+# Input parameters : clm_name - names of COSMO parameters
+#                    df_ref   - dataset with reference COSMO data (COSMO_CTR)
+#                    frames   - list with datasets of COSMO experiments or
+#                               the dataframe of get_timeseries_exp
+#                    exp_name - names of COSMO experiments
+#
+# Output parameters: df_stat_cosmo - the dataframe with statistical parameters
+#                                    with index (experiment, parameter)
+#------------------------------------------------------------------------------
+def stat_cosmo_exp(clm_name, df_ref, frames, exp_name):
+    acc = ychunk.MomentAccumulator()
+    stat_cosmo_add(acc, clm_name, df_ref, frames, exp_name)
+    df_stat_cosmo = stat_cosmo_frame(acc, clm_name, exp_name)
+    return df_stat_cosmo
+# end def stat_cosmo_exp
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutines: stat_cosmo_add, stat_cosmo_frame
+#------------------------------------------------------------------------------
+# The subroutines need for getting statistical parameters of COSMO experiments
+# by blocks of data (for example, by years, see year_chunks):
+#
+#       stat_cosmo_add   ---> add the block of data to the accumulator
+#       stat_cosmo_frame ---> the dataframe with statistical parameters (the
+#                             columns MSE and RMSE like in
+#                             insitu_data.stat_frame)
+#
+# Input parameters : acc      - accumulator (year_chunks.MomentAccumulator)
+#                    clm_name - names of COSMO parameters
+#                    df_ref   - dataset with reference COSMO data (COSMO_CTR)
+#                    frames   - list with datasets of COSMO experiments or
+#                               the dataframe of get_timeseries_exp
+#                    exp_name - names of COSMO experiments
+#
+# Output parameters: df_stat_cosmo - the dataframe with statistical parameters
+#                                    with index (experiment, parameter)
+#------------------------------------------------------------------------------
+def stat_cosmo_add(acc, clm_name, df_ref, frames, exp_name):
+    clm_name = list(clm_name)
+    exp_name = list(exp_name)
+    if isinstance(frames, pd.DataFrame):
+        frames = [frames[name] for name in exp_name]
+
+    # Stack data: time x experiment x parameter
+    ref  = np.asarray(df_ref[clm_name].values, dtype = np.float64)
+    data = np.empty((len(ref), len(exp_name), len(clm_name)))
+    for i, df in enumerate(frames):
+        if not df.index.equals(df_ref.index):
+            df = df[clm_name].reindex(df_ref.index)
+        data[:, i] = np.asarray(df[clm_name].values, dtype = np.float64)
+    ref = np.broadcast_to(ref[:, None, :], data.shape)
+    acc.add(ref.reshape(len(ref), -1), data.reshape(len(data), -1))
+
+
+def stat_cosmo_frame(acc, clm_name, exp_name):
+    stat  = acc.result()
+    index = pd.MultiIndex.from_product([list(exp_name), list(clm_name)],
+                                       names = ['Experiment', 'Parameter'])
+    df_stat_cosmo = pd.DataFrame({'Mean COSMO': stat['mean_x'],
+                                  'Mean Model': stat['mean_y'],
+                                  'Max COSMO' : stat['max_x'] ,
+                                  'Max MODEL' : stat['max_y'] ,
+                                  'Min COSMO' : stat['min_x'] ,
+                                  'Min MODEL' : stat['min_y'] ,
+                                  'STD COSMO' : stat['std_x'] ,
+                                  'STD_MODEL' : stat['std_y'] ,
+                                        'MAE' : stat['mae']   ,
+                                        'MSE' : stat['mse']   ,
+                                       'RMSE' : stat['rmse']  ,
+                                       'CORR' : stat['corr']  }, index = index)
+    return df_stat_cosmo
+#------------------------------------------------------------------------------
+
+
 #------------------------------------------------------------------------------
 # Subroutine: stat_cosmo
 #------------------------------------------------------------------------------
 # The subroutine needs for getting actual statistical parameters acording to 
-# COSMO data 
+# COSMO data (one COSMO experiment, see stat_cosmo_exp)
 #
 # 
 # Input parameters : clm_name - name of COSMO parameters 
@@ -250,64 +822,50 @@ def cosmo_hd(data, clm_name, periods, ts):
 # Output parameters: df_stat_cosmo - the dataframe with statistical parameters
 #------------------------------------------------------------------------------
 def stat_cosmo(clm_name, df_ctr, df_mod):
-    # Create a nan timeseries
-    mean_orig = pd.Series(np.nan, index = range(len(clm_name)))
-    max_orig  = pd.Series(np.nan, index = range(len(clm_name))) 
-    min_orig  = pd.Series(np.nan, index = range(len(clm_name)))
-    mean_exp  = pd.Series(np.nan, index = range(len(clm_name)))
-    max_exp   = pd.Series(np.nan, index = range(len(clm_name)))
-    min_exp   = pd.Series(np.nan, index = range(len(clm_name)))
-    std_orig  = pd.Series(np.nan, index = range(len(clm_name)))
-    std_exp   = pd.Series(np.nan, index = range(len(clm_name)))
-    mae       = pd.Series(np.nan, index = range(len(clm_name)))
-    rmse      = pd.Series(np.nan, index = range(len(clm_name)))
-    corr      = pd.Series(np.nan, index = range(len(clm_name)))
-    
-    # Start calculations
-    for i in range(len(clm_name)):
-        mean_orig[i] = df_ctr[clm_name[i]].mean()
-        max_orig[i]  = df_ctr[clm_name[i]].max()
-        min_orig[i]  = df_ctr[clm_name[i]].min()
-        std_orig[i]  = df_ctr[clm_name[i]].std()
-        mean_exp[i]  = df_mod[clm_name[i]].mean()
-        max_exp[i]   = df_mod[clm_name[i]].max()
-        min_exp[i]   = df_mod[clm_name[i]].min()
-        std_exp[i]   = df_mod[clm_name[i]].std()       
-        mae[i]       = mean_absolute_error(df_ctr[clm_name[i]], df_mod[clm_name[i]])
-        rmse[i]      = mean_squared_error(df_ctr[clm_name[i]], df_mod[clm_name[i]])
-        corr[i]      = df_ctr[clm_name[i]].corr(df_mod[clm_name[i]])
-    
-    # Create data frame
-    df_stat_cosmo = pd.DataFrame({'Parameter' : ['AEVAP_S',  'ALHFL_S', 
-                                                 'ASHFL_S',  'RSTOM'  ,
-                                                 'ZVERBO' ,  'T_2M'   ,
-                                                 'T_S'    ,  'TMAX_2M',
-                                                 'TMIN_2M','ZTRALEAV'],
-                                  'Mean COSMO': mean_orig,
-                                  'Mean Model': mean_exp ,
-                                  'Max COSMO' : max_orig ,
-                                  'Max MODEL' : max_exp  ,
-                                  'Min COSMO' : min_orig ,
-                                  'Min MODEL' : min_exp  ,
-                                  'STD COSMO' : std_orig ,
-                                  'STD_MODEL' : std_exp  ,
-                                        'MAE' : mae      ,
-                                       'RMSE' : rmse     ,
-                                       'CORR' : corr     })
-    
-    df_stat_cosmo.set_index('Parameter', inplace = True)
-    
+    df_stat_cosmo = stat_cosmo_exp(clm_name, df_ctr, [df_mod], ['Model'])
+    df_stat_cosmo = df_stat_cosmo.droplevel('Experiment')
     return df_stat_cosmo
+# end def stat_cosmo
+#------------------------------------------------------------------------------
 
 
-
+#------------------------------------------------------------------------------
+# Subroutine: data4month
+#------------------------------------------------------------------------------
+# The subroutine needs for getting COSMO data for several time periods (for
+# example, the same month in several years) in one dataframe. The timesteps
+# of all periods are labeled by the number of period at once and the data are
+# resampled by one groupby (see time_window): at first to daily values like
+# in get_timeseries and after that to the step ts.
+#
+# Input parameters : data     - COSMO data
+#                    clm_name - names of COSMO parameters
+#                    periods  - list with time periods
+#                    ts       - step for resampling
+#
+# Output parameters: df_period - dataframe with data of all periods
+#------------------------------------------------------------------------------
 def data4month(data, clm_name, periods, ts):    
-    # Combine COSMO data for different monthes in one dataframe
-    cosmo_years = []   
-    for  index in range(len(periods)):
-        df = get_timeseries(data, clm_name, periods[index], 'D') 
-        df = df.resample(ts).mean()                 
-        cosmo_years.append(df)                                                 # Add year to general list for all year
-    df_period = pd.concat(cosmo_years, axis = 0)  
-    df_period = df_period.reset_index()
-    return df_period           
+    clm_name = list(clm_name)
+    table    = get_transform(clm_name)
+    ids      = twin.period_windows(data.index, periods)
+
+    # Limits of hourly values
+    df = data[clm_name].clip(table['lower'], table['upper'], axis = 1)
+
+    # Daily values for all periods: mean or sum
+    cosmo_days = []
+    for how in table['how'].unique():
+        columns = list(table.index[table['how'] == how])
+        cosmo_days.append(twin.window_resample(df[columns], ids, 'D', how))
+    df = pd.concat(cosmo_days, axis = 1)[clm_name]
+    df = df * table['scale'] + table['offset']
+
+    # Resampling of daily values
+    ids = df.index.get_level_values('window').values
+    df  = twin.window_resample(df.droplevel('window'), ids, ts, 'mean')
+
+    df_period = df.droplevel('window').reset_index()
+    return df_period
+# end def data4month
+#------------------------------------------------------------------------------
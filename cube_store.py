@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+The cube_store is the program for work with the on-disk store of COSMO
+experiments (CCLMref, CCLMv3.5, CCLMv4.5, CCLMv4.5e).
+
+The store is a folder with three files:
+    cube.npy  ---> float array with shape (experiment x parameter x hour)
+    time.npy  ---> the shared time axis (datetime64[ns])
+    cube.json ---> names of experiments and parameters, key of the sources
+
+The cube is opened with memory mapping, so several analysis processes share
+the same pages of the file. The selection of parameter or period returns the
+views of the cube without copying of data. The files of store are written to
+the temporary files and are replaced atomically (cube.json is the last), so
+the processes with the mapped old cube are not affected by the new store.
+
+The progam contains several subroutines:
+    write_store ---> The subroutine needs for writing COSMO experiments to
+                     the store
+    open_store  ---> The subroutine needs for opening of the store
+    CubeStore   ---> The class with the memory mapped cube and the methods for
+                     selection of data:
+                        locate - get positions of the period on time axis
+                        values - get array of parameter for experiment
+                        series - get timeseries of parameter for experiment
+                        frame  - get dataframe for experiment
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Center for Enviromental System
+                                                   Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+# Import standart liblaries
+import os
+import json
+import numpy as np
+import pandas as pd
+
+
+#------------------------------------------------------------------------------
+# Subroutine: write_store
+#------------------------------------------------------------------------------
+# The subroutine needs for writing COSMO experiments to the store. All
+# experiments are aligned to the shared time axis (union of time indexes).
+# The old header is deleted at first, so the interrupted writing leaves the
+# store without header (the store is not opened and is written again).
+#
+# Input parameters : sf_store  - path for the store (folder)
+#                    frames    - list with COSMO dataframes
+#                    exp_name  - names of COSMO experiments
+#                    clm_name  - names of COSMO parameters
+#                    key       - the key of the sources (optional)
+#                    dtype     - type of data in the cube
+#                    mmap_mode - mode of memory mapping for the opened store
+#
+# Output parameters: store - the opened store
+#------------------------------------------------------------------------------
+def write_store(sf_store, frames, exp_name, clm_name, key = None,
+                dtype = 'float64', mmap_mode = 'r'):
+    os.makedirs(sf_store, exist_ok = True)
+    path_header = f'{sf_store}cube.json'
+    if os.path.isfile(path_header):
+        os.remove(path_header)                                                 # the old store is not valid
+
+    # Get the shared time axis
+    time = frames[0].index
+    for df in frames[1:]:
+        time = time.union(df.index)
+    time = time.values.astype('datetime64[ns]')
+
+    # Write data to the cube (temporary file)
+    cube = np.lib.format.open_memmap(f'{sf_store}cube.npy.tmp', mode = 'w+',
+                                     dtype = dtype,
+                                     shape = (len(exp_name), len(clm_name), len(time)))
+    for i, df in enumerate(frames):
+        df = df.reindex(pd.DatetimeIndex(time))
+        for j, param in enumerate(clm_name):
+            cube[i, j, :] = df[param].values
+    cube.flush()
+    del cube
+
+    with open(f'{sf_store}time.npy.tmp', 'wb') as stream:
+        np.save(stream, time)
+    header = {'experiments': list(exp_name),
+              'parameters' : list(clm_name),
+              'key'        : key}
+    with open(f'{path_header}.tmp', 'w') as stream:
+        json.dump(header, stream)
+
+    # Replace the files of store (the header is the last)
+    for name in ('cube.npy', 'time.npy', 'cube.json'):
+        os.replace(f'{sf_store}{name}.tmp', f'{sf_store}{name}')
+
+    store = open_store(sf_store, key, mmap_mode)
+    return store
+# end def write_store
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: open_store
+#------------------------------------------------------------------------------
+# The subroutine needs for opening of the store. The store is not opened if
+# the sizes of cube and time axis are different from the header.
+#
+# Input parameters : sf_store  - path for the store (folder)
+#                    key       - the key of the sources, if the key of the
+#                                store is different the store is not opened
+#                    mmap_mode - mode of memory mapping ('r' - read only,
+#                                                        'c' - copy on write)
+#
+# Output parameters: store - the opened store or None
+#------------------------------------------------------------------------------
+def open_store(sf_store, key = None, mmap_mode = 'r'):
+    path_header = f'{sf_store}cube.json'
+    if not os.path.isfile(path_header):
+        return None
+    with open(path_header, 'r') as stream:
+        header = json.load(stream)
+    if key is not None and header['key'] != key:
+        return None
+    store = CubeStore(sf_store, header, mmap_mode)
+    shape = (len(store.experiments), len(store.parameters), len(store.time))
+    if store.cube.shape != shape:
+        return None
+    return store
+# end def open_store
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Class: CubeStore
+#------------------------------------------------------------------------------
+# The class with the memory mapped cube (experiment x parameter x hour)
+#
+# Input parameters : sf_store  - path for the store (folder)
+#                    header    - information about the store
+#                    mmap_mode - mode of memory mapping
+#------------------------------------------------------------------------------
+class CubeStore(object):
+
+    def __init__(self, sf_store, header, mmap_mode = 'r'):
+        self.cube        = np.load(f'{sf_store}cube.npy', mmap_mode = mmap_mode)
+        self.time        = pd.DatetimeIndex(np.load(f'{sf_store}time.npy'),
+                                            name = 'Date')
+        self.experiments = header['experiments']
+        self.parameters  = header['parameters']
+        self.key         = header['key']
+
+    # Get positions of the period on time axis (start and stop are included)
+    def locate(self, start = None, stop = None):
+        i1 = 0 if start is None else self.time.searchsorted(pd.Timestamp(start), 'left')
+        i2 = len(self.time) if stop is None else self.time.searchsorted(pd.Timestamp(stop), 'right')
+        return slice(i1, i2)
+
+    # Get array of parameter for experiment (view of the cube)
+    def values(self, experiment, param, start = None, stop = None):
+        i = self.experiments.index(experiment)
+        j = self.parameters.index(param)
+        return self.cube[i, j, self.locate(start, stop)]
+
+    # Get timeseries of parameter for experiment (view of the cube)
+    def series(self, experiment, param, start = None, stop = None):
+        period = self.locate(start, stop)
+        i = self.experiments.index(experiment)
+        j = self.parameters.index(param)
+        return pd.Series(self.cube[i, j, period], index = self.time[period],
+                         name = param, copy = False)
+
+    # Get dataframe for experiment (view of the cube)
+    def frame(self, experiment, start = None, stop = None):
+        period = self.locate(start, stop)
+        i = self.experiments.index(experiment)
+        return pd.DataFrame(self.cube[i, :, period].T, index = self.time[period],
+                            columns = self.parameters, copy = False)
+# end class CubeStore
+#------------------------------------------------------------------------------
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+The data_cache is the program for work with binary cache files of the project.
+The cache files have a columnar layout (one NumPy array per column plus the
+time index) and are stored next to the initial text files.
+
+The progam contains several subroutines:
+    file_signature ---> The subroutine needs for getting the signature
+                        (path, size, mtime) of the source file
+    file_digest    ---> The subroutine needs for getting the checksum of the
+                        content (or the first bytes) of the source file
+    file_state     ---> The subroutine needs for getting the state (size and
+                        checksum) of the source file
+    append_only    ---> The subroutine needs for checking that the source
+                        file was changed only by adding lines at the end
+    cache_key      ---> The subroutine needs for getting the key of the cache
+                        based on the source files and names of parameters
+    cache_path     ---> The subroutine needs for getting the name of the
+                        cache file next to the source files
+    save_frame     ---> The subroutine needs for writing dataframe to the cache
+    load_frame     ---> The subroutine needs for reading dataframe from the cache
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Center for Enviromental System
+                                                   Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+# Import standart liblaries
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+
+#------------------------------------------------------------------------------
+# Subroutine: file_signature
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the signature of the source file
+#
+# Input parameters : path - path for the source file
+#
+# Output parameters: signature - list with path, size and mtime of the file
+#------------------------------------------------------------------------------
+def file_signature(path):
+    info = os.stat(path)
+    signature = [os.path.abspath(path), info.st_size, info.st_mtime_ns]
+    return signature
+# end def file_signature
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: file_digest
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the checksum of the source file. The file
+# is read by blocks, if the size is set only the first bytes are used.
+#
+# Input parameters : path  - path for the source file
+#                    size  - number of the first bytes (None - all file)
+#                    block - size of block for reading
+#
+# Output parameters: digest - the hex digest of the content
+#------------------------------------------------------------------------------
+def file_digest(path, size = None, block = 2**20):
+    sha = hashlib.sha1()
+    with open(path, 'rb') as stream:
+        remain = os.fstat(stream.fileno()).st_size if size is None else size
+        while remain > 0:
+            chunk = stream.read(min(block, remain))
+            if len(chunk) == 0:
+                break
+            sha.update(chunk)
+            remain = remain - len(chunk)
+    digest = sha.hexdigest()
+    return digest
+# end def file_digest
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: file_state
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the state of the source file
+#
+# Input parameters : path - path for the source file
+#
+# Output parameters: state - list with size and checksum of the file
+#------------------------------------------------------------------------------
+def file_state(path):
+    size  = os.stat(path).st_size
+    state = [size, file_digest(path, size)]
+    return state
+# end def file_state
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: append_only
+#------------------------------------------------------------------------------
+# The subroutine needs for checking that the source file was changed only by
+# adding lines at the end (extension of COSMO runs). The old content has to
+# be the same (checksum of the first bytes) and has to end with the full line.
+#
+# Input parameters : path  - path for the source file
+#                    state - the old state of the file (size and checksum)
+#
+# Output parameters: status - True if the old content was not changed
+#------------------------------------------------------------------------------
+def append_only(path, state):
+    size, digest = state
+    if not os.path.isfile(path) or os.stat(path).st_size < size:
+        return False
+    if size > 0:
+        with open(path, 'rb') as stream:
+            stream.seek(size - 1)
+            if stream.read(1) != b'\n':
+                return False
+    status = file_digest(path, size) == digest
+    return status
+# end def append_only
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: cache_key
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the key of the cache. The key will be
+# changed if any source file was changed (size or mtime) or if the list with
+# names of parameters was changed.
+#
+# Input parameters : paths    - paths for the source files
+#                    clm_name - names of parameters
+#
+# Output parameters: key - the hex digest of the sources
+#------------------------------------------------------------------------------
+def cache_key(paths, clm_name):
+    sources = [file_signature(path) for path in paths]
+    text = json.dumps([sources, list(clm_name)])
+    key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+    return key
+# end def cache_key
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: cache_path
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the name of the cache file. The cache file
+# is located in the same folder as the source files, the different lists of
+# parameters (CESR_project.py and stat_module.py) have different cache files.
+#
+# Input parameters : sf_path   - path for the source data
+#                    dataset   - name of dataset (COSMO, FLUXNET ...)
+#                    fn_prefix - general part of file names
+#                    clm_name  - names of parameters
+#                    window    - the time window of data (optional), the
+#                                different windows have different cache files
+#
+# Output parameters: path - the path for the cache file
+#------------------------------------------------------------------------------
+def cache_path(sf_path, dataset, fn_prefix, clm_name, window = None):
+    if window is None:
+        text = json.dumps([fn_prefix, list(clm_name)])
+    else:
+        text = json.dumps([fn_prefix, list(clm_name), [str(i) for i in window]])
+    tag  = hashlib.sha1(text.encode('utf-8')).hexdigest()[0:12]
+    path = f'{sf_path}.{dataset}_cache_{tag}.npz'
+    return path
+# end def cache_path
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: save_frame
+#------------------------------------------------------------------------------
+# The subroutine needs for writing dataframe to the cache. The time index and
+# each column are saved as separate arrays, the file is replaced atomically.
+#
+# Input parameters : path - path for the cache file
+#                    df   - dataframe with DatetimeIndex
+#                    key  - the key of the cache
+#                    meta - additional information for the cache (optional)
+#
+# Output parameters: status - True if the cache was written
+#------------------------------------------------------------------------------
+def save_frame(path, df, key, meta = None):
+    index  = df.index.values.astype('datetime64[ns]').view('int64')
+    header = {'key'    : key,
+              'columns': [str(col) for col in df.columns],
+              'index'  : df.index.name,
+              'meta'   : meta}
+
+    arrays = {'__header__': np.array(json.dumps(header)),
+              '__index__' : index}
+    for i, col in enumerate(df.columns):
+        arrays[f'col_{i}'] = df[col].values
+
+    tmp_path = f'{path}.tmp'
+    try:
+        with open(tmp_path, 'wb') as stream:
+            np.savez(stream, **arrays)
+        os.replace(tmp_path, path)
+    except OSError as error:
+        print('Cache was not written: ', error)
+        return False
+    return True
+# end def save_frame
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: load_frame
+#------------------------------------------------------------------------------
+# The subroutine needs for reading dataframe from the cache
+#
+# Input parameters : path - path for the cache file
+#                    key  - the key of the cache, if key is None the key
+#                           of the cache will not be checked
+#
+# Output parameters: df   - dataframe or None if the cache is missing or old
+#                    meta - additional information from the cache
+#------------------------------------------------------------------------------
+def load_frame(path, key = None):
+    if not os.path.isfile(path):
+        return None, None
+    try:
+        with np.load(path, allow_pickle = False) as data:
+            header = json.loads(str(data['__header__']))
+            if key is not None and header['key'] != key:
+                return None, header['meta']
+            index = pd.DatetimeIndex(data['__index__'].view('datetime64[ns]'),
+                                     name = header['index'])
+            columns = {}
+            for i, col in enumerate(header['columns']):
+                columns[col] = data[f'col_{i}']
+    except (OSError, ValueError, KeyError) as error:
+        print('Cache was not read: ', error)
+        return None, None
+
+    df = pd.DataFrame(columns, index = index)
+    return df, header['meta']
+# end def load_frame
+#------------------------------------------------------------------------------
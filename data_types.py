@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+The data_types is the program for work with the types of data in the project.
+
+The initial data (COSMO, FLUXNET, EURONET, HYRAS, E-OBS, GLEAM, Linden and
+Lindenberg) have only 3-6 significant digits, so they can be stored as
+float32 (compact mode). The accumulations (means, sums, standard deviations)
+are always calculated in float64.
+
+The progam contains several subroutines:
+    compact_data  ---> The subroutine needs for converting of float columns
+                       to the compact type (float32)
+    resample_data ---> The subroutine needs for resampling of data with
+                       accumulation in float64
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Center for Enviromental System
+                                                   Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+# Import standart liblaries
+import numpy as np
+import pandas as pd
+
+
+# Types of data: compact mode and accumulations
+COMPACT_DTYPE = np.float32
+ACCUM_DTYPE   = np.float64
+
+
+#------------------------------------------------------------------------------
+# Subroutine: compact_data
+#------------------------------------------------------------------------------
+# The subroutine needs for converting of float columns to the compact type
+#
+# Input parameters : data    - timeseries or dataframe
+#                    compact - use the compact mode (True or False)
+#
+# Output parameters: data - timeseries or dataframe with float32 values
+#------------------------------------------------------------------------------
+def compact_data(data, compact = True):
+    if compact == False:
+        return data
+    if isinstance(data, pd.Series):
+        if data.dtype == ACCUM_DTYPE:
+            data = data.astype(COMPACT_DTYPE)
+        return data
+    columns = [col for col in data.columns if data[col].dtype == ACCUM_DTYPE]
+    if len(columns) > 0:
+        data = data.astype({col: COMPACT_DTYPE for col in columns})
+    return data
+# end def compact_data
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: resample_data
+#------------------------------------------------------------------------------
+# The subroutine needs for resampling of data. The values are converted to
+# float64 before accumulation, the float64 data are used without copying.
+#
+# Input parameters : data - timeseries or dataframe
+#                    ts   - step for resampling
+#                    how  - type of accumulation ('mean', 'sum', 'std')
+#
+# Output parameters: data - resampled timeseries or dataframe (float64)
+#------------------------------------------------------------------------------
+def resample_data(data, ts, how = 'mean'):
+    data = data.astype(ACCUM_DTYPE, copy = False)
+    data = getattr(data.resample(ts), how)()
+    return data
+# end def resample_data
+#------------------------------------------------------------------------------
@@ -6,10 +6,24 @@ The progam contains several subroutine:
     data_path    ---> The subroutine needs for getting actual file name 
                       of FLUXNET data                      
     fluxnet_data ---> The subroutine needs for getting actual FLUXNET data
+    fluxnet_time ---> The subroutine needs for getting the time index from
+                      TIMESTAMP_START values of FLUXNET data (YYYYMMDDHHMM)
+    fluxnet_read ---> The subroutine needs for reading the actual columns of
+                      FLUXNET FULLSET file (with binary cache)
+    fluxnet_hourly -> The subroutine needs for getting hourly FLUXNET data
+                      from the FLUXNET FULLSET file
+    fluxnet_columns -> The subroutine needs for getting actual parameters
+                      from FLUXNET FULLSET data
+    fluxnet_stream --> The subroutine needs for getting sums of FLUXNET data
+                      for time steps during the reading of file
     euronet_data ---> The subroutine needs for getting actual EURONET data   
+    euronet_year ---> The subroutine needs for getting hourly EURONET data
+                      of one year (with binary cache)
     montly_data  ---> The subroutines needs for getting timeseries
     daily_data        values based on mean FLUXNET EURONET or GLEAM values
     hourly_data  
+    data4month   ---> The subroutine needs for getting data for several
+                      time windows in one dataframe
   
 Autors of project: Evgenii Churiulin, Merja Tölle, Center for Enviromental System
                                                    Research (CESR) 
@@ -29,9 +43,30 @@ Version    Date       Name
 
 # Import standart liblaries
 import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
 
+# Import personal libraries
+import data_types as dtp
+import data_cache as dcache
+import clim_cube as clim
+import time_window as twin
+import time_axis as tax
+import thermo
+
+
+# Actual columns of FLUXNET FULLSET data (see fluxnet_columns), the other
+# columns of file are not read
+FLUXNET_TIME    = 'TIMESTAMP_START'
+FLUXNET_COLUMNS = ['TA_F_MDS', 'TA_F', 'TS_F_MDS_1', 'LE_F_MDS', 'LE_CORR',
+                   'VPD_F', 'PA', 'PA_F', 'H_F_MDS', 'H_CORR']
+FLUXNET_NAN     = ['-9999', '********']
+
+# Steps of preparing of yearly EURONET data (part of the key of cache)
+EURONET_STEPS   = ['drop:TIMESTAMP_END,DTime', 'resample:H:mean', 'dropna:thresh=3']
+
 
 #------------------------------------------------------------------------------
 # Subroutine: fluxnet_data
@@ -43,10 +78,16 @@ import pandas as pd
 #                    mode              - the type of FLUXNET data (FULLSET or ERAI)       
 #                    mylist            - the list of meteorological station
 #                    st_in     - the actual name of meteorologicl station
+#                    compact   - use the compact mode (float32)
+#                    freq      - step for aggregation during the reading of
+#                                file (None - hourly data, see fluxnet_stream)
+#                    cache     - use the binary cache (see fluxnet_read)
 #
 # Output parameters: df_fluxnet - the data frame with information about fluxnet data
+#                                 on the common hourly axis (see time_axis),
+#                                 object time_window.Aggregate if freq is used
 #------------------------------------------------------------------------------
-def fluxnet_data(fluxnet_path, st_in):  
+def fluxnet_data(fluxnet_path, st_in, compact = False, freq = None, cache = True):  
     
     #--------------------------------------------------------------------------
     # Define spesial parameters for FLUXNET data
@@ -79,8 +120,141 @@ def fluxnet_data(fluxnet_path, st_in):
     #--------------------------------------------------------------------------
     iPath_fluxnet = fluxnet_path + folder + fileName
     #--------------------------------------------------------------------------
-    # Section: Load data from FLUXNET data
+    # Section: Load data from FLUXNET data (all file or aggregate-on-read)
     #--------------------------------------------------------------------------
+    if freq is not None:
+        agg = fluxnet_stream(iPath_fluxnet, freq)
+        return agg, st_name4plot
+
+    df_FLUXNET = fluxnet_hourly(fluxnet_path + folder, fileName, compact, cache)
+        
+    return df_FLUXNET, st_name4plot       
+              
+# end def fluxnet_data
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+# Subroutine: fluxnet_hourly
+#------------------------------------------------------------------------------
+# The subroutine needs for getting hourly FLUXNET data (actual parameters)
+# from the FLUXNET FULLSET file
+#
+# Input parameters : sf_path - path for the FLUXNET file (folder of station)
+#                    f_name  - name of the FLUXNET FULLSET file
+#                    compact - use the compact mode (float32)
+#                    cache   - use the binary cache (see fluxnet_read)
+#
+# Output parameters: df_FLUXNET - the data frame with actual parameters on
+#                                 the common hourly axis (see time_axis), the
+#                                 missing hours are not filled
+#------------------------------------------------------------------------------
+def fluxnet_hourly(sf_path, f_name, compact = False, cache = True):
+    df_fluxnet = fluxnet_read(sf_path, f_name, cache)
+
+    df_FLUXNET = fluxnet_columns(df_fluxnet)
+    df_FLUXNET = dtp.resample_data(df_FLUXNET, 'H', 'mean')
+    df_FLUXNET = dtp.compact_data(df_FLUXNET, compact)
+    df_FLUXNET = tax.to_axis(df_FLUXNET, 'H', fill = False)                    # common time axis (missing hours are not filled)
+    return df_FLUXNET
+# end def fluxnet_hourly
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+# Subroutine: fluxnet_time
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the time index from TIMESTAMP_START values
+# of FLUXNET data. The values of FLUXNET2015 have the fixed format
+# YYYYMMDDHHMM (integers), the dates are calculated by the integer operations
+# for all values at once. The values in other formats are parsed by pandas.
+#
+# Input parameters : values - TIMESTAMP_START values
+#                    name   - name of the time index
+#
+# Output parameters: index - time index (DatetimeIndex)
+#------------------------------------------------------------------------------
+def fluxnet_time(values, name = FLUXNET_TIME):
+    values = np.asarray(values)
+    if values.dtype.kind not in 'iu':
+        return pd.DatetimeIndex(pd.to_datetime(values), name = name)
+
+    stamp  = values.astype(np.int64)
+    month  = stamp // 10**6 % 100
+    day    = stamp // 10**4 % 100
+    hour   = stamp // 10**2 % 100
+    minute = stamp % 100
+    months = (stamp // 10**8 - 1970) * 12 + month - 1
+    days   = months.astype('datetime64[M]').astype('datetime64[D]') + (day - 1)
+    if (np.any((month < 1) | (month > 12) | (day < 1) | (hour > 23) | (minute > 59)) or
+        np.any(days.astype('datetime64[M]').astype(np.int64) != months)):
+        raise ValueError('TIMESTAMP_START is not in the format YYYYMMDDHHMM')
+    time  = days.astype('datetime64[ns]') + (hour * 60 + minute) * np.timedelta64(60, 's')
+    index = pd.DatetimeIndex(time, name = name)
+    return index
+# end def fluxnet_time
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+# Subroutine: fluxnet_read
+#------------------------------------------------------------------------------
+# The subroutine needs for reading the actual columns of FLUXNET FULLSET file
+# (FLUXNET_COLUMNS). Only these columns are parsed (float64), the time index
+# is parsed by fluxnet_time. The result is saved to the binary cache next to
+# the FLUXNET file and is used in the next runs, the cache is updated
+# automatically if the FLUXNET file was changed.
+#
+# Input parameters : sf_path - path for the FLUXNET file (folder of station)
+#                    f_name  - name of the FLUXNET FULLSET file
+#                    cache   - use the binary cache (True or False)
+#                    chunk   - number of rows in one part of file (optional),
+#                              the parts are returned one by one (no cache)
+#
+# Output parameters: df_fluxnet - the data frame with the actual columns of
+#                                 FLUXNET file (half-hourly data), iterator
+#                                 with parts of file if chunk is used
+#------------------------------------------------------------------------------
+def fluxnet_read(sf_path, f_name, cache = True, chunk = None):
+    path = os.path.join(sf_path, f_name)
+
+    # Check the binary cache
+    if cache == True and chunk is None:
+        path_cache = dcache.cache_path(sf_path, 'fluxnet', f_name, FLUXNET_COLUMNS)
+        key_cache  = dcache.cache_key([path], FLUXNET_COLUMNS)
+        df_fluxnet, meta = dcache.load_frame(path_cache, key_cache)
+        if df_fluxnet is not None:
+            return df_fluxnet
+
+    # Only actual columns of file with explicit types
+    usecols = [FLUXNET_TIME] + FLUXNET_COLUMNS
+    dtypes  = {col: dtp.ACCUM_DTYPE for col in FLUXNET_COLUMNS}
+    reader  = pd.read_csv(path, sep = ',', usecols = lambda col: col in usecols,
+                          dtype = dtypes, skipinitialspace = True,
+                          na_values = FLUXNET_NAN, chunksize = chunk)
+
+    def get_frame(part):
+        index = fluxnet_time(part.pop(FLUXNET_TIME).values)
+        return part.set_axis(index, axis = 0)
+
+    if chunk is not None:
+        return (get_frame(part) for part in reader)
+
+    df_fluxnet = get_frame(reader)
+    if cache == True:
+        dcache.save_frame(path_cache, df_fluxnet, key_cache)
+    return df_fluxnet
+# end def fluxnet_read
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+# Subroutine: fluxnet_columns
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the actual parameters from the FLUXNET
+# FULLSET data (the same for all file and for the parts of file)
+#
+# Input parameters : df_fluxnet - the data frame with FLUXNET FULLSET data
+#
+# Output parameters: df_out     - the data frame with actual parameters
+#------------------------------------------------------------------------------
+def fluxnet_columns(df_fluxnet):
     def correction(data_in, change_on):
         try:
             date_out  = data_in    
@@ -89,11 +263,7 @@ def fluxnet_data(fluxnet_path, st_in):
             date_out = change_on         
         return date_out
        
-    df_fluxnet = pd.read_csv(iPath_fluxnet, skiprows = 0, sep=',', dayfirst = True,
-                             parse_dates = True, index_col = [0], skipinitialspace = True, 
-                             na_values= ['-9999','********'])    
-
-    df_fluxnet = df_fluxnet.drop(['TIMESTAMP_END'], axis=1)
+    df_fluxnet = df_fluxnet.drop(['TIMESTAMP_END'], axis=1, errors = 'ignore')
         
     # Create a nan timeseries
     s_zero = pd.Series(np.nan, index = df_fluxnet.index)
@@ -118,77 +288,160 @@ def fluxnet_data(fluxnet_path, st_in):
     sh_corr = correction(df_fluxnet['H_CORR'], s_zero)
                  
     #----------------------------------------------------------------------
-    # Create a dataframe with zero values which is equal --->  -9999   
+    # Vapour pressure [hPa] and specific humidity [kg kg-1] for all timesteps
+    # at once (VPD_F in hPa, PA in kPa, see thermo)
     #----------------------------------------------------------------------
-    df_zero = pd.DataFrame(data = np.full((len(t2m), 2), -9999))
-    
-    # Get two data series for new series for specific humidity and vapor pressure
-    vap_pres = pd.Series(df_zero[0].values, index = t2m.index, dtype = 'float')   
-    qv_s     = pd.Series(df_zero[1].values, index = t2m.index, dtype = 'float') 
-    
-    # Calculete values
-    for rfn in range(len(t2m)):
-        vap_pres[rfn] = 1000.0 * 461.5 * (t2m[rfn] + 273.15)
-        qv_s[rfn]     = 0.622 * vap_pres[rfn] / (pa[rfn] - (1 - 0.622) * vap_pres[rfn])
+    e        = thermo.vap_pres_vpd(t2m, vpd, 'hPa')
+    vap_pres = thermo.from_pa(e, 'hPa')
+    qv_s     = thermo.spec_hum(e, pa, 'kPa')
         
     #----------------------------------------------------------------------
-    # Section: Create dataframe and resample it to hourly timestep   
+    # Section: Create dataframe with actual parameters
     #----------------------------------------------------------------------       
     
-    df_FLUXNET = pd.concat([t2m, ts, le, le_corr, #rh, 
-                            vpd, pa, vap_pres, qv_s ,
-                            sh , sh_corr],  axis = 1)
+    df_out = pd.concat([t2m, ts, le, le_corr, #rh, 
+                        vpd, pa, vap_pres, qv_s ,
+                        sh , sh_corr],  axis = 1)
             
-    df_FLUXNET.columns = ['T2m', 'Ts', 'LE', 'LE_corr', #'RH',
-                          'VPD','Pa', 'VAP','QV_S', 'H', 'H_corr']
-            
-    df_FLUXNET = df_FLUXNET.resample('H').mean()
-        
-    return df_FLUXNET, st_name4plot       
-              
-# end def fluxnet_data
+    df_out.columns = ['T2m', 'Ts', 'LE', 'LE_corr', #'RH',
+                      'VPD','Pa', 'VAP','QV_S', 'H', 'H_corr']
+
+    return df_out
+# end def fluxnet_columns
+#------------------------------------------------------------------------------
+
+#------------------------------------------------------------------------------
+# Subroutine: fluxnet_stream
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the sums and numbers of FLUXNET values for
+# the time steps directly during the reading of file (aggregate-on-read). The
+# file is read by parts, the half-hourly values of each part are resampled to
+# the hourly means and the hourly means are added to the sums of steps. The
+# values of the last hour of part are moved to the next part.
+#
+# Input parameters : iPath_fluxnet - path to the FLUXNET FULLSET file
+#                    freq          - step for aggregation ('D', '5D', 'M', ...)
+#                    chunk         - number of rows in one part of file
+#
+# Output parameters: agg - object time_window.Aggregate with the sums and
+#                          numbers of values (the means - agg.mean())
+#------------------------------------------------------------------------------
+def fluxnet_stream(iPath_fluxnet, freq, chunk = 2**16):
+    acc    = twin.StepAccumulator(freq)
+    rest   = None
+    name   = None
+    sf_path, f_name = os.path.split(iPath_fluxnet)
+    reader = fluxnet_read(sf_path, f_name, cache = False, chunk = chunk)      # only actual columns
+    for part in reader:
+        if rest is not None:
+            part = pd.concat([rest, part])
+        name  = part.index.name
+        # The last hour can be continued in the next part
+        hours = part.index.floor('H')
+        last  = hours == hours[-1]
+        rest  = part[last]
+        part  = part[~last]
+        if len(part) > 0:
+            acc.add(dtp.resample_data(fluxnet_columns(part), 'H', 'mean'))
+    if rest is not None and len(rest) > 0:
+        acc.add(dtp.resample_data(fluxnet_columns(rest), 'H', 'mean'))
+    agg = acc.result(name)
+    return agg
+# end def fluxnet_stream
 #------------------------------------------------------------------------------
 
 #------------------------------------------------------------------------------
 # Subroutine: euronet_data
 #------------------------------------------------------------------------------
-# The subroutine needs for getting actual EURONET data
+# The subroutine needs for getting actual EURONET data. The yearly files are
+# read at once by several threads, each file is prepared separately (see
+# euronet_year) and saved to the binary cache, so only the changed files are
+# read again in the next runs.
 # 
 # Input parameters : main_path         - general path for research project
 #                    sf_path           - name of subfolder for FLUXNET data    
 #                    st_in     - the actual name of meteorologicl station
+#                    compact   - use the compact mode (float32)
+#                    cache     - use the binary cache (True or False)
+#                    workers   - number of threads for reading of files
+#                    year_list - years of data (None - years of the station)
 #
 # Output parameters: df_euronet - the data frame with information about EURONET data
+#                                 (on the common hourly axis if there are no
+#                                 gaps, the deleted hours are not filled, see
+#                                 time_axis)
 #------------------------------------------------------------------------------
-def euronet_data(sf_path, st_in ):
+def euronet_data(sf_path, st_in, compact = False, cache = True, workers = 4,
+                 year_list = None):
        
     # Correction of years depends on the meteostation 
-    if st_in in ('RuR','RuS'):
-        year_list = ['2011', '2012', '2013', '2014', '2015', '2016', '2017', '2018', '2019', '2020']  
-    else:
-        year_list = ['2007', '2008', '2009', '2010'] 
+    if year_list is None:
+        if st_in in ('RuR','RuS'):
+            year_list = ['2011', '2012', '2013', '2014', '2015', '2016', '2017', '2018', '2019', '2020']  
+        else:
+            year_list = ['2007', '2008', '2009', '2010'] 
     
-    # Create a correct name:
-    euronet = []
-    for year in year_list:
-        f_name = f'EFDC_L2_Flx_DE{st_in}_{year}.txt'
-        path   = f'{sf_path}{st_in}/{f_name}'
-        data =  pd.read_csv(path, skiprows = 0, sep=',', parse_dates = {'Date':[0]},
-                            header = 0, index_col = 0, skipinitialspace = True, 
-                            na_values = ['-9999'])
-            
-        euronet.append(data)        
+    # Hourly data for each year
+    def reader(year):
+        return euronet_year(sf_path, st_in, year, cache)
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers = workers) as executor:
+            euronet = list(executor.map(reader, year_list))
+    else:
+        euronet = [reader(year) for year in year_list]
     
     df = pd.concat(euronet)    
-    df = df.drop(['TIMESTAMP_END', 'DTime'], axis=1)
-    df = df.resample('H').mean()
-    df = df.dropna(how='any', axis=0, thresh=3 )
+    df = dtp.compact_data(df, compact)
+    df = tax.to_axis(df, 'H', fill = False)                                    # common time axis (missing hours are not filled)
 
     return df
 
 # end def euronet_data
 #------------------------------------------------------------------------------
 
+#------------------------------------------------------------------------------
+# Subroutine: euronet_year
+#------------------------------------------------------------------------------
+# The subroutine needs for getting hourly EURONET data of one year. The data
+# of file are resampled to hourly values and the hours with less than three
+# values are deleted (EURONET_STEPS). The result is saved to the binary cache
+# next to the EURONET file, the cache is updated automatically if the file
+# was changed.
+# 
+# Input parameters : sf_path - name of subfolder for EURONET data    
+#                    st_in   - the actual name of meteorologicl station
+#                    year    - year of data
+#                    cache   - use the binary cache (True or False)
+#
+# Output parameters: df - the data frame with hourly EURONET data (float64)
+#------------------------------------------------------------------------------
+def euronet_year(sf_path, st_in, year, cache = True):
+    f_name = f'EFDC_L2_Flx_DE{st_in}_{year}.txt'
+    folder = f'{sf_path}{st_in}/'
+    path   = f'{folder}{f_name}'
+
+    # Check the binary cache
+    if cache == True:
+        path_cache = dcache.cache_path(folder, 'euronet', f_name, EURONET_STEPS)
+        key_cache  = dcache.cache_key([path], EURONET_STEPS)
+        df, meta   = dcache.load_frame(path_cache, key_cache)
+        if df is not None:
+            return df
+
+    df = pd.read_csv(path, skiprows = 0, sep=',', parse_dates = {'Date':[0]},
+                     header = 0, index_col = 0, skipinitialspace = True, 
+                     na_values = ['-9999'])
+    df = df.drop(['TIMESTAMP_END', 'DTime'], axis=1)
+    df = dtp.resample_data(df, 'H', 'mean')
+    df = df.dropna(axis=0, thresh=3)
+
+    if cache == True:
+        dcache.save_frame(path_cache, df, key_cache)
+    return df
+# end def euronet_year
+#------------------------------------------------------------------------------
+
 
 
 #------------------------------------------------------------------------------
@@ -207,101 +460,89 @@ def euronet_data(sf_path, st_in ):
 #                    ts       - timestep for resampling
 #                    t1, t2   - dates for period
 #                    dataset  - name of datasent      
+#                    cube     - climatic cube for data (optional)
+#                    lcount   - return also the numbers of values (True or False)
+#
+# Note: the monthly values are the reductions of the climatic cube (clim_cube),
+#       the daily and hourly values are calculated by one groupby for all time
+#       windows (see time_window.window_cycle, the value of day is the mean of
+#       all values of the day), the windows without data are skipped. The
+#       mean values are calculated in float64 also for the
+#       compact data.
 #------------------------------------------------------------------------------
-def montly_data(data, period, ts):
-    m_data = data[period].resample(ts).mean()
-    m_data = m_data.reset_index()
-    num_id = m_data['index'].dt.month
-    data_m = m_data.groupby(num_id).mean()
-    # Re-indexing
-    time_index = pd.date_range('1/1/2019', '12/1/2019', freq='MS').strftime('%B')
-    data_m.index  = time_index
+def montly_data(data, period, ts, cube = None):
+    if cube is None:
+        cube  = clim.build_cube(data, periods = [period])
+        years = None
+    else:
+        years, months = clim.get_keys([period])
+    data_m = cube.monthly(ts, years).iloc[:, 0].rename(data.name)
     return data_m
 
 
-def daily_data(data, dataset, t_1, t_2, ts):   
-    list_data = [] 
-    for  tr in range(len(t_1)):
-        # Get a time period
-        if dataset in ('GLEAM', 'HYRAS'):
-            period = pd.date_range(t_1[tr], t_2[tr], freq = 'D')
-        else:
-            period = pd.date_range(t_1[tr], t_2[tr], freq = '1H')       
-              
-        d_data   = data[period].resample(ts).mean()  
-        list_data.append(d_data)    
-    # Concat all year in on dataframe
-    data_d = pd.concat(list_data, axis = 1)
-            
-    # Reset index
-    data_d = data_d.reset_index()
-    # Get day index in June 
-    d_id    = data_d['index'].dt.day    
-    data_d = data_d.groupby(d_id).mean()
-    data_d = data_d.mean(axis = 1)   
-    return data_d
-
-
-
-def hourly_data(t_1h, t_2h, data):
-    list_data = [] 
-    for  tr in range(len(t_1h)):
-        period = pd.date_range(t_1h[tr], t_2h[tr], freq = '1H')                                 
-        d_data = data[period]  
-        list_data.append(d_data)          
-    # Concat all year in on dataframe
-    data_d = pd.concat(list_data, axis = 1)    
-    # Reset index
-    data_d = data_d.reset_index()  
-    # Get day index in June 
-    d_id    = data_d['index'].dt.hour        
-    data_d = data_d.groupby(d_id).mean()
-    data_d = data_d.mean(axis = 1) 
+def daily_data(data, dataset, t_1, t_2, ts, cube = None, lcount = False):   
+    if cube is not None:
+        periods = [] 
+        for  tr in range(len(t_1)):
+            # Get a time period
+            if dataset in ('GLEAM', 'HYRAS'):
+                period = pd.date_range(t_1[tr], t_2[tr], freq = 'D')
+            else:
+                period = pd.date_range(t_1[tr], t_2[tr], freq = '1H')       
+            periods.append(period)
+        years, months = clim.get_keys(periods)
+        data_d = cube.daily(ts, years, months).iloc[:, 0].rename(None)
+        return data_d
+
+    clim.get_level(ts)                                                         # check the step ('1H' or '1D')
+    cycle  = twin.window_cycle(data, t_1, t_2, 'day')
+    data_d = cycle['mean'].rename(None)
+    if lcount == True:
+        return data_d, cycle['count'].rename(None)
     return data_d
 
 
 
+def hourly_data(t_1h, t_2h, data, cube = None, lcount = False):
+    if cube is not None:
+        periods = [] 
+        for  tr in range(len(t_1h)):
+            period = pd.date_range(t_1h[tr], t_2h[tr], freq = '1H')                                 
+            periods.append(period)
+        years, months = clim.get_keys(periods)
+        data_d = cube.diurnal(years, months).iloc[:, 0].rename(None)
+        return data_d
 
+    cycle  = twin.window_cycle(data, t_1h, t_2h, 'hour')
+    data_d = cycle['mean'].rename(None)
+    if lcount == True:
+        return data_d, cycle['count'].rename(None)
+    return data_d
 
 
+#------------------------------------------------------------------------------
+# Subroutine: data4month
+#------------------------------------------------------------------------------
+# The subroutine needs for getting data for several time windows (for example,
+# the same month in several years) in one dataframe. The timesteps of all
+# windows are labeled by the number of window at once (searchsorted) and the
+# data are resampled by one groupby (see time_window).
+#
+# Input parameters : data    - timeseries with data
+#                    dataset - name of dataset
+#                    t_1     - the first dates of time windows
+#                    t_2     - the last dates of time windows
+#                    ts      - step for resampling
+#                    hours   - hours of day for analysis (None - all hours)
+#
+# Output parameters: data_d - dataframe with data of all windows
+#------------------------------------------------------------------------------
+def data4month(data, dataset, t_1, t_2, ts, hours = None):   
+    ids    = twin.get_windows(data.index, t_1, t_2, hours)
+    data_d = twin.window_resample(data, ids, ts, 'mean')
 
-
-
-def data4month(data, dataset, t_1, t_2, ts):   
-    list_data = [] 
-    for  tr in range(len(t_1)):
-        # Get a time period
-        if dataset in ('GLEAM', 'HYRAS'):
-            period = pd.date_range(t_1[tr], t_2[tr], freq = 'D')
-        else:
-            period = pd.date_range(t_1[tr], t_2[tr], freq = '1H')       
-              
-        d_data   = data[period].resample(ts).mean()  
-        list_data.append(d_data)    
-    # Concat all year in on dataframe
-    data_d = pd.concat(list_data, axis = 0)
-            
     # Reset index
-    data_d = data_d.reset_index()
+    data_d = data_d.droplevel('window').reset_index()
     return(data_d)
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+# end def data4month
+#------------------------------------------------------------------------------
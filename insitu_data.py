@@ -8,6 +8,7 @@ The progam contains several subroutines for:
     
     get_index ---> Get time index for Linden and Lindenberg data
     stat_temp ---> statistical analysis of data
+    stat_frame --> statistical parameters from the accumulator (blocks of data)
     
 Moreover, you can use this module for preparing Linden and Lindenberg data based
 on sites original information. For this option you can parameters calc with
@@ -40,17 +41,18 @@ import sys
 import numpy as np
 import pandas as pd
 
-# Improt methods for statistical analysis
-from sklearn.metrics import mean_absolute_error
-from sklearn.metrics import mean_squared_error
+# Import personal libraries
+import data_types as dtp
+import year_chunks as ychunk
 
 
 
-def get_data(mf_com, sf_lindenberg, fn_name):
+def get_data(mf_com, sf_lindenberg, fn_name, compact = False):
     iPath = mf_com + sf_lindenberg + fn_name
     df = pd.read_csv(iPath, skiprows = 0, sep=';', dayfirst = True,
                      parse_dates = True, index_col = [0], skipinitialspace = True, 
                      na_values= ['-9999','********'])
+    df = dtp.compact_data(df, compact)                                         # float32 values for compact mode
     return df
 
 
@@ -102,42 +104,54 @@ def get_index(df):
 # Input parameters : df_model - the model dataset
 #                    ts_obs   - the timeseries with in-situ data   
 #                    name     - the name of research parameter
+#
+# Note: the common timesteps of data on the same time axis are defined by the
+#       integer offset (see time_axis.align)
 #------------------------------------------------------------------------------
 def stat_tepm(df_model, ts_obs, name):
     #stat_data = pd.concat([df_cosmo_orig['T_2M'], t2m], axis = 1)
-    stat_data = pd.concat([df_model, ts_obs], axis = 1)
-    stat_data.columns = ['MOD', 'OBS']
-    stat_data = stat_data.dropna()
-
-    mean_obs = stat_data['OBS'].mean()
-    max_obs  = stat_data['OBS'].max()
-    min_obs  = stat_data['OBS'].min()
-    std_obs  = stat_data['OBS'].std() 
-    mean_mod = stat_data['MOD'].mean()
-    max_mod  = stat_data['MOD'].max()
-    min_mod  = stat_data['MOD'].min()
-    std_mod  = stat_data['MOD'].std()      
-    mae      = mean_absolute_error(stat_data['OBS'], stat_data['MOD'])
-    rmse     = mean_squared_error(stat_data['OBS'], stat_data['MOD'])
-    corr     = stat_data['OBS'].corr(stat_data['MOD'])
+    acc = ychunk.MomentAccumulator()                                           # statistics in float64
+    acc.add(ts_obs, df_model)
+    df_stat = stat_frame(acc, name)
+    return df_stat
+# End of stat_temp
+#------------------------------------------------------------------------------
+
 
+#------------------------------------------------------------------------------
+# Subroutine: stat_frame
+#------------------------------------------------------------------------------
+#
+# The subroutine needs for getting the dataframe with statistical parameters
+# from the accumulator (the statistics can be accumulated by blocks of years,
+# see year_chunks). The column MSE contains the mean squared error (the
+# column RMSE of the old tables), the column RMSE - the root mean squared
+# error.
+# 
+# Input parameters : acc  - accumulator (year_chunks.MomentAccumulator), the
+#                           reference - in-situ data, the data - model
+#                    name - the name of research parameter
+#------------------------------------------------------------------------------
+def stat_frame(acc, name):
+    stat = acc.result()
     df_stat = pd.DataFrame({'Parameter' : [name],
-                              'Mean OBS': mean_obs,
-                              'Mean MOD': mean_mod,
-                              'Max OBS' : max_obs ,
-                              'Max MOD' : max_mod ,
-                              'Min OBS' : min_obs ,
-                              'Min MOD' : min_mod ,
-                              'STD OBS' : std_obs ,
-                              'STD_MOD' : std_mod ,
-                                  'MAE' : mae     ,
-                                 'RMSE' : rmse    ,
-                                 'CORR' : corr    })
+                              'Mean OBS': stat['mean_x'][0],
+                              'Mean MOD': stat['mean_y'][0],
+                              'Max OBS' : stat['max_x'][0] ,
+                              'Max MOD' : stat['max_y'][0] ,
+                              'Min OBS' : stat['min_x'][0] ,
+                              'Min MOD' : stat['min_y'][0] ,
+                              'STD OBS' : stat['std_x'][0] ,
+                              'STD_MOD' : stat['std_y'][0] ,
+                                  'MAE' : stat['mae'][0]   ,
+                                  'MSE' : stat['mse'][0]   ,
+                                 'RMSE' : stat['rmse'][0]  ,
+                                 'CORR' : stat['corr'][0]  })
 
     df_stat.set_index('Parameter', inplace = True)
 
     return df_stat
-# End of stat_temp
+# End of stat_frame
 #------------------------------------------------------------------------------
 
 
@@ -34,6 +34,11 @@ Version    Date       Name
 
 import pandas as pd
 
+# Import personal libraries
+import cdo_reader as cdo
+import data_types as dtp
+import time_axis as tax
+
 
 #------------------------------------------------------------------------------
 # Subroutine: get_data
@@ -41,17 +46,17 @@ import pandas as pd
 # The subroutine needs for getting timeseries based on 
 # GLEAM, EOBS or HYRAS reanalysis data
 # 
-# Input parameters : iPath - absolute path for data
-# Output parameters: ts - timeseries with intersting parameter 
+# Input parameters : iPath   - absolute path for data
+#                    compact - use the compact mode (float32)
+# Output parameters: ts - timeseries with intersting parameter (on the
+#                         common daily axis if there are no gaps and no
+#                         duplicates, see time_axis)
 #------------------------------------------------------------------------------
-def get_data(iPath):
-    df = pd.read_csv(iPath, skiprows = 0, sep=' ', parse_dates = {'Date':[1,2]},
-                     header = None)
-    df = df.drop(0, axis = 1)
-    # Get indices
-    date_index = pd.to_datetime(df['Date'])
-    # Create timeseries
-    ts = pd.Series(df[3].values, index = date_index, dtype = 'float') 
+def get_data(iPath, compact = False):
+    # Read data in the format of 'cdo outputts'
+    dtype = dtp.COMPACT_DTYPE if compact == True else dtp.ACCUM_DTYPE
+    ts = cdo.read_outputts(iPath, na_values = [], unique = False, dtype = dtype)
+    ts = tax.to_axis(ts, 'D', fill = False)                                    # common time axis (missing days are not filled)
     return ts
 # end Subroutine get_data
 #------------------------------------------------------------------------------
@@ -66,6 +71,7 @@ def get_data(iPath):
 # 
 # Input parameters : main_path   - general path for research project
 #                    sf_path     - name of subfolder for GLEAM data
+#                    compact     - use the compact mode (float32)
 #             
 # Output parameters: df_v35a  - for version v3.5a
 #                    df_v35b  - for version v3.5b
@@ -77,7 +83,7 @@ def get_data(iPath):
 #                           Et     - data for Transpiration (Et) data              
 # 
 #------------------------------------------------------------------------------
-def gleam_data(sf_path, fn_region):
+def gleam_data(sf_path, fn_region, compact = False):
       
     # Get GLEAM paths
     #--------------------------------------------------------------------------
@@ -99,12 +105,12 @@ def gleam_data(sf_path, fn_region):
     # Get data for dataset GLEAM v3.5a
     v35a = []
     for path in gleam35a_path:
-        v35a.append(get_data(path))
+        v35a.append(get_data(path, compact))
 
     # Get data for dataset GLEAM v3.5b
     v35b = []
     for path in gleam35b_path:
-        v35b.append(get_data(path))
+        v35b.append(get_data(path, compact))
 
     # Create dataframe for GLEAM v3.5a data    
     df_v35a = pd.concat(v35a, axis=1)
@@ -131,10 +137,11 @@ def gleam_data(sf_path, fn_region):
 #                    sf_path   - name of subfolder for HYRAS data
 #                    param     - list of HYRAS parameters
 #                    domain    - research region
+#                    compact   - use the compact mode (float32)
 #             
 # Output parameters: df_hyras   - temperature (C)
 #------------------------------------------------------------------------------        
-def hyras_data(sf_path, domain):
+def hyras_data(sf_path, domain, compact = False):
     
     # Types of parameters for analysis (HYRAS)
     parameters = ['T_2M', 'T_MAX', 'T_MIN', 'T_S']
@@ -142,7 +149,7 @@ def hyras_data(sf_path, domain):
     hyras_list = []
     for param in parameters:
         iPath_hyras = f'{sf_path}HYRAS_{param}_{domain}_mean.csv'
-        hyras = get_data(iPath_hyras)
+        hyras = get_data(iPath_hyras, compact)
         hyras_list.append(hyras)
     df_hyras = pd.concat(hyras_list, axis = 1)    
     df_hyras.columns = [str(i) for i in parameters]  
@@ -161,12 +168,13 @@ def hyras_data(sf_path, domain):
 # Input parameters : main_path   - general path for research project
 #                    sf_path     - name of subfolder for EOBS data
 #                    domain      - research region        
+#                    compact     - use the compact mode (float32)
 #             
 # Output parameters: t2m_eobs   - temperature (C)
 #------------------------------------------------------------------------------
-def eobs_data(sf_path, domain):
+def eobs_data(sf_path, domain, compact = False):
     iPath_eobs = sf_path + 'EOBS_T_2M_' + domain + '_mean.csv'
-    eobs = get_data(iPath_eobs)
+    eobs = get_data(iPath_eobs, compact)
     df_eobs = eobs.to_frame() 
     df_eobs.columns = ['T_2M']  
     print('Got EOBS data. Domain: ' + domain + '\n')    
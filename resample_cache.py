@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""
+The resample_cache is the program for work with the results of resampling
+which are used several times (the same dataset, parameters, time period and
+step in several modes, periods of loop or plots).
+
+The results are saved in memory with the key (dataset, parameters, time
+period, step, type of accumulation, transformation) and the key of input data
+(the arrays with values and timesteps, see data_key). The results are deleted
+when the arrays of input data are deleted, so the results of two stations or
+of the reloaded data are never mixed. The size of all results
+is limited by the budget of memory, the results which were not used for the
+longest time are deleted first (LRU). The results are read only (the arrays
+of values can not be changed), so the saved results can not be corrupted by
+the callers.
+
+The progam contains several subroutines:
+    period_key    ---> The subroutine needs for getting the key of the time
+                       period
+    table_key     ---> The subroutine needs for getting the key of the table
+                       of transformation
+    data_arrays   ---> The subroutine needs for getting the arrays with
+                       values and timesteps of input data
+    data_key      ---> The subroutine needs for getting the key of input data
+    read_only     ---> The subroutine needs for getting the read only
+                       timeseries (dataframe)
+    ResampleCache ---> The class with the results of resampling (LRU cache)
+    resample      ---> The subroutine needs for getting the resampled data
+                       of the time period with the cache
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Center for Enviromental System
+                                                   Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+# Import standart liblaries
+from collections import OrderedDict
+import hashlib
+import weakref
+import numpy as np
+import pandas as pd
+
+# Import personal libraries
+import data_types as dtp
+import time_window as twin
+
+
+# Budget of memory for the results of resampling (bytes)
+CACHE_BUDGET = 256 * 2**20
+
+
+#------------------------------------------------------------------------------
+# Subroutine: period_key
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the key of the time period. The period
+# twin.Period is described by the first and the last dates, the step and the
+# hours of day, the list of timesteps by the checksum of timesteps.
+#
+# Input parameters : period - time period (list of timesteps or twin.Period)
+#
+# Output parameters: key - the key of the period (tuple)
+#------------------------------------------------------------------------------
+def period_key(period):
+    if period is None:
+        return None
+    if isinstance(period, twin.Period):
+        hours = None if period.hours is None else tuple(period.hours.nonzero()[0])
+        return ('period', period.start.value, period.stop.value, period.freq, hours)
+    time = pd.DatetimeIndex(period).asi8
+    return ('index', len(time), hashlib.sha1(time.tobytes()).hexdigest())
+# end def period_key
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: table_key
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the key of the table of transformation
+# (see cosmo_data.get_transform)
+#
+# Input parameters : table - table of transformation (None - mean values)
+#
+# Output parameters: key - the key of the table (tuple)
+#------------------------------------------------------------------------------
+def table_key(table):
+    if table is None:
+        return None
+    return tuple(table.itertuples(name = None))
+# end def table_key
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: data_arrays
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the arrays with values and timesteps of
+# input data (timeseries, dataframe, store of COSMO experiments or list of
+# them). The arrays are the views of the arrays which hold the memory (base).
+#
+# Input parameters : data - input data
+#
+# Output parameters: arrays - list with arrays
+#------------------------------------------------------------------------------
+def data_arrays(data):
+    if isinstance(data, (list, tuple)):
+        return [array for item in data for array in data_arrays(item)]
+    if hasattr(data, 'cube'):                                                  # store of COSMO experiments
+        return [data.cube, data.time.asi8]
+    if isinstance(data, pd.Series):
+        return [data.to_numpy(), data.index.asi8]
+    arrays = [data.iloc[:, j].to_numpy() for j in range(data.shape[1])]
+    return arrays + [data.index.asi8]
+# end def data_arrays
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: data_key
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the key of input data. Each array is
+# described by the base array (the id of object), the address of the first
+# value, the shape and the strides, so the key is different for the different
+# data and for the different views (rows, columns) of the same data.
+#
+# Input parameters : arrays - list with arrays (see data_arrays)
+#
+# Output parameters: key   - the key of input data (tuple)
+#                    bases - list with base arrays
+#------------------------------------------------------------------------------
+def data_key(arrays):
+    key   = []
+    bases = []
+    for array in arrays:
+        base = array
+        while isinstance(base.base, np.ndarray):
+            base = base.base
+        key.append((id(base), array.__array_interface__['data'][0], array.shape,
+                    array.strides))
+        bases.append(base)
+    return tuple(key), bases
+# end def data_key
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: read_only
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the read only timeseries (dataframe), the
+# values are the read only array (the assignment raises ValueError)
+#
+# Input parameters : data - timeseries or dataframe
+#
+# Output parameters: data - the read only timeseries or dataframe
+#------------------------------------------------------------------------------
+def read_only(data):
+    values = data.to_numpy(copy = True)
+    values.flags.writeable = False
+    if isinstance(data, pd.Series):
+        return pd.Series(values, index = data.index, name = data.name, copy = False)
+    return pd.DataFrame(values, index = data.index, columns = data.columns, copy = False)
+# end def read_only
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Class: ResampleCache
+#------------------------------------------------------------------------------
+# The class with the results of resampling (LRU cache). The numbers of found
+# results (hits), of new results (misses) and of deleted results (evictions)
+# are counted. The results with the key of input data are deleted when the
+# base arrays of input data are deleted (the ids of arrays can be reused).
+#
+# Input parameters : budget - budget of memory for all results (bytes)
+#------------------------------------------------------------------------------
+class ResampleCache(object):
+
+    def __init__(self, budget = CACHE_BUDGET):
+        self.budget    = budget
+        self.entries   = OrderedDict()
+        self.sources   = {}                                                    # id of base array ---> keys
+        self.size      = 0
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+
+    # Result for the key (None - the result is not in the cache)
+    def get(self, key):
+        if key not in self.entries:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return self.entries[key][0]
+
+    # Save the result, the results which were not used for the longest time
+    # are deleted (the result larger than the budget is not saved)
+    def put(self, key, data):
+        data = read_only(data)
+        size = int(data.memory_usage(index = True).sum()) if isinstance(data, pd.DataFrame) \
+               else int(data.memory_usage(index = True))
+        if key in self.entries:
+            self.size -= self.entries.pop(key)[1]
+        if size <= self.budget:
+            self.entries[key] = (data, size)
+            self.size += size
+        while self.size > self.budget:
+            old_key, (old_data, old_size) = self.entries.popitem(last = False)
+            self.size      -= old_size
+            self.evictions += 1
+        return data
+
+    # Result for the key, the function is called only if the result is not
+    # in the cache. The key of input data (source) is added to the key.
+    def memo(self, key, func, source = None):
+        bases = []
+        if source is not None:
+            source_key, bases = data_key(data_arrays(source))
+            key = (key, source_key)
+        data = self.get(key)
+        if data is None:
+            data = self.put(key, func())
+            if key in self.entries:
+                for base in bases:
+                    self.watch(base, key)
+        return data
+
+    # The result is deleted when the base array is deleted
+    def watch(self, base, key):
+        i = id(base)
+        if i not in self.sources:
+            self.sources[i] = set()
+            weakref.finalize(base, self.release, i)
+        self.sources[i].add(key)
+
+    # Delete the results of the deleted base array
+    def release(self, i):
+        for key in self.sources.pop(i, ()):
+            if key in self.entries:
+                self.size -= self.entries.pop(key)[1]
+
+    # Delete all results (the counters are not changed)
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    # Information about the cache
+    def info(self):
+        return {'entries'  : len(self.entries),
+                'size'     : self.size,
+                'budget'   : self.budget,
+                'hits'     : self.hits,
+                'misses'   : self.misses,
+                'evictions': self.evictions}
+# end class ResampleCache
+#------------------------------------------------------------------------------
+
+
+# The common cache of the project
+CACHE = ResampleCache()
+
+
+#------------------------------------------------------------------------------
+# Subroutine: resample
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the resampled data of the time period with
+# the cache (data[period].resample(ts).how()), all timesteps of the period
+# have to be in data (like the selection by labels).
+#
+# Input parameters : data    - timeseries or dataframe
+#                    dataset - name of dataset (the key of data in the cache
+#                              with the key of input data)
+#                    period  - time period (list of timesteps or twin.Period)
+#                    ts      - step for resampling
+#                    how     - type of accumulation ('mean', 'sum', 'std')
+#                    cache   - the cache (ResampleCache)
+#
+# Output parameters: data - resampled data (read only)
+#------------------------------------------------------------------------------
+def resample(data, dataset, period, ts, how = 'mean', cache = CACHE):
+    params = data.name if isinstance(data, pd.Series) else tuple(data.columns)
+    key    = (dataset, params, period_key(period), ts, how, None)
+
+    def func():
+        values = data.iloc[twin.get_rows(data.index, period)]
+        return dtp.resample_data(values, ts, how)
+    return cache.memo(key, func, data)
+# end def resample
+#------------------------------------------------------------------------------
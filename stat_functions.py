@@ -47,6 +47,9 @@ import math
 import numpy as np
 import pandas as pd
 
+# Import personal libraries
+import cdo_reader as cdo
+
 
 #------------------------------------------------------------------------------
 # Subroutine: get_data
@@ -254,14 +257,8 @@ def KGE_RMSD_analysis(path_main, fn_region, par_list, refer, ds_name, vrs_GLEAM)
 # Output parameters: ts      - timeseries with intersting parameter 
 #------------------------------------------------------------------------------
 def get_dav(iPath, ts_name):
-    df = pd.read_csv(iPath, skiprows = 0, sep=' ', parse_dates = {'Date':[1,2]},
-                     header = None)
-    df = df.drop(0, axis = 1)
-    # Get indices
-    date_index = pd.to_datetime(df['Date'])
-    # Create timeseries
-    ts = pd.Series(df[3].values, index = date_index, dtype = 'float') 
-    ts = ts.rename(ts_name)
+    # Read data in the format of 'cdo outputts'
+    ts = cdo.read_outputts(iPath, ts_name, na_values = [], unique = False)
     return ts
 # end Subroutine get_data
 #------------------------------------------------------------------------------
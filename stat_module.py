@@ -63,6 +63,9 @@ import reanalysis_data   as radata
 import vis_module        as vsp                                                 
 import insitu_data       as isd
 import stat_functions    as stf                                                
+import time_window       as twin
+import year_chunks       as ychunk
+import resample_cache    as rcache
 
 
 
@@ -168,6 +171,37 @@ else:
 # Name of COSMO data
 fn_cosmo = '_ts_mean_1999_2015.csv'
 
+# Number of workers for reading COSMO files
+n_workers = 4
+
+# Store values as float32 (compact mode), the statistics are calculated
+# in float64
+lcompact = False
+
+# Time window of COSMO data, only the months of the window are read from the
+# COSMO files (None - all data, for example '2010-01-01' and '2015-12-31 23')
+cosmo_start = None
+cosmo_stop  = None
+
+# Read COSMO files on demand (True or False), mode 5 doesn't need the
+# COSMO experiments, only T_2M from the old COSMO data
+llazy = (mode == 5)
+
+# Use the memory mapped store for COSMO experiments (True or False)
+lcube    = False
+sf_cube  = mf_com + 'COSMO/' + domain + '/CUBE/'
+exp_name = ['CCLMref', 'CCLMv3.5', 'CCLMv4.5', 'CCLMv4.5e']
+
+# Read COSMO data by blocks of years (True or False), only the COSMO data of
+# one block are in memory, the climatic cubes and the statistics are
+# accumulated by blocks (modes 1, 2, 3 and 6, long COSMO runs). In mode 6 the
+# gaps of COSMO data are interpolated inside each block, so the gaps at the
+# borders of blocks are not filled (the statistics can differ slightly from
+# the statistics for all data)
+lchunk      = False
+chunk_years = 1
+lblocks     = lchunk == True and mode in (1, 2, 3, 6)
+
 # Input station
 input_station = 'RuR'
 
@@ -272,19 +306,43 @@ else:
 #------------------------------------------------------------------------------
 # Get initial data
 #------------------------------------------------------------------------------
-df_cclm_ref  = csm_data.cosmo_data(sf_cclm_ref , fn_cosmo, clm_name)           # Get COSMO_ref  data
-df_cclm_v35  = csm_data.cosmo_data(sf_cclm_v35 , fn_cosmo, clm_name)           # Get COSMOv3.5  data
-df_cclm_v45  = csm_data.cosmo_data(sf_cclm_v45 , fn_cosmo, clm_name)           # Get COSMOv4.5  data
-df_cclm_v45e = csm_data.cosmo_data(sf_cclm_v45e, fn_cosmo, clm_name)           # Get COSMOv4.5e data
+sf_exp = [sf_cclm_ref, sf_cclm_v35, sf_cclm_v45, sf_cclm_v45e]                 # Paths for COSMO experiments
+
+if lblocks == True:                                                            # COSMO data are read by blocks of years in the modes
+    df_cclm_ref  = None
+    df_cclm_v35  = None
+    df_cclm_v45  = None
+    df_cclm_v45e = None
+elif lcube == True:                                                              # Get COSMO data from the memory mapped store
+    store = csm_data.cosmo_store(sf_cube, [sf_cclm_ref, sf_cclm_v35, sf_cclm_v45, sf_cclm_v45e],
+                                 exp_name, fn_cosmo, clm_name, workers = n_workers,
+                                 compact = lcompact, start = cosmo_start, stop = cosmo_stop)
+    df_cclm_ref  = store.frame('CCLMref'  )                                    # Get COSMO_ref  data
+    df_cclm_v35  = store.frame('CCLMv3.5' )                                    # Get COSMOv3.5  data
+    df_cclm_v45  = store.frame('CCLMv4.5' )                                    # Get COSMOv4.5  data
+    df_cclm_v45e = store.frame('CCLMv4.5e')                                    # Get COSMOv4.5e data
+else:
+    df_cclm_ref  = csm_data.cosmo_data(sf_cclm_ref , fn_cosmo, clm_name,
+                                       workers = n_workers, lazy = llazy, compact = lcompact,
+                                       start = cosmo_start, stop = cosmo_stop) # Get COSMO_ref  data
+    df_cclm_v35  = csm_data.cosmo_data(sf_cclm_v35 , fn_cosmo, clm_name,
+                                       workers = n_workers, lazy = llazy, compact = lcompact,
+                                       start = cosmo_start, stop = cosmo_stop) # Get COSMOv3.5  data
+    df_cclm_v45  = csm_data.cosmo_data(sf_cclm_v45 , fn_cosmo, clm_name,
+                                       workers = n_workers, lazy = llazy, compact = lcompact,
+                                       start = cosmo_start, stop = cosmo_stop) # Get COSMOv4.5  data
+    df_cclm_v45e = csm_data.cosmo_data(sf_cclm_v45e, fn_cosmo, clm_name,
+                                       workers = n_workers, lazy = llazy, compact = lcompact,
+                                       start = cosmo_start, stop = cosmo_stop) # Get COSMOv4.5e data
 
 # The FLUXNET and EURONET has a hourly timestep
-df_fluxnet, station_name_plot = flnt.fluxnet_data(sf_fluxnet, input_station)   # get FLUXNET data
-df_euronet                    = flnt.euronet_data(sf_euronet, input_station)   # get EORONET data        
+df_fluxnet, station_name_plot = flnt.fluxnet_data(sf_fluxnet, input_station, lcompact) # get FLUXNET data
+df_euronet                    = flnt.euronet_data(sf_euronet, input_station, lcompact) # get EORONET data        
         
 # The GLEAM, E-OBS and HYRAS datasets has a daily timestep
-df_eobs          = radata.eobs_data(sf_eobs, fn_region)                        # get E-OBS data
-df_hyras         = radata.hyras_data(sf_hyras, fn_region)                      # get HYRAS data
-df_v35a, df_v35b = radata.gleam_data(sf_gleam, fn_region)                      # get GLEAM data
+df_eobs          = radata.eobs_data(sf_eobs, fn_region, lcompact)              # get E-OBS data
+df_hyras         = radata.hyras_data(sf_hyras, fn_region, lcompact)            # get HYRAS data
+df_v35a, df_v35b = radata.gleam_data(sf_gleam, fn_region, lcompact)            # get GLEAM data
 
 
 #------------------------------------------------------------------------------
@@ -294,7 +352,7 @@ if input_region == '1':
     print ('We are using data from FLUXNET for PARC domain')    
 else:
     print ('We are using data from Linden or Lindenberg')
-    df_in_situ = isd.get_data(mf_com, sf_in_situ, fn_in_situ)
+    df_in_situ = isd.get_data(mf_com, sf_in_situ, fn_in_situ, lcompact)
     df_in_situ = df_in_situ[~df_in_situ.index.duplicated()]
 
 
@@ -302,6 +360,15 @@ else:
 # Main part
 #------------------------------------------------------------------------------
 
+# Get climatic cubes for COSMO experiments (one pass over hourly data, all
+# data or by blocks of years)
+def get_cubes(periods):
+    if lblocks == True:
+        return csm_data.cosmo_cubes_blocks(sf_exp, fn_cosmo, clm_name, periods, chunk_years,
+                                           workers = n_workers, compact = lcompact)
+    return csm_data.cosmo_cubes([df_cclm_ref, df_cclm_v35, df_cclm_v45, df_cclm_v45e],
+                                clm_name, periods)
+
 #------------------------------------------------------------------------------
 # Get average monhtly values (climatic)
 #------------------------------------------------------------------------------
@@ -317,17 +384,18 @@ if mode == 1:
     #--------------------------------------------------------------------------
     # Create time periods 
     #-------------------------------------------------------------------------- 
-    hourly_period = pd.date_range(time_start[0], time_stop[0], freq = 'H')     # hourly timesteps
-    daily_period  = pd.date_range(time_start[0], time_stop[0], freq = 'D')     # dayly timesteps 
+    hourly_period = twin.Period(time_start[0], time_stop[0], 'H')              # hourly timesteps
+    daily_period  = hourly_period.days()                                       # dayly timesteps 
         
     # General time period for COSMO, FLUXNET and EURONET data
-    res_period   = [x for x in hourly_period if x.hour >= t_start and x.hour <= t_stop]
+    res_period   = twin.Period(time_start[0], time_stop[0], 'H', range(t_start, t_stop + 1))
 
     # Get COSMO data
-    cclm_ref  = csm_data.cosmo_montly_data(df_cclm_ref , clm_name, hourly_period, time_step )
-    cclm_v35  = csm_data.cosmo_montly_data(df_cclm_v35 , clm_name, hourly_period, time_step )
-    cclm_v45  = csm_data.cosmo_montly_data(df_cclm_v45 , clm_name, hourly_period, time_step )
-    cclm_v45e = csm_data.cosmo_montly_data(df_cclm_v45e, clm_name, hourly_period, time_step )    
+    cubes     = get_cubes([hourly_period])
+    cclm_ref  = csm_data.cosmo_montly_data(df_cclm_ref , clm_name, hourly_period, time_step, cubes[0])
+    cclm_v35  = csm_data.cosmo_montly_data(df_cclm_v35 , clm_name, hourly_period, time_step, cubes[1])
+    cclm_v45  = csm_data.cosmo_montly_data(df_cclm_v45 , clm_name, hourly_period, time_step, cubes[2])
+    cclm_v45e = csm_data.cosmo_montly_data(df_cclm_v45e, clm_name, hourly_period, time_step, cubes[3])    
 
     # Get FLUXNET and EURONET data     
     if input_region == '1':                                                    # Parc
@@ -390,21 +458,23 @@ elif mode == 2:                                                                #
     periods_days = [] 
     
     for time_index in range(len(time_start)):
-        hourly_period = pd.date_range(time_start[time_index],
-                                      time_stop[time_index], freq = 'H')       # hourly timesteps
+        hourly_period = twin.Period(time_start[time_index],
+                                    time_stop[time_index], 'H')                # hourly timesteps
         
-        daily_period  = pd.date_range(time_start[time_index],
-                                      time_stop[time_index], freq = 'D')       # dayly timesteps 
+        daily_period  = hourly_period.days()                                   # dayly timesteps 
         
         periods_hour.append(hourly_period)
         periods_days.append(daily_period)
     
      
+    # Get climatic cubes for COSMO experiments (one pass over hourly data)
+    cubes = get_cubes(periods_hour)
+    
     # Get climatic mean values for each day in June for COSMO data
-    cclm_ref  = csm_data.cosmo_daily_data(df_cclm_ref , clm_name, periods_hour, time_step) 
-    cclm_v35  = csm_data.cosmo_daily_data(df_cclm_v35 , clm_name, periods_hour, time_step) 
-    cclm_v45  = csm_data.cosmo_daily_data(df_cclm_v45 , clm_name, periods_hour, time_step) 
-    cclm_v45e = csm_data.cosmo_daily_data(df_cclm_v45e, clm_name, periods_hour, time_step) 
+    cclm_ref  = csm_data.cosmo_daily_data(df_cclm_ref , clm_name, periods_hour, time_step, cubes[0]) 
+    cclm_v35  = csm_data.cosmo_daily_data(df_cclm_v35 , clm_name, periods_hour, time_step, cubes[1]) 
+    cclm_v45  = csm_data.cosmo_daily_data(df_cclm_v45 , clm_name, periods_hour, time_step, cubes[2]) 
+    cclm_v45e = csm_data.cosmo_daily_data(df_cclm_v45e, clm_name, periods_hour, time_step, cubes[3]) 
  
     # Get Hyras data
     t2m   = flnt.daily_data(df_hyras['T_2M'] , 'HYRAS', time_start, time_stop, time_step)  
@@ -468,21 +538,23 @@ elif mode == 3:
     periods_days = [] 
     
     for time_index in range(len(time_start)):
-        hourly_period = pd.date_range(time_start[time_index],
-                                      time_stop[time_index], freq = 'H')       # hourly timesteps
+        hourly_period = twin.Period(time_start[time_index],
+                                    time_stop[time_index], 'H')                # hourly timesteps
         
-        daily_period  = pd.date_range(time_start[time_index],
-                                      time_stop[time_index], freq = 'D')       # dayly timesteps 
+        daily_period  = hourly_period.days()                                   # dayly timesteps 
         
         periods_hour.append(hourly_period)
         periods_days.append(daily_period)    
 
     time_step = '1H'
+    # Get climatic cubes for COSMO experiments (one pass over hourly data)
+    cubes = get_cubes(periods_hour)
+    
     # Get COSMO data
-    cclm_ref  = csm_data.cosmo_hd(df_cclm_ref , clm_name, periods_hour, time_step) 
-    cclm_v35  = csm_data.cosmo_hd(df_cclm_v35 , clm_name, periods_hour, time_step) 
-    cclm_v45  = csm_data.cosmo_hd(df_cclm_v45 , clm_name, periods_hour, time_step) 
-    cclm_v45e = csm_data.cosmo_hd(df_cclm_v45e, clm_name, periods_hour, time_step) 
+    cclm_ref  = csm_data.cosmo_hd(df_cclm_ref , clm_name, periods_hour, time_step, cubes[0]) 
+    cclm_v35  = csm_data.cosmo_hd(df_cclm_v35 , clm_name, periods_hour, time_step, cubes[1]) 
+    cclm_v45  = csm_data.cosmo_hd(df_cclm_v45 , clm_name, periods_hour, time_step, cubes[2]) 
+    cclm_v45e = csm_data.cosmo_hd(df_cclm_v45e, clm_name, periods_hour, time_step, cubes[3]) 
     
     
     # Get FLUXNET data
@@ -548,10 +620,12 @@ elif mode == 4:
         time_step = '1H'
 
         
-        cclm_ref  = csm_data.get_timeseries(df_cclm_ref , clm_name, period, time_step)
-        cclm_v35  = csm_data.get_timeseries(df_cclm_v35 , clm_name, period, time_step)
-        cclm_v45  = csm_data.get_timeseries(df_cclm_v45 , clm_name, period, time_step)
-        cclm_v45e = csm_data.get_timeseries(df_cclm_v45e, clm_name, period, time_step)
+        cclm_exp  = csm_data.get_timeseries_exp([df_cclm_ref, df_cclm_v35, df_cclm_v45, df_cclm_v45e],
+                                                exp_name, clm_name, period, time_step)
+        cclm_ref  = cclm_exp['CCLMref'  ]
+        cclm_v35  = cclm_exp['CCLMv3.5' ]
+        cclm_v45  = cclm_exp['CCLMv4.5' ]
+        cclm_v45e = cclm_exp['CCLMv4.5e']
     
     
   
@@ -598,9 +672,11 @@ elif mode == 5:
                                        time_stop[index], freq = 'D')           # dayly timesteps   
      
         if cosmo_mode == True:
-            df_old        = csm_data.cosmo_data(cosmo_old, fn_cosmo, clm_name) # Get COSMO_ref  data
-            df_cosmo_data = csm_data.get_timeseries(df_old, clm_name,
-                                                    hourly_period, time_step)        
+            df_old        = csm_data.cosmo_data(cosmo_old, fn_cosmo, clm_name, 
+                                                lazy = True, start = cosmo_start,
+                                                stop = cosmo_stop)             # Get COSMO_ref  data (on demand)
+            df_cosmo_data = csm_data.get_timeseries(df_old, ['T_2M'],
+                                                    hourly_period, time_step)  # Only T_2M is read      
             # Get COSMO data
             extrem, super_hot, super_col = extreme_data(df_cosmo_data['T_2M'])
             
@@ -641,109 +717,85 @@ elif mode == 6:
     
     time_step = '1D'
     
-    cclm_ref  = csm_data.get_timeseries(df_cclm_ref , clm_name, period, time_step)  
-    cclm_v35  = csm_data.get_timeseries(df_cclm_v35 , clm_name, period, time_step)
-    cclm_v45  = csm_data.get_timeseries(df_cclm_v45 , clm_name, period, time_step)
-    cclm_v45e = csm_data.get_timeseries(df_cclm_v45e, clm_name, period, time_step)
-    
-    # Get COSMO data           
-    cclm_ref  = cclm_ref.interpolate()
-    cclm_v35  = cclm_v35.interpolate()
-    cclm_v45  = cclm_v45.interpolate()
-    cclm_v45e = cclm_v45e.interpolate()
-    
+    # Mean values of observations (the cache of resampling)
     #Get Hyras data
-    t2m  = df_hyras['T_2M'][period_GL].resample(time_step).mean()
-    tmax = df_hyras['T_MAX'][period_GL].resample(time_step).mean()
-    tmin = df_hyras['T_MIN'][period_GL].resample(time_step).mean()
-    ts   = df_hyras['T_S'][period_GL].resample(time_step).mean()
+    t2m  = rcache.resample(df_hyras['T_2M'] , 'HYRAS', period_GL, time_step)
+    tmax = rcache.resample(df_hyras['T_MAX'], 'HYRAS', period_GL, time_step)
+    tmin = rcache.resample(df_hyras['T_MIN'], 'HYRAS', period_GL, time_step)
+    ts   = rcache.resample(df_hyras['T_S']  , 'HYRAS', period_GL, time_step)
     
     # Get GLEAM v3.5a data
-    gl_Epa = df_v35a['Ep'][period_GL].resample(time_step).mean()  
-    gl_Eta = df_v35a['Et'][period_GL].resample(time_step).mean()
+    gl_Epa = rcache.resample(df_v35a['Ep'], 'GLEAM_v3.5a', period_GL, time_step)
+    gl_Eta = rcache.resample(df_v35a['Et'], 'GLEAM_v3.5a', period_GL, time_step)
     # Get GLEAM v3.5b data    
-    gl_Epb = df_v35b['Ep'][period_GL].resample(time_step).mean()  
-    gl_Etb = df_v35b['Et'][period_GL].resample(time_step).mean()  
+    gl_Epb = rcache.resample(df_v35b['Ep'], 'GLEAM_v3.5b', period_GL, time_step)
+    gl_Etb = rcache.resample(df_v35b['Et'], 'GLEAM_v3.5b', period_GL, time_step)
 
     if input_region == '1':
         # Parc
-        lh_stat = df_fluxnet['LE'][period].resample(time_step).mean()
-        sh_stat = df_euronet['H'][period].resample(time_step).mean()                                   
+        lh_stat = rcache.resample(df_fluxnet['LE'], 'FLUXNET', period, time_step)
+        sh_stat = rcache.resample(df_euronet['H'] , 'EURONET', period, time_step)
     elif input_region == '2':
         # Linden
-        lh_stat = df_in_situ['LatHeat'][period].resample(time_step).mean()
-        sh_stat = df_in_situ['SensHeat'][period].resample(time_step).mean()            
+        lh_stat = rcache.resample(df_in_situ['LatHeat'] , 'IN-SITU', period, time_step)
+        sh_stat = rcache.resample(df_in_situ['SensHeat'], 'IN-SITU', period, time_step)
     else:
         # Lindenberg
-        lh_stat = df_in_situ['LHFL_1'][period].resample(time_step).mean()
-        sh_stat = df_in_situ['SHFL_1'][period].resample(time_step).mean()   
+        lh_stat = rcache.resample(df_in_situ['LHFL_1'], 'IN-SITU', period, time_step)
+        sh_stat = rcache.resample(df_in_situ['SHFL_1'], 'IN-SITU', period, time_step)
               
     
-    # Statistic for COSMO_CTR according to in-situ, reanalysis and satellite data
-    t2m_st_orig      = isd.stat_tepm(cclm_ref['T_2M']   , t2m   , 'CCLMref_T2M'       )
-    tmax_st_orig     = isd.stat_tepm(cclm_ref['TMAX_2M'], tmax  , 'CCLMref_TMAX'      )
-    tmin_st_orig     = isd.stat_tepm(cclm_ref['TMIN_2M'], tmin  , 'CCLMref_TMIN'      )
-    ts_st_orig       = isd.stat_tepm(cclm_ref['T_S']    , ts    , 'CCLMref_TS'        )
-    aevap_st_orig_a  = isd.stat_tepm(cclm_ref['AEVAP_S'], gl_Eta, 'CCLMref_Eta'       ) 
-    aevap_st_orig_b  = isd.stat_tepm(cclm_ref['AEVAP_S'], gl_Etb, 'CCLMref_Etb'       )  
-    zverbo_st_orig_a = isd.stat_tepm(cclm_ref['ZVERBO'] , gl_Epa, 'CCLMref_Epa'       ) 
-    zverbo_st_orig_b = isd.stat_tepm(cclm_ref['ZVERBO'] , gl_Epb, 'CCLMref_Epb'       ) 
-    ashfl_st_orig    = isd.stat_tepm(cclm_ref['ASHFL_S'], sh_stat,'CCLMref_ASHFL_FL'  )
-    alhfl_st_orig    = isd.stat_tepm(cclm_ref['ALHFL_S'], lh_stat,'CCLMref_ALHFL_EU'  )
-    # Statistic for COSMO_v3.5 according to in-situ, reanalysis and satellite data
-    t2m_st_35        = isd.stat_tepm(cclm_v35['T_2M']    , t2m   , 'CCLMv3.5_T2M'     )
-    tmax_st_35       = isd.stat_tepm(cclm_v35['TMAX_2M'] , tmax  , 'CCLMv3.5_TMAX'    )
-    tmin_st_35       = isd.stat_tepm(cclm_v35['TMIN_2M'] , tmin  , 'CCLMv3.5_TMIN'    )
-    ts_st_35         = isd.stat_tepm(cclm_v35['T_S']     , ts    , 'CCLMv3.5_TS'      )
-    aevap_st_35_a    = isd.stat_tepm(cclm_v35['AEVAP_S'] , gl_Eta, 'CCLMv3.5_Eta'     )
-    aevap_st_35_b    = isd.stat_tepm(cclm_v35['AEVAP_S'] , gl_Etb, 'CCLMv3.5_Etb'     )
-    zverbo_st_35_a   = isd.stat_tepm(cclm_v35['ZVERBO']  , gl_Epa, 'CCLMv3.5_Epa'     )
-    zverbo_st_35_b   = isd.stat_tepm(cclm_v35['ZVERBO']  , gl_Epb, 'CCLMv3.5_Epb'     )
-    ashfl_st_35      = isd.stat_tepm(cclm_v35['ASHFL_S'] , sh_stat,'CCLMv3.5_ASHFL_FL')
-    alhfl_st_35      = isd.stat_tepm(cclm_v35['ALHFL_S'] , lh_stat,'CCLMv3.5_ALHFL_FL')
-    # Statistic for COSMO_v4.5 according to in-situ, reanalysis and satellite data
-    t2m_st_45       = isd.stat_tepm(cclm_v45['T_2M']    , t2m   , 'CCLMv4.5_T2M'      )
-    tmax_st_45      = isd.stat_tepm(cclm_v45['TMAX_2M'] , tmax  , 'CCLMv4.5_TMAX'     )
-    tmin_st_45      = isd.stat_tepm(cclm_v45['TMIN_2M'] , tmin  , 'CCLMv4.5_TMIN'     )
-    ts_st_45        = isd.stat_tepm(cclm_v45['T_S']     , ts    , 'CCLMv4.5_TS'       )
-    aevap_st_45_a   = isd.stat_tepm(cclm_v45['AEVAP_S'] , gl_Eta, 'CCLMv4.5_Eta'      )
-    aevap_st_45_b   = isd.stat_tepm(cclm_v45['AEVAP_S'] , gl_Etb, 'CCLMv4.5_Etb'      )
-    zverbo_st_45_a  = isd.stat_tepm(cclm_v45['ZVERBO']  , gl_Epa, 'CCLMv4.5_Epa'      )
-    zverbo_st_45_b  = isd.stat_tepm(cclm_v45['ZVERBO']  , gl_Epb, 'CCLMv4.5_Epb'      )
-    ashfl_st_45     = isd.stat_tepm(cclm_v45['ASHFL_S'] , sh_stat,'CCLMv4.5_ASHFL_FL' )
-    alhfl_st_45     = isd.stat_tepm(cclm_v45['ALHFL_S'] , lh_stat,'CCLMv4.5_ALHFL_FL' )
-    # Statistic for COSMO_v4.5e according to in-situ, reanalysis and satellite data
-    t2m_st_45e      = isd.stat_tepm(cclm_v45e['T_2M']   , t2m   , 'CCLMv4.5e_T2M'     )
-    tmax_st_45e     = isd.stat_tepm(cclm_v45e['TMAX_2M'], tmax  , 'CCLMv4.5e_TMAX'    )
-    tmin_st_45e     = isd.stat_tepm(cclm_v45e['TMIN_2M'], tmin  , 'CCLMv4.5e_TMIN'    )
-    ts_st_45e       = isd.stat_tepm(cclm_v45e['T_S']    , ts    , 'CCLMv4.5e_TS'      )
-    aevap_st_45e_a  = isd.stat_tepm(cclm_v45e['AEVAP_S'], gl_Eta, 'CCLMv4.5e_Eta'     )
-    aevap_st_45e_b  = isd.stat_tepm(cclm_v45e['AEVAP_S'], gl_Etb, 'CCLMv4.5e_Etb'     )
-    zverbo_st_45e_a = isd.stat_tepm(cclm_v45e['ZVERBO'] , gl_Epa, 'CCLMv4.5e_Epa'     )
-    zverbo_st_45e_b = isd.stat_tepm(cclm_v45e['ZVERBO'] , gl_Epb, 'CCLMv4.5e_Epb'     )
-    ashfl_st_45e    = isd.stat_tepm(cclm_v45e['ASHFL_S'], sh_stat,'CCLMv4.5e_ASHFL_FL')
-    alhfl_st_45e    = isd.stat_tepm(cclm_v45e['ALHFL_S'], lh_stat,'CCLMv4.5e_ALHFL_FL')
-    
-    df_stat_temp = pd.concat([t2m_st_orig       , t2m_st_35       , t2m_st_45       , t2m_st_45e       ,
-                              tmax_st_orig      , tmax_st_35      , tmax_st_45      , tmax_st_45e      ,
-                              tmin_st_orig      , tmin_st_35      , tmin_st_45      , tmin_st_45e      ,
-                              ts_st_orig        , ts_st_35        , ts_st_45        , ts_st_45e        ,
-                              aevap_st_orig_a   , aevap_st_35_a   , aevap_st_45_a   , aevap_st_45e_a   ,
-                              aevap_st_orig_b   , aevap_st_35_b   , aevap_st_45_b   , aevap_st_45e_b   ,
-                              zverbo_st_orig_a  , zverbo_st_35_a  , zverbo_st_45_a  , zverbo_st_45e_a  ,
-                              zverbo_st_orig_b  , zverbo_st_35_b  , zverbo_st_45_b  , zverbo_st_45e_b  ,
-                              ashfl_st_orig     , ashfl_st_35     , ashfl_st_45     , ashfl_st_45e     ,
-                              alhfl_st_orig     , alhfl_st_35     , alhfl_st_45     , alhfl_st_45e    ], axis = 0)
+    # Pairs for statistics: COSMO parameter, observations, name (the same rows
+    # of temp_stat.xlsx for all data or by blocks of years)
+    obs_pairs = [('T_2M'   , t2m    , 'T2M'     ), ('TMAX_2M', tmax   , 'TMAX'    ),
+                 ('TMIN_2M', tmin   , 'TMIN'    ), ('T_S'    , ts     , 'TS'      ),
+                 ('AEVAP_S', gl_Eta , 'Eta'     ), ('AEVAP_S', gl_Etb , 'Etb'     ),
+                 ('ZVERBO' , gl_Epa , 'Epa'     ), ('ZVERBO' , gl_Epb , 'Epb'     ),
+                 ('ASHFL_S', sh_stat, 'ASHFL_FL'), ('ALHFL_S', lh_stat, 'ALHFL_FL')]
+
+    if lblocks == True:
+        # Statistics are accumulated by blocks of years (COSMO data of one block)
+        acc_temp  = {(exp, name): ychunk.MomentAccumulator() for param, obs, name in obs_pairs
+                                                             for exp in exp_name}
+        acc_cosmo = ychunk.MomentAccumulator()
+        for t_1, t_2 in ychunk.get_blocks(period[0], period[-1], chunk_years):
+            frames   = [csm_data.cosmo_data(sf_path, fn_cosmo, clm_name, cache = False,
+                                            workers = n_workers, compact = lcompact,
+                                            start = t_1, stop = t_2)
+                        for sf_path in sf_exp]                                 # no binary cache of blocks
+            cclm_exp = csm_data.get_timeseries_exp(frames, exp_name, clm_name,
+                                                   ychunk.block_index(period, t_1, t_2), time_step)
+            cclm_block = [cclm_exp[exp].interpolate() for exp in exp_name]    # interpolation inside the block
+            for exp, cclm_data in zip(exp_name, cclm_block):
+                for param, obs, name in obs_pairs:
+                    acc_temp[exp, name].add(obs, cclm_data[param])
+            csm_data.stat_cosmo_add(acc_cosmo, clm_name, cclm_block[0], cclm_block[1:],
+                                    exp_name[1:])
+            del frames, cclm_exp, cclm_block
+        
+        df_stat_temp  = pd.concat([isd.stat_frame(acc_temp[exp, name], f'{exp}_{name}')
+                                   for param, obs, name in obs_pairs for exp in exp_name], axis = 0)
+        df_stat_cosmo = csm_data.stat_cosmo_frame(acc_cosmo, clm_name, exp_name[1:])
+    else:
+        cclm_exp  = csm_data.get_timeseries_exp([df_cclm_ref, df_cclm_v35, df_cclm_v45, df_cclm_v45e],
+                                                exp_name, clm_name, period, time_step)
+    
+        # Get COSMO data (interpolation of gaps)
+        cclm_data = {exp: cclm_exp[exp].interpolate() for exp in exp_name}
+    
+        # Statistic for COSMO experiments according to in-situ, reanalysis and satellite data
+        df_stat_temp = pd.concat([isd.stat_tepm(cclm_data[exp][param], obs, f'{exp}_{name}')
+                                  for param, obs, name in obs_pairs for exp in exp_name], axis = 0)
+
+        # Statistical analysis accrding to COSMO data (all experiments at once)
+        df_stat_cosmo = csm_data.stat_cosmo_exp(clm_name, cclm_data[exp_name[0]],
+                                                [cclm_data[exp] for exp in exp_name[1:]],
+                                                exp_name[1:])
 
     df_stat_temp.to_excel(data_exit + 'temp_stat.xlsx', float_format='%.3f')    
     
     
-    # Statistical analysis accrding to COSMO data    
-    df_cosmo_stat_v35  = csm_data.stat_cosmo(clm_name, cclm_ref, cclm_v35 )
-    df_cosmo_stat_v45  = csm_data.stat_cosmo(clm_name, cclm_ref, cclm_v45 )
-    df_cosmo_stat_v45e = csm_data.stat_cosmo(clm_name, cclm_ref, cclm_v45e)
-    
-    df_stat_cosmo = pd.concat([df_cosmo_stat_v35, df_cosmo_stat_v45, df_cosmo_stat_v45e], axis = 0)
+    # Save statistical analysis accrding to COSMO data
     df_stat_cosmo.to_excel(data_exit + 'COSMO_stat.xlsx', float_format='%.3f')
     
 #------------------------------------------------------------------------------
@@ -891,35 +943,26 @@ elif mode == 9:                                                                #
     #--------------------------------------------------------------------------
     periods_hour = []
     periods_days = [] 
-    periods_cosmo = []
     
     for time_index in range(len(time_start)):
-        hourly_period = pd.date_range(time_start[time_index],
-                                      time_stop[time_index], freq = 'H')       # hourly timesteps
-        
-        daily_period  = pd.date_range(time_start[time_index],
-                                      time_stop[time_index], freq = 'D')       # dayly timesteps 
-        
-        # General time period for COSMO, FLUXNET and EURONET data
-        res_period    = [x for x in hourly_period if x.hour >= t_start and x.hour <= t_stop]
+        hourly_period = twin.Period(time_start[time_index],
+                                    time_stop[time_index], 'H')                # hourly timesteps
              
         periods_hour.append(hourly_period)
-        periods_days.append(daily_period)
-        periods_cosmo.append(res_period)    
+        periods_days.append(hourly_period.days())
     
     time_step     = 'D' 
 
-    # Get COSMO data for full dayvalues
-    cclm_ref  = csm_data.data4month(df_cclm_ref , clm_name, periods_hour, time_step) 
-    cclm_v35  = csm_data.data4month(df_cclm_v35 , clm_name, periods_hour, time_step) 
-    cclm_v45  = csm_data.data4month(df_cclm_v45 , clm_name, periods_hour, time_step) 
-    cclm_v45e = csm_data.data4month(df_cclm_v45e, clm_name, periods_hour, time_step) 
-
-    # Get COSMO RSTOM data only from 6:00 to 18:00
-    cclm_ref_rstom  = csm_data.data4month(df_cclm_ref , clm_name, periods_cosmo, time_step) 
-    cclm_v35_rstom  = csm_data.data4month(df_cclm_v35 , clm_name, periods_cosmo, time_step) 
-    cclm_v45_rstom  = csm_data.data4month(df_cclm_v45 , clm_name, periods_cosmo, time_step) 
-    cclm_v45e_rstom = csm_data.data4month(df_cclm_v45e, clm_name, periods_cosmo, time_step)    
+    # Get COSMO data for full dayvalues and COSMO RSTOM data only from 6:00 to
+    # 18:00 (one pass over the data of experiment)
+    hours = {'day': None, 'rstom': range(t_start, t_stop + 1)}
+    cosmo = []
+    for df in (df_cclm_ref, df_cclm_v35, df_cclm_v45, df_cclm_v45e):
+        agg = csm_data.cosmo_aggregate(df, clm_name, periods_hour, [time_step], hours)
+        cosmo.append([agg[time_step, name].values().droplevel('window').reset_index()
+                      for name in hours])
+    (cclm_ref , cclm_ref_rstom ), (cclm_v35 , cclm_v35_rstom ) = cosmo[0], cosmo[1]
+    (cclm_v45 , cclm_v45_rstom ), (cclm_v45e, cclm_v45e_rstom) = cosmo[2], cosmo[3]
     
     # Get Hyras data
     t2m   = flnt.data4month(df_hyras['T_2M'] , 'HYRAS', time_start, time_stop, time_step)  
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+The station_set is the program for work with FLUXNET and EURONET data of all
+available stations (DE-*) at once.
+
+The stations are found by the folders of data (FLUXNET - FLX_DE-{station},
+EURONET - {station} with EFDC_L2_Flx_DE{station}_{year}.txt files), the data
+of stations are loaded by several threads (see fluxnet_data) and are joined
+in one array (station x time x variable) on the common hourly axis (see
+time_axis). So the statistics of all stations can be calculated by the
+operations with arrays instead of the runs of script for each station.
+
+The progam contains several subroutines:
+    fluxnet_files    ---> The subroutine needs for getting the FLUXNET
+                          FULLSET files of all stations
+    euronet_files    ---> The subroutine needs for getting the years of
+                          EURONET files of all stations
+    StationSet       ---> The class with data of several stations (station x
+                          time x variable) and information about stations
+    build_set        ---> The subroutine needs for getting the object
+                          StationSet from the dataframes of stations
+    fluxnet_stations ---> The subroutine needs for getting FLUXNET data of
+                          all stations
+    euronet_stations ---> The subroutine needs for getting EURONET data of
+                          all stations
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Center for Enviromental System
+                                                   Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+# Import standart liblaries
+import os
+import re
+import glob
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+# Import personal libraries
+import data_types as dtp
+import fluxnet_data as flnt
+import time_axis as tax
+
+
+# Information about stations: station ---> (name, latitude, longitude), the
+# other stations have the name of station and nan coordinates
+STATION_INFO = {'RuR': ('Rollesbroich'     , 50.6219, 6.3041),
+                'RuS': ('Selhausen Juelich', 50.8659, 6.4471),
+                'SeH': ('Selhausen'        , 50.8706, 6.4497)}
+
+# Names of FLUXNET FULLSET files and EURONET files
+FLUXNET_FILE = re.compile(r'FLX_DE-(\w+)_FLUXNET2015_FULLSET_HH_(\d{4})-(\d{4})_[\w-]+\.csv$')
+EURONET_FILE = re.compile(r'EFDC_L2_Flx_DE(\w+)_(\d{4})\.txt$')
+
+
+#------------------------------------------------------------------------------
+# Subroutine: fluxnet_files
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the FLUXNET FULLSET files (half-hourly
+# data) of all stations in the folders FLX_DE-{station}
+#
+# Input parameters : fluxnet_path - path for FLUXNET data
+#
+# Output parameters: files - dictionary: station ---> (folder, name of file)
+#------------------------------------------------------------------------------
+def fluxnet_files(fluxnet_path):
+    files = {}
+    for path in sorted(glob.glob(os.path.join(fluxnet_path, 'FLX_DE-*', '*.csv'))):
+        folder, f_name = os.path.split(path)
+        match = FLUXNET_FILE.match(f_name)
+        if match is None or os.path.basename(folder) != f'FLX_DE-{match.group(1)}':
+            continue
+        files[match.group(1)] = (folder + '/', f_name)                         # the last version of file
+    return files
+# end def fluxnet_files
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: euronet_files
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the years of EURONET files of all stations
+# in the folders {station}
+#
+# Input parameters : euronet_path - path for EURONET data
+#
+# Output parameters: files - dictionary: station ---> list with years
+#------------------------------------------------------------------------------
+def euronet_files(euronet_path):
+    files = {}
+    for path in sorted(glob.glob(os.path.join(euronet_path, '*', 'EFDC_L2_Flx_DE*.txt'))):
+        folder, f_name = os.path.split(path)
+        match = EURONET_FILE.match(f_name)
+        if match is None or os.path.basename(folder) != match.group(1):
+            continue
+        files.setdefault(match.group(1), []).append(match.group(2))
+    return files
+# end def euronet_files
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Class: StationSet
+#------------------------------------------------------------------------------
+# The class with data of several stations on the common time axis. The values
+# are the array (station x time x variable), the missed values are nan.
+#
+# Input parameters : values   - array with data (station x time x variable)
+#                    index    - time index
+#                    stations - names of stations
+#                    columns  - names of variables
+#                    meta     - dataframe with information about stations
+#                               (name, lat, lon, start, stop)
+#------------------------------------------------------------------------------
+class StationSet(object):
+
+    def __init__(self, values, index, stations, columns, meta):
+        self.values   = values
+        self.index    = index
+        self.stations = list(stations)
+        self.columns  = list(columns)
+        self.meta     = meta
+
+    # Data of station (time x variable)
+    def frame(self, station):
+        i = self.stations.index(station)
+        return pd.DataFrame(self.values[i], index = self.index, columns = self.columns)
+
+    # Data of variable (time x station)
+    def param(self, name):
+        j = self.columns.index(name)
+        return pd.DataFrame(self.values[:, :, j].T, index = self.index, columns = self.stations)
+
+    # Data of all stations for the time period (slice of array)
+    def select(self, start, stop):
+        i_1 = self.index.searchsorted(pd.Timestamp(start), side = 'left')
+        i_2 = self.index.searchsorted(pd.Timestamp(stop) , side = 'right')
+        return StationSet(self.values[:, i_1:i_2], self.index[i_1:i_2], self.stations,
+                          self.columns, self.meta)
+# end class StationSet
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: build_set
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the object StationSet from the dataframes
+# of stations. The dataframes are mapped on the common hourly axis (the gaps
+# are filled by nan), so the data are placed in the array by the integer
+# offsets (see time_axis.get_offset). The period of station is defined by the
+# first and the last timesteps with data.
+#
+# Input parameters : frames  - dictionary: station ---> dataframe
+#                    sources - dictionary: station ---> source of data
+#
+# Output parameters: data - the object StationSet
+#------------------------------------------------------------------------------
+def build_set(frames, sources):
+    frames   = {st: tax.to_axis(frames[st], 'H') for st in frames}
+    stations = [st for st in frames if len(frames[st]) > 0]
+    columns  = []
+    for st in stations:
+        columns += [col for col in frames[st].columns if col not in columns]
+
+    # Common time index of all stations
+    axis = tax.get_axis('H')
+    if len(stations) > 0:
+        first = min(int(axis.steps(frames[st].index[:1])[0])  for st in stations)
+        last  = max(int(axis.steps(frames[st].index[-1:])[0]) for st in stations)
+        index = axis.get_index(first, last)
+        dtype = np.result_type(*[frames[st][col].dtype for st in stations
+                                 for col in frames[st].columns], dtp.COMPACT_DTYPE)
+    else:
+        index = pd.DatetimeIndex([])
+        dtype = dtp.ACCUM_DTYPE
+
+    values = np.full((len(stations), len(index), len(columns)), np.nan, dtype = dtype)
+    info   = []
+    for i, st in enumerate(stations):
+        df     = frames[st]
+        offset = tax.get_offset(index, df.index)
+        for col in df.columns:
+            values[i, offset:offset + len(df), columns.index(col)] = df[col].values
+        valid = df.notna().any(axis = 1).values
+        times = df.index[valid]
+        name, lat, lon = STATION_INFO.get(st, (st, np.nan, np.nan))
+        info.append({'station': st,
+                     'name'   : name,
+                     'lat'    : lat,
+                     'lon'    : lon,
+                     'start'  : times[0]  if len(times) > 0 else pd.NaT,
+                     'stop'   : times[-1] if len(times) > 0 else pd.NaT,
+                     'source' : sources[st]})
+    meta = pd.DataFrame(info, columns = ['station', 'name', 'lat', 'lon', 'start',
+                                         'stop', 'source']).set_index('station')
+
+    data = StationSet(values, index, stations, columns, meta)
+    return data
+# end def build_set
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: fluxnet_stations
+#------------------------------------------------------------------------------
+# The subroutine needs for getting FLUXNET data of all stations (the stations
+# are loaded by several threads)
+#
+# Input parameters : fluxnet_path - path for FLUXNET data
+#                    stations     - list with stations (None - all stations)
+#                    compact      - use the compact mode (float32)
+#                    cache        - use the binary cache (see fluxnet_read)
+#                    workers      - number of threads
+#
+# Output parameters: data - the object StationSet
+#------------------------------------------------------------------------------
+def fluxnet_stations(fluxnet_path, stations = None, compact = False, cache = True,
+                     workers = 4):
+    files = fluxnet_files(fluxnet_path)
+    if stations is not None:
+        files = {st: files[st] for st in stations if st in files}
+
+    def reader(st):
+        folder, f_name = files[st]
+        return flnt.fluxnet_hourly(folder, f_name, compact, cache)
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers = workers) as executor:
+            frames = list(executor.map(reader, files))
+    else:
+        frames = [reader(st) for st in files]
+
+    sources = {st: files[st][0] + files[st][1] for st in files}
+    data    = build_set(dict(zip(files, frames)), sources)
+    return data
+# end def fluxnet_stations
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: euronet_stations
+#------------------------------------------------------------------------------
+# The subroutine needs for getting EURONET data of all stations (the stations
+# are loaded by several threads, the yearly files of each station are read
+# one by one)
+#
+# Input parameters : euronet_path - path for EURONET data
+#                    stations     - list with stations (None - all stations)
+#                    compact      - use the compact mode (float32)
+#                    cache        - use the binary cache (see euronet_year)
+#                    workers      - number of threads
+#
+# Output parameters: data - the object StationSet
+#------------------------------------------------------------------------------
+def euronet_stations(euronet_path, stations = None, compact = False, cache = True,
+                     workers = 4):
+    files = euronet_files(euronet_path)
+    if stations is not None:
+        files = {st: files[st] for st in stations if st in files}
+
+    def reader(st):
+        return flnt.euronet_data(euronet_path, st, compact, cache, workers = 1,
+                                 year_list = files[st])
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers = workers) as executor:
+            frames = list(executor.map(reader, files))
+    else:
+        frames = [reader(st) for st in files]
+
+    sources = {st: f'{euronet_path}{st}/ ({files[st][0]}-{files[st][-1]})' for st in files}
+    data    = build_set(dict(zip(files, frames)), sources)
+    return data
+# end def euronet_stations
+#------------------------------------------------------------------------------
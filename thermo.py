@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+The thermo is the program for calculation of humidity parameters (vapour
+pressure, specific and relative humidity) of the observations (FLUXNET).
+
+All subroutines work with the whole arrays (timeseries, dataframes) at once,
+the pressures are calculated in Pa. The FLUXNET data have the pressure PA in
+kPa and the vapour pressure deficit VPD in hPa, the units are converted by
+to_pa and from_pa.
+
+The progam contains several subroutines:
+    to_pa         ---> The subroutine needs for converting of pressure to Pa
+    from_pa       ---> The subroutine needs for converting of pressure from Pa
+    sat_vap_pres  ---> The subroutine needs for getting the saturation vapour
+                       pressure (Magnus formula)
+    vap_pres_vpd  ---> The subroutine needs for getting the vapour pressure
+                       from the vapour pressure deficit and air temperature
+    vap_pres_rh   ---> The subroutine needs for getting the vapour pressure
+                       from the relative humidity and air temperature
+    vap_pres_qv   ---> The subroutine needs for getting the vapour pressure
+                       from the specific humidity and air pressure
+    spec_hum      ---> The subroutine needs for getting the specific humidity
+                       from the vapour pressure and air pressure
+    rel_hum       ---> The subroutine needs for getting the relative humidity
+                       from the vapour pressure and air temperature
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Center for Enviromental System
+                                                   Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+# Import standart liblaries
+import numpy as np
+
+
+# Units of pressure (number of Pa in unit)
+PRES_UNITS = {'Pa': 1.0, 'hPa': 100.0, 'kPa': 1000.0}
+
+# Ratio of the gas constants of dry air and water vapour (Rd / Rv)
+EPS = 0.622
+
+# Parameters of the Magnus formula over water (Alduchov and Eskridge, 1996)
+MAGNUS_E0 = 610.94                                                             # Pa
+MAGNUS_A  = 17.625
+MAGNUS_B  = 243.04                                                             # C
+
+
+#------------------------------------------------------------------------------
+# Subroutine: to_pa, from_pa
+#------------------------------------------------------------------------------
+# The subroutines need for converting of pressure to Pa and from Pa
+#
+# Input parameters : pres - pressure (array, timeseries or dataframe)
+#                    unit - unit of pressure ('Pa', 'hPa', 'kPa')
+#
+# Output parameters: pres - pressure in Pa (to_pa) or in unit (from_pa)
+#------------------------------------------------------------------------------
+def to_pa(pres, unit = 'Pa'):
+    return pres * PRES_UNITS[unit]
+
+
+def from_pa(pres, unit = 'Pa'):
+    return pres / PRES_UNITS[unit]
+# end def to_pa, from_pa
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: sat_vap_pres
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the saturation vapour pressure over water
+# (Magnus formula)
+#
+# Input parameters : t2m - air temperature, C
+#
+# Output parameters: e_s - saturation vapour pressure, Pa
+#------------------------------------------------------------------------------
+def sat_vap_pres(t2m):
+    e_s = MAGNUS_E0 * np.exp(MAGNUS_A * t2m / (t2m + MAGNUS_B))
+    return e_s
+# end def sat_vap_pres
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: vap_pres_vpd
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the vapour pressure from the vapour
+# pressure deficit and air temperature (e = e_s - VPD), the negative values
+# (VPD is larger than e_s) are replaced by 0
+#
+# Input parameters : t2m  - air temperature, C
+#                    vpd  - vapour pressure deficit
+#                    unit - unit of vapour pressure deficit (FLUXNET - 'hPa')
+#
+# Output parameters: e - vapour pressure, Pa
+#------------------------------------------------------------------------------
+def vap_pres_vpd(t2m, vpd, unit = 'hPa'):
+    e = np.maximum(sat_vap_pres(t2m) - to_pa(vpd, unit), 0.0)
+    return e
+# end def vap_pres_vpd
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: vap_pres_rh
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the vapour pressure from the relative
+# humidity and air temperature
+#
+# Input parameters : t2m - air temperature, C
+#                    rh  - relative humidity, %
+#
+# Output parameters: e - vapour pressure, Pa
+#------------------------------------------------------------------------------
+def vap_pres_rh(t2m, rh):
+    e = 0.01 * rh * sat_vap_pres(t2m)
+    return e
+# end def vap_pres_rh
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: vap_pres_qv
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the vapour pressure from the specific
+# humidity and air pressure
+#
+# Input parameters : qv   - specific humidity, kg kg-1
+#                    pres - air pressure
+#                    unit - unit of air pressure ('Pa', 'hPa', 'kPa')
+#
+# Output parameters: e - vapour pressure, Pa
+#------------------------------------------------------------------------------
+def vap_pres_qv(qv, pres, unit = 'Pa'):
+    e = qv * to_pa(pres, unit) / (EPS + (1.0 - EPS) * qv)
+    return e
+# end def vap_pres_qv
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: spec_hum
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the specific humidity from the vapour
+# pressure and air pressure
+#
+# Input parameters : e    - vapour pressure, Pa
+#                    pres - air pressure
+#                    unit - unit of air pressure ('Pa', 'hPa', 'kPa')
+#
+# Output parameters: qv - specific humidity, kg kg-1
+#------------------------------------------------------------------------------
+def spec_hum(e, pres, unit = 'Pa'):
+    qv = EPS * e / (to_pa(pres, unit) - (1.0 - EPS) * e)
+    return qv
+# end def spec_hum
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: rel_hum
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the relative humidity from the vapour
+# pressure and air temperature
+#
+# Input parameters : e   - vapour pressure, Pa
+#                    t2m - air temperature, C
+#
+# Output parameters: rh - relative humidity, %
+#------------------------------------------------------------------------------
+def rel_hum(e, t2m):
+    rh = 100.0 * e / sat_vap_pres(t2m)
+    return rh
+# end def rel_hum
+#------------------------------------------------------------------------------
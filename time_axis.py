@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+The time_axis is the program for work with the common time axis of all
+datasets of the project.
+
+The time of all datasets is counted in the integer steps (hours or days) from
+the epoch (1970-01-01). The loaders map the data on the common axis (one for
+hourly data - COSMO, FLUXNET, EURONET and one for daily data - HYRAS, E-OBS,
+GLEAM), so the data of all datasets have the regular time index (the gaps are
+filled by nan) and the indexes of all frames are the parts (views) of one
+time index. The selection and the alignment of data are the integer offsets
+and the slices of arrays instead of joins of the time labels.
+
+The progam contains several subroutines:
+    epoch_steps ---> The subroutine needs for getting the numbers of steps
+                     from the epoch for timesteps
+    TimeAxis    ---> The class with the common time axis (unit of step,
+                     shift of steps in the day, time index)
+    get_axis    ---> The subroutine needs for getting the common time axis
+                     for the unit of step
+    to_axis     ---> The subroutine needs for mapping of data on the common
+                     time axis (loaders)
+    get_offset  ---> The subroutine needs for getting the integer offsets
+                     of two regular time indexes
+    align       ---> The subroutine needs for getting the common timesteps
+                     of two timeseries (dataframes)
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Center for Enviromental System
+                                                   Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+# Import standart liblaries
+import threading
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Tick
+
+
+# Units of the common time axes (length of step in nanoseconds)
+AXIS_UNITS = {'H': 3600 * 10**9, 'D': 24 * 3600 * 10**9}
+
+# The common time axes: (unit, shift of steps) ---> TimeAxis
+AXES = {}
+AXES_LOCK = threading.Lock()
+
+
+#------------------------------------------------------------------------------
+# Subroutine: epoch_steps
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the numbers of steps from the epoch
+# (1970-01-01) for timesteps. The timesteps have to be the steps of axis.
+#
+# Input parameters : index - time index of data
+#                    unit  - unit of step ('H' - hours, 'D' - days)
+#                    shift - shift of steps from the epoch in nanoseconds
+#                            (for example, daily data at 12:00)
+#
+# Output parameters: steps - numbers of steps (int64)
+#------------------------------------------------------------------------------
+def epoch_steps(index, unit = 'H', shift = 0):
+    step  = AXIS_UNITS[unit]
+    time  = pd.DatetimeIndex(index).asi8 - shift
+    steps = time // step
+    if np.any(time - steps * step != 0):
+        raise ValueError(f'Timesteps are not the steps of the axis: {unit}')
+    return steps
+# end def epoch_steps
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Class: TimeAxis
+#------------------------------------------------------------------------------
+# The class with the common time axis. The axis contains the time index from
+# the first to the last step of all mapped data, the indexes of data are the
+# slices (views) of this index. The axis can be extended by several threads
+# (loaders of stations), the changes are protected by the lock.
+#
+# Input parameters : unit  - unit of step ('H' - hours, 'D' - days)
+#                    shift - shift of steps from the epoch in nanoseconds
+#------------------------------------------------------------------------------
+class TimeAxis(object):
+
+    def __init__(self, unit = 'H', shift = 0):
+        self.unit  = unit
+        self.step  = AXIS_UNITS[unit]
+        self.shift = shift
+        self.first = 0
+        self.index = pd.DatetimeIndex([])
+        self.lock  = threading.RLock()
+
+    # Number of the last step of axis
+    @property
+    def last(self):
+        return self.first + len(self.index) - 1
+
+    # Numbers of steps from the epoch for timesteps
+    def steps(self, index):
+        return epoch_steps(index, self.unit, self.shift)
+
+    # Offset of the date from the first step of axis
+    def offset(self, time):
+        return int(self.steps([pd.Timestamp(time)])[0] - self.first)
+
+    # Extend the axis for the steps (the old indexes are not changed)
+    def extend(self, first, last):
+        with self.lock:
+            if len(self.index) > 0:
+                if first >= self.first and last <= self.last:
+                    return
+                first = min(first, self.first)
+                last  = max(last , self.last)
+            time = np.arange(first, last + 1, dtype = np.int64) * self.step + self.shift
+            self.index = pd.DatetimeIndex(time, freq = to_offset(self.unit))
+            self.first = first
+
+    # Time index for the steps (the slice of axis)
+    def get_index(self, first, last, name = None):
+        with self.lock:
+            self.extend(first, last)
+            index = self.index[first - self.first:last - self.first + 1]
+        if name is not None:
+            index = index.rename(name)
+        return index
+# end class TimeAxis
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_axis
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the common time axis (one axis for the
+# unit of step and the shift of steps)
+#
+# Input parameters : unit  - unit of step ('H' - hours, 'D' - days)
+#                    shift - shift of steps from the epoch in nanoseconds
+#
+# Output parameters: axis - object TimeAxis
+#------------------------------------------------------------------------------
+def get_axis(unit = 'H', shift = 0):
+    key = (unit, shift)
+    with AXES_LOCK:
+        if key not in AXES:
+            AXES[key] = TimeAxis(unit, shift)
+        return AXES[key]
+# end def get_axis
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: to_axis
+#------------------------------------------------------------------------------
+# The subroutine needs for mapping of data on the common time axis. The
+# values are placed by the integer positions of steps, the missed steps are
+# filled by nan, the duplicated timesteps are deleted (the first values are
+# used). The shift of steps is taken from the first timestep (daily data).
+#
+# Input parameters : data - timeseries or dataframe with time index
+#                    unit - unit of step ('H' - hours, 'D' - days)
+#                    fill - fill the gaps and delete the duplicates (True or
+#                           False), if False only the regular data are mapped
+#                           and the other data are returned without changes
+#
+# Output parameters: data - timeseries or dataframe with the index of axis
+#------------------------------------------------------------------------------
+def to_axis(data, unit = 'H', fill = True):
+    if len(data) == 0:
+        return data
+    time  = pd.DatetimeIndex(data.index).asi8
+    shift = int(time[0] % AXIS_UNITS[unit])
+    axis  = get_axis(unit, shift)
+    steps = axis.steps(data.index)
+    first = int(steps.min())
+    last  = int(steps.max())
+    index = axis.get_index(first, last, data.index.name)
+
+    # Data are regular ---> only the new index
+    if len(steps) == len(index) and np.all(np.diff(steps) == 1):
+        return data.set_axis(index, axis = 0)
+    if fill == False:
+        return data
+
+    # Data with gaps or duplicates ---> values by positions
+    rows = steps - first
+    keep = ~pd.Index(rows).duplicated()
+    rows = rows[keep]
+    if isinstance(data, pd.Series):
+        dtype  = np.result_type(data.dtype, np.float32)
+        values = np.full(len(index), np.nan, dtype = dtype)
+        values[rows] = data.values[keep]
+        return pd.Series(values, index = index, name = data.name)
+    columns = {}
+    for col in data.columns:
+        dtype  = np.result_type(data[col].dtype, np.float32)
+        values = np.full(len(index), np.nan, dtype = dtype)
+        values[rows] = data[col].values[keep]
+        columns[col] = values
+    return pd.DataFrame(columns, index = index, columns = data.columns)
+# end def to_axis
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_offset
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the integer offset of the second time
+# index from the first time index (both indexes are regular with the same
+# step, for example, the data on the common axis or the resampled data)
+#
+# Input parameters : index_1 - the first time index
+#                    index_2 - the second time index
+#
+# Output parameters: offset - number of steps between the first timesteps
+#                             (None - the indexes are not on the same axis)
+#------------------------------------------------------------------------------
+def get_offset(index_1, index_2):
+    if not isinstance(index_1, pd.DatetimeIndex) or not isinstance(index_2, pd.DatetimeIndex):
+        return None
+    if index_1.freq is None or index_1.freq != index_2.freq:
+        return None
+    if not isinstance(index_1.freq, Tick) or len(index_1) == 0 or len(index_2) == 0:
+        return None
+    step  = index_1.freq.nanos
+    delta = index_2.asi8[0] - index_1.asi8[0]
+    if delta % step != 0:
+        return None
+    return int(delta // step)
+# end def get_offset
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: align
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the common timesteps of two timeseries
+# (dataframes). For the regular data with the same step the common part is
+# defined by the integer offset (slices of data), in other cases by the join
+# of time labels.
+#
+# Input parameters : data_1 - the first timeseries (dataframe)
+#                    data_2 - the second timeseries (dataframe)
+#
+# Output parameters: data_1, data_2 - the data for the common timesteps
+#------------------------------------------------------------------------------
+def align(data_1, data_2):
+    offset = get_offset(data_1.index, data_2.index)
+    if offset is None:
+        return data_1.align(data_2, join = 'inner', axis = 0)
+
+    # Positions of the common part in data_1 and data_2
+    start_1 = max(offset, 0)
+    start_2 = max(-offset, 0)
+    length  = max(min(len(data_1) - start_1, len(data_2) - start_2), 0)
+    data_1  = data_1.iloc[start_1:start_1 + length]
+    data_2  = data_2.iloc[start_2:start_2 + length]
+    return data_1, data_2.set_axis(data_1.index, axis = 0)
+# end def align
+#------------------------------------------------------------------------------
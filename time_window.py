@@ -0,0 +1,725 @@
+# -*- coding: utf-8 -*-
+"""
+The time_window is the program for work with several time windows at once
+(for example, the same month in several years).
+
+Each timestep of data is labeled by the number of its time window in one
+vectorized step (searchsorted), after that the data of all windows are
+resampled by one groupby (window, time of resampling). The result is the
+same as the resampling of each window separately and the concatenation of
+the results.
+
+The progam contains several subroutines:
+    get_windows     ---> The subroutine needs for getting numbers of time
+                         windows (start, stop) for timesteps
+    period_windows  ---> The subroutine needs for getting numbers of time
+                         periods (lists of timesteps) for timesteps
+    get_labels      ---> The subroutine needs for getting labels of
+                         resampling for timesteps
+    window_resample ---> The subroutine needs for resampling of data for
+                         all time windows at once
+    get_steps       ---> The subroutine needs for getting all steps of
+                         resampling in time windows
+    window_cycle    ---> The subroutine needs for getting the mean values by
+                         days of month or by hours of day for all time
+                         windows at once (daily and diurnal cycles)
+    WindowIndex     ---> The class with cumulative sums of data for mean
+                         values, sums and resampling of any time window
+    Period          ---> The class with the time period (start, stop, step
+                         and hours of day) without the list of timesteps
+    get_index       ---> The subroutine needs for getting timesteps of the
+                         time period
+    get_rows        ---> The subroutine needs for getting positions of the
+                         time period in data
+    get_limits      ---> The subroutine needs for getting the first and the
+                         last dates of the time window
+    Aggregate       ---> The class with sums and numbers of values for the
+                         step of resampling
+    aggregate       ---> The subroutine needs for resampling of data to the
+                         several steps and hours of day in one pass
+    StepAccumulator ---> The class with sums and numbers of values which are
+                         accumulated by parts of data (reading by blocks)
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Center for Enviromental System
+                                                   Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+# Import standart liblaries
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Tick
+
+# Import personal libraries
+import data_types as dtp
+
+
+# Length of hour and day in nanoseconds
+HOUR_NS = 3600 * 10**9
+DAY_NS  = 24 * HOUR_NS
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_windows
+#------------------------------------------------------------------------------
+# The subroutine needs for getting numbers of time windows for timesteps. The
+# windows must not overlap, the borders of windows are included.
+#
+# Input parameters : index - time index of data
+#                    t_1   - the first dates of time windows
+#                    t_2   - the last dates of time windows
+#                    hours - hours of day for analysis (None - all hours)
+#
+# Output parameters: ids - numbers of windows (-1 for timesteps out of windows)
+#------------------------------------------------------------------------------
+def get_windows(index, t_1, t_2, hours = None):
+    index = pd.DatetimeIndex(index)
+    time  = index.asi8
+    start = pd.DatetimeIndex(pd.to_datetime(t_1)).asi8
+    stop  = pd.DatetimeIndex(pd.to_datetime(t_2)).asi8
+    if len(start) != len(stop):
+        raise ValueError('The number of the first and the last dates is different')
+
+    if len(start) == 0:
+        return np.full(len(time), -1, dtype = np.int64)
+
+    order = np.argsort(start, kind = 'stable')
+    start = start[order]
+    stop  = stop[order]
+    if np.any(start[1:] <= stop[:-1]):
+        raise ValueError('The time windows are overlapped')
+
+    # The last window which starts before the timestep
+    k   = np.maximum(np.searchsorted(start, time, side = 'right') - 1, 0)
+    ids = np.where((time >= start[k]) & (time <= stop[k]), order[k], -1)
+    if hours is not None:
+        ids[~np.isin(index.hour, hours)] = -1
+    return ids
+# end def get_windows
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: period_windows
+#------------------------------------------------------------------------------
+# The subroutine needs for getting numbers of time periods for timesteps. The
+# periods are the lists of timesteps (DatetimeIndex) or the objects of Period,
+# only timesteps of the periods are selected (for example, the hours from
+# 6:00 to 18:00).
+#
+# Input parameters : index   - time index of data
+#                    periods - list with time periods
+#
+# Output parameters: ids - numbers of periods (-1 for timesteps out of periods)
+#------------------------------------------------------------------------------
+def period_windows(index, periods):
+    index = pd.DatetimeIndex(index)
+    if all(isinstance(p, Period) for p in periods):
+        ids = np.full(len(index), -1, dtype = np.int64)
+        for k, period in enumerate(periods):
+            rows = period.rows(index)
+            if np.any(ids[rows] >= 0):
+                raise ValueError('The time periods are overlapped')
+            ids[rows] = k
+        return ids
+
+    lengths = np.cumsum([len(p) for p in periods])
+    time    = pd.DatetimeIndex(np.concatenate([get_index(p).values
+                                               for p in periods]))
+    if not time.is_unique:
+        raise ValueError('The time periods are overlapped')
+    pos = time.get_indexer(index)
+    ids = np.searchsorted(lengths, pos, side = 'right')
+    ids[pos < 0] = -1
+    return ids
+# end def period_windows
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_labels
+#------------------------------------------------------------------------------
+# The subroutine needs for getting labels of resampling for timesteps. The
+# labels are the same as in pandas resample for each window: the fixed steps
+# ('H', 'D', '5D') start from the first day of window, the month ('M') is
+# labeled by the last day and the month start ('MS') by the first day.
+#
+# Input parameters : index  - time index of data (sorted)
+#                    ids    - numbers of windows for timesteps
+#                    ts     - step for resampling
+#                    origin - the first timestep of data for the fixed steps
+#                             (None - the first timestep of each window)
+#
+# Output parameters: labels - labels of resampling (DatetimeIndex)
+#------------------------------------------------------------------------------
+def get_labels(index, ids, ts, origin = None):
+    index  = pd.DatetimeIndex(index)
+    offset = to_offset(ts)
+    if isinstance(offset, Tick):
+        time   = index.asi8
+        if origin is None:
+            first  = np.full(np.max(ids, initial = 0) + 1, np.iinfo(np.int64).max)
+            np.minimum.at(first, ids, time)
+            origin = first[ids]
+        else:
+            origin = pd.Timestamp(origin).value
+        origin = origin - origin % DAY_NS
+        labels = origin + (time - origin) // offset.nanos * offset.nanos
+        return pd.DatetimeIndex(labels)
+
+    if offset.n != 1:
+        raise ValueError(f'The step {ts} is not supported for time windows')
+    day    = index.normalize()
+    labels = day + offset.base * 0
+    if offset.name.split('-')[0].endswith('S'):
+        labels = labels.where(labels == day, labels - offset.base)
+    return labels
+# end def get_labels
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: window_resample
+#------------------------------------------------------------------------------
+# The subroutine needs for resampling of data for all time windows at once
+# (one groupby by window and label). The steps without data inside of window
+# are kept (NaN for mean values, 0 for sums) like in pandas resample.
+#
+# Input parameters : data - timeseries or dataframe (sorted time index)
+#                    ids  - numbers of windows for timesteps
+#                    ts   - step for resampling
+#                    how  - type of accumulation ('mean', 'sum', 'std')
+#
+# Output parameters: data - resampled data with index (window, time)
+#------------------------------------------------------------------------------
+def window_resample(data, ids, ts, how = 'mean'):
+    rows   = np.flatnonzero(np.asarray(ids) >= 0)
+    data   = data.iloc[rows].astype(dtp.ACCUM_DTYPE, copy = False)
+    ids    = np.asarray(ids)[rows]
+    labels = get_labels(data.index, ids, ts)
+    name   = data.index.name
+
+    data = getattr(data.groupby([ids, labels], sort = True), how)()
+    data.index.names = ['window', name]
+
+    # Steps without data inside of windows
+    full = get_steps(labels, ids, ts, name)
+    if len(full) != len(data):
+        data = data.reindex(full, fill_value = 0.0 if how == 'sum' else np.nan)
+    return data
+# end def window_resample
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_steps
+#------------------------------------------------------------------------------
+# The subroutine needs for getting all steps of resampling from the first to
+# the last label in each window (like in pandas resample)
+#
+# Input parameters : labels - labels of resampling for timesteps
+#                    ids    - numbers of windows for timesteps
+#                    ts     - step for resampling
+#                    name   - name of time index
+#
+# Output parameters: full - index with all steps (window, time)
+#------------------------------------------------------------------------------
+def get_steps(labels, ids, ts, name = None):
+    first = pd.Series(labels).groupby(np.asarray(ids)).agg(['min', 'max'])
+    steps = [pd.date_range(t1, t2, freq = ts) for t1, t2 in zip(first['min'], first['max'])]
+    full  = pd.MultiIndex.from_arrays([np.repeat(first.index.values, [len(step) for step in steps]),
+                                       np.concatenate([step.values for step in steps] + 
+                                                      [np.array([], dtype = 'datetime64[ns]')])],
+                                      names = ['window', name])
+    return full
+# end def get_steps
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: window_cycle
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the mean values by days of month (daily
+# cycle) or by hours of day (diurnal cycle) for all time windows at once. The
+# timesteps of windows are labeled by (year, day) or (year, hour), the mean
+# values and the numbers of values of each year are calculated by one
+# groupby and after that the mean values of years are averaged. The windows
+# without data are skipped (the result is empty if there are no data).
+#
+# Input parameters : data  - timeseries (sorted time index)
+#                    t_1   - the first dates of time windows
+#                    t_2   - the last dates of time windows
+#                    key   - type of cycle ('day' - days of month, 'hour' -
+#                            hours of day)
+#                    hours - hours of day for analysis (None - all hours)
+#
+# Output parameters: cycle - dataframe with mean values (mean), numbers of
+#                            values (count) and numbers of years (years) for
+#                            days or hours
+#------------------------------------------------------------------------------
+def window_cycle(data, t_1, t_2, key = 'day', hours = None):
+    if key not in ('day', 'hour'):
+        raise ValueError(f'The type of cycle {key} is not supported (day or hour)')
+    ids    = get_windows(data.index, t_1, t_2, hours)
+    rows   = np.flatnonzero(ids >= 0)
+    index  = pd.DatetimeIndex(data.index)[rows]
+    values = pd.Series(np.asarray(data.values, dtype = dtp.ACCUM_DTYPE)[rows])
+    if len(rows) == 0:
+        return pd.DataFrame({'mean' : pd.Series([], dtype = dtp.ACCUM_DTYPE),
+                             'count': pd.Series([], dtype = np.int64),
+                             'years': pd.Series([], dtype = np.int64)},
+                            index = pd.Index([], dtype = np.int64, name = 'index'))
+
+    # Mean values and numbers of values for (year, day) or (year, hour)
+    stat  = values.groupby([index.year.values, getattr(index, key).values]).agg(['mean', 'count'])
+    mean  = stat['mean'].unstack(0)
+    cycle = pd.DataFrame({'mean' : mean.mean(axis = 1),
+                          'count': stat['count'].groupby(level = 1).sum(),
+                          'years': mean.notna().sum(axis = 1)})
+    cycle.index.name = 'index'
+    return cycle
+# end def window_cycle
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Class: WindowIndex
+#------------------------------------------------------------------------------
+# The class with cumulative sums and cumulative numbers of values (without
+# missing values) of data. The index is calculated once for the data, after
+# that the sum, the number of values and the mean value for any time window
+# are the differences of two values of the index, the resampling with the
+# regular step is the difference of two gathers.
+#
+# Input parameters : data - timeseries or dataframe (sorted time index)
+#------------------------------------------------------------------------------
+class WindowIndex(object):
+
+    def __init__(self, data):
+        self.series  = isinstance(data, pd.Series)
+        frame        = data.to_frame() if self.series else data
+        self.name    = data.name if self.series else None
+        self.columns = frame.columns
+        self.time    = pd.DatetimeIndex(frame.index)
+        if not self.time.is_monotonic_increasing:
+            raise ValueError('The time index of data is not sorted')
+
+        values = np.asarray(frame.values, dtype = dtp.ACCUM_DTYPE)
+        valid  = ~np.isnan(values)
+        zero   = np.zeros((1, values.shape[1]))
+        self.sums   = np.concatenate([zero, np.cumsum(np.where(valid, values, 0.0), axis = 0)])
+        self.counts = np.concatenate([zero.astype(np.int64), np.cumsum(valid, axis = 0)])
+
+    # Positions of the time windows (the borders are included)
+    def positions(self, t_1, t_2):
+        t_1 = pd.Timestamp(t_1) if np.ndim(t_1) == 0 else pd.DatetimeIndex(t_1)
+        t_2 = pd.Timestamp(t_2) if np.ndim(t_2) == 0 else pd.DatetimeIndex(t_2)
+        i_1 = self.time.searchsorted(t_1, side = 'left')
+        i_2 = self.time.searchsorted(t_2, side = 'right')
+        return i_1, i_2
+
+    # Sums, numbers of values and mean values for the time windows (one row
+    # for each window)
+    def sum(self, t_1, t_2):
+        i_1, i_2 = self.positions(t_1, t_2)
+        return self.sums[i_2] - self.sums[i_1]
+
+    def count(self, t_1, t_2):
+        i_1, i_2 = self.positions(t_1, t_2)
+        return self.counts[i_2] - self.counts[i_1]
+
+    def mean(self, t_1, t_2):
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            mean = self.sum(t_1, t_2) / self.count(t_1, t_2)
+        return mean
+
+    # Resampling with the regular step (the same result as pandas resample
+    # of data in the time window)
+    def resample(self, ts, how = 'mean', t_1 = None, t_2 = None):
+        i_1 = 0 if t_1 is None else self.time.searchsorted(pd.Timestamp(t_1), side = 'left')
+        i_2 = len(self.time) if t_2 is None else \
+              self.time.searchsorted(pd.Timestamp(t_2), side = 'right')
+        if i_2 <= i_1:
+            raise KeyError('No data in the time window')
+
+        # Labels and borders of steps
+        offset = to_offset(ts)
+        edge   = get_labels(self.time[[i_1, i_2 - 1]], np.zeros(2, dtype = np.int64), ts)
+        labels = pd.date_range(edge[0], edge[1], freq = ts)
+        if isinstance(offset, Tick) or offset.name.split('-')[0].endswith('S'):
+            left  = labels
+            right = labels + (offset if isinstance(offset, Tick) else offset.base)
+        else:
+            left  = (labels - offset.base).normalize() + pd.Timedelta(days = 1)
+            right = labels + pd.Timedelta(days = 1)
+        j_1 = np.clip(self.time.searchsorted(left , side = 'left'), i_1, i_2)
+        j_2 = np.clip(self.time.searchsorted(right, side = 'left'), i_1, i_2)
+
+        sums   = self.sums[j_2] - self.sums[j_1]
+        counts = self.counts[j_2] - self.counts[j_1]
+        if how == 'sum':
+            data = sums
+        elif how == 'count':
+            data = counts
+        elif how == 'mean':
+            with np.errstate(invalid = 'ignore', divide = 'ignore'):
+                data = sums / counts
+        else:
+            raise ValueError(f'The type of accumulation {how} is not supported')
+
+        df = pd.DataFrame(data, index = labels.rename(self.time.name),
+                          columns = self.columns)
+        if self.series:
+            df = df.iloc[:, 0].rename(self.name)
+        return df
+# end class WindowIndex
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Class: Period
+#------------------------------------------------------------------------------
+# The class with the time period: the first and the last dates, the step and
+# the hours of day (for example, the hours from 6:00 to 18:00). The timesteps
+# of the period are not created, the period is resolved in data as the slice
+# of positions and the mask calculated from the hours of timesteps.
+#
+# Input parameters : start - the first date of the period
+#                    stop  - the last date of the period
+#                    freq  - the step of the period ('H', 'D')
+#                    hours - hours of day for analysis (None - all hours)
+#------------------------------------------------------------------------------
+class Period(object):
+
+    def __init__(self, start, stop, freq = 'H', hours = None):
+        self.start = pd.Timestamp(start)
+        self.stop  = pd.Timestamp(stop)
+        self.freq  = freq
+        self.step  = to_offset(freq).nanos
+        self.hours = None
+        if hours is not None:
+            self.hours = np.zeros(24, dtype = bool)
+            self.hours[np.asarray(list(hours), dtype = np.int64)] = True
+
+    def __repr__(self):
+        hours = 'all' if self.hours is None else list(np.flatnonzero(self.hours))
+        return f'Period({self.start}, {self.stop}, freq={self.freq}, hours={hours})'
+
+    # Mask of hours of day for timesteps (nanoseconds)
+    def hour_mask(self, time):
+        if self.hours is None:
+            return None
+        return self.hours[(time // HOUR_NS) % 24]
+
+    # Timesteps of the period (nanoseconds)
+    def steps(self):
+        count = max((self.stop.value - self.start.value) // self.step + 1, 0)
+        time  = self.start.value + np.arange(count, dtype = np.int64) * self.step
+        mask = self.hour_mask(time)
+        return time if mask is None else time[mask]
+
+    # Number of timesteps of the period (the hours of day are repeated with
+    # the cycle of steps, the timesteps are not created)
+    def __len__(self):
+        if self.stop < self.start:
+            return 0
+        count = (self.stop.value - self.start.value) // self.step + 1
+        if self.hours is None:
+            return int(count)
+        cycle = min(DAY_NS // np.gcd(self.step, DAY_NS), count)
+        mask  = self.hour_mask(self.start.value + np.arange(cycle, dtype = np.int64) * self.step)
+        full, rest = divmod(count, cycle)
+        return int(full * mask.sum() + mask[:rest].sum())
+
+    # The same period with the daily step (for the daily datasets)
+    def days(self):
+        return Period(self.start, self.stop, 'D')
+
+    # Slice of positions and mask of hours in data (sorted time index)
+    def resolve(self, index):
+        index = pd.DatetimeIndex(index)
+        i_1   = index.searchsorted(self.start, side = 'left')
+        i_2   = index.searchsorted(self.stop , side = 'right')
+        mask  = self.hour_mask(index.asi8[i_1:i_2])
+        return slice(i_1, i_2), mask
+
+    # Positions of the period in data
+    def rows(self, index):
+        rows, mask = self.resolve(index)
+        rows = np.arange(rows.start, rows.stop)
+        return rows if mask is None else rows[mask]
+
+    # Timesteps of the period (DatetimeIndex)
+    def to_index(self):
+        return pd.DatetimeIndex(self.steps())
+
+    # Data of the period
+    def select(self, data):
+        rows, mask = self.resolve(data.index)
+        data = data.iloc[rows]
+        return data if mask is None else data.iloc[np.flatnonzero(mask)]
+# end class Period
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_index
+#------------------------------------------------------------------------------
+# The subroutine needs for getting timesteps of the time period
+#
+# Input parameters : period - time period (Period or list of timesteps)
+#
+# Output parameters: index - timesteps of the period (DatetimeIndex)
+#------------------------------------------------------------------------------
+def get_index(period):
+    if isinstance(period, Period):
+        return period.to_index()
+    return pd.DatetimeIndex(period)
+# end def get_index
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_rows
+#------------------------------------------------------------------------------
+# The subroutine needs for getting positions of the time period in data. All
+# timesteps of the period have to be in data (like the selection by labels).
+#
+# Input parameters : index  - time index of data
+#                    period - time period (Period or list of timesteps)
+#
+# Output parameters: rows - positions of the timesteps in data
+#------------------------------------------------------------------------------
+def get_rows(index, period):
+    index = pd.DatetimeIndex(index)
+    if isinstance(period, Period):
+        rows = period.rows(index)
+        if len(rows) < len(period):
+            raise KeyError(f'{period} is out of the data')
+    else:
+        rows = index.get_indexer(pd.DatetimeIndex(period))
+        if np.any(rows < 0):
+            raise KeyError('Time period is out of the data')
+    return rows
+# end def get_rows
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_limits
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the first and the last dates of the time
+# window, the window can be set by the dates or by the time period
+#
+# Input parameters : start - the first date of the window or Period
+#                    stop  - the last date of the window
+#
+# Output parameters: start, stop - the first and the last dates of the window
+#------------------------------------------------------------------------------
+def get_limits(start, stop = None):
+    if isinstance(start, Period):
+        return start.start, start.stop
+    return start, stop
+# end def get_limits
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Class: Aggregate
+#------------------------------------------------------------------------------
+# The class with sums and numbers of values (without missing values) of data
+# for the step of resampling. The values are the mean values (or the sums)
+# with the scale and the offset from the table of transformation.
+#
+# Input parameters : sums   - dataframe with sums
+#                    counts - dataframe with numbers of values
+#                    table  - table of transformation (None - mean values)
+#                    name   - name of timeseries (None - dataframe)
+#------------------------------------------------------------------------------
+class Aggregate(object):
+
+    def __init__(self, sums, counts, table = None, name = None):
+        self.sum   = sums
+        self.count = counts
+        self.table = table
+        self.name  = name
+
+    # Mean values (NaN for the steps without values)
+    def mean(self):
+        mean = self.sum / self.count.where(self.count > 0)
+        return mean if self.name is None else mean.iloc[:, 0].rename(self.name)
+
+    # Mean values or sums with the scale and the offset
+    def values(self):
+        if self.table is None:
+            return self.mean()
+        mean = self.sum / self.count.where(self.count > 0)
+        data = np.where((self.table['how'] == 'sum').values, self.sum.values, mean.values)
+        data = pd.DataFrame(data * self.table['scale'].values + self.table['offset'].values,
+                            index = self.sum.index, columns = self.sum.columns)
+        return data if self.name is None else data.iloc[:, 0].rename(self.name)
+# end class Aggregate
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: aggregate
+#------------------------------------------------------------------------------
+# The subroutine needs for resampling of data to the several steps (for
+# example, 'H', 'D', '5D', '1M') and the several sets of hours of day (for
+# example, all hours and the hours from 6:00 to 18:00) in one pass. The data
+# are summed once to hourly cells, after that the cells are summed to daily
+# cells for each set of hours and the daily cells are summed to the steps.
+# The sums and the numbers of values are kept for each result.
+#
+# Input parameters : data    - timeseries or dataframe (sorted time index)
+#                    periods - time period (Period) or list with time periods
+#                    freqs   - steps for resampling
+#                    hours   - dictionary with sets of hours of day (None -
+#                              all hours), default {'all': None}
+#                    table   - table of transformation (the limits of values
+#                              are applied before summation), optional
+#
+# Output parameters: result - dictionary with Aggregate for (step, hours),
+#                             the index is time (one period) or (window,
+#                             time) for the list of periods
+#------------------------------------------------------------------------------
+def aggregate(data, periods, freqs, hours = None, table = None):
+    name    = data.name if isinstance(data, pd.Series) else None
+    frame   = data.to_frame() if isinstance(data, pd.Series) else data
+    single  = isinstance(periods, Period)
+    periods = [periods] if single else list(periods)
+    freqs   = [freqs] if isinstance(freqs, str) else list(freqs)
+    hours   = {'all': None} if hours is None else dict(hours)
+    index   = pd.DatetimeIndex(frame.index)
+    if not index.is_monotonic_increasing:
+        raise ValueError('The time index of data is not sorted')
+
+    # Data of the periods
+    ids    = period_windows(index, periods)
+    rows   = np.flatnonzero(ids >= 0)
+    if len(rows) == 0:
+        raise KeyError('No data for the time periods')
+    ids    = ids[rows]
+    values = np.asarray(frame.values[rows], dtype = dtp.ACCUM_DTYPE)
+    if table is not None:
+        values = np.clip(values, table.loc[frame.columns, 'lower'].values,
+                                 table.loc[frame.columns, 'upper'].values)
+    valid  = ~np.isnan(values)
+    values = np.where(valid, values, 0.0)
+
+    # Sums of values by cells (the cells are sorted in time)
+    def cell_sums(key, win, sums, counts):
+        first = np.flatnonzero(np.r_[True, (np.diff(key) != 0) | (np.diff(win) != 0)])
+        return (key[first], win[first], np.add.reduceat(sums, first, axis = 0),
+                np.add.reduceat(counts, first, axis = 0))
+
+    # Hourly cells (one pass over data)
+    hour = cell_sums(index.asi8[rows] // HOUR_NS, ids, values, valid.astype(np.int64))
+
+    result = {}
+    for mask_name, mask_hours in hours.items():
+        select = np.ones(len(hour[0]), dtype = bool) if mask_hours is None else \
+                 np.isin(hour[0] % 24, list(mask_hours))
+        cells  = tuple(x[select] for x in hour)
+        days   = cell_sums(cells[0] // 24, cells[1], cells[2], cells[3]) \
+                 if len(cells[0]) > 0 else cells
+        for freq in freqs:
+            offset = to_offset(freq)
+            if isinstance(offset, Tick) and offset.nanos % DAY_NS != 0:
+                key, win, sums, counts = cells
+                time = key * HOUR_NS
+            else:
+                key, win, sums, counts = days
+                time = key * DAY_NS
+            time   = pd.DatetimeIndex(time)
+            labels = get_labels(time, win, freq)
+            sums   = pd.DataFrame(sums  , columns = frame.columns).groupby([win, labels]).sum()
+            counts = pd.DataFrame(counts, columns = frame.columns).groupby([win, labels]).sum()
+            full   = get_steps(labels, win, freq, index.name)
+            sums   = sums.set_axis(sums.index.set_names(full.names)).reindex(full, fill_value = 0.0)
+            counts = counts.set_axis(counts.index.set_names(full.names)).reindex(full, fill_value = 0)
+            if single == True:
+                sums   = sums.droplevel('window')
+                counts = counts.droplevel('window')
+            result[freq, mask_name] = Aggregate(sums, counts, table, name)
+    return result
+# end def aggregate
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Class: StepAccumulator
+#------------------------------------------------------------------------------
+# The class with sums and numbers of values for the step of resampling which
+# are accumulated by parts of data (for example, by blocks of the file). Only
+# the sums for the steps are kept, so the memory depends on the step and not
+# on the number of timesteps in data. The parts have to be in time order, the
+# result is the same as the resampling of all data.
+#
+# Input parameters : freq  - step for resampling
+#                    table - table of transformation (the limits of values
+#                            are applied before summation), optional
+#                    name  - name of timeseries (None - dataframe)
+#------------------------------------------------------------------------------
+class StepAccumulator(object):
+
+    def __init__(self, freq, table = None, name = None):
+        self.freq   = freq
+        self.table  = table
+        self.name   = name
+        self.origin = None
+        self.parts  = []
+
+    # Add the part of data (timeseries or dataframe)
+    def add(self, data):
+        frame = data.to_frame() if isinstance(data, pd.Series) else data
+        if len(frame) == 0:
+            return
+        index  = pd.DatetimeIndex(frame.index)
+        values = np.asarray(frame.values, dtype = dtp.ACCUM_DTYPE)
+        if self.table is not None:
+            values = np.clip(values, self.table.loc[frame.columns, 'lower'].values,
+                                     self.table.loc[frame.columns, 'upper'].values)
+        if self.origin is None:
+            self.origin = index[0]
+        labels = get_labels(index, np.zeros(len(index), dtype = np.int64), self.freq,
+                            self.origin)
+        valid  = ~np.isnan(values)
+        sums   = pd.DataFrame(np.where(valid, values, 0.0), columns = frame.columns).groupby(labels).sum()
+        counts = pd.DataFrame(valid.astype(np.int64), columns = frame.columns).groupby(labels).sum()
+        self.parts.append((sums, counts))
+        if len(self.parts) > 64:
+            self.parts = [self.merge()]
+
+    # Join the parts (the steps on the borders of parts are summed)
+    def merge(self):
+        sums   = pd.concat([part[0] for part in self.parts])
+        counts = pd.concat([part[1] for part in self.parts])
+        return sums.groupby(level = 0).sum(), counts.groupby(level = 0).sum()
+
+    # Sums and numbers of values for all steps (from the first to the last step)
+    def result(self, index_name = None):
+        if len(self.parts) == 0:
+            raise KeyError('No data for accumulation')
+        sums, counts = self.merge()
+        steps  = pd.date_range(sums.index[0], sums.index[-1], freq = self.freq,
+                               name = index_name)
+        sums   = sums.reindex(steps, fill_value = 0.0)
+        counts = counts.reindex(steps, fill_value = 0)
+        return Aggregate(sums, counts, self.table, self.name)
+# end class StepAccumulator
+#------------------------------------------------------------------------------
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+The year_chunks is the program for work with long records (for example,
+1980-2020) by blocks of years.
+
+The data are loaded, transformed and aggregated for one block of years at
+once, only the accumulators are kept between the blocks, so the memory does
+not depend on the length of record. The accumulators are:
+    time_window.StepAccumulator ---> sums and numbers of values for the steps
+                                     of resampling (mean values)
+    clim_cube.merge_cubes       ---> climatic cubes (annual cycle, daily
+                                     values of month, diurnal cycle)
+    MomentAccumulator           ---> moments of two datasets (mean values,
+                                     standard deviations, MAE, RMSE,
+                                     correlation)
+
+The progam contains several subroutines:
+    get_blocks        ---> The subroutine needs for getting the blocks of
+                           years for the time period
+    block_index       ---> The subroutine needs for getting the timesteps of
+                           the time period in the block
+    MomentAccumulator ---> The class with the moments of two datasets which
+                           are accumulated by blocks
+
+Autors of project: Evgenii Churiulin, Merja Tölle, Center for Enviromental System
+                                                   Research (CESR)
+
+Current Code Owner: CESR, Evgenii Churiulin
+phone:  +49  561 804-6142
+fax:    +49  561 804-6116
+email:  evgenychur@uni-kassel.de
+
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-18 Center for Enviromental System Research (CESR)
+           Initial release
+
+"""
+
+# Import standart liblaries
+import numpy as np
+import pandas as pd
+
+# Import personal libraries
+import data_types as dtp
+import time_axis as tax
+
+
+#------------------------------------------------------------------------------
+# Subroutine: get_blocks
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the blocks of years for the time period.
+# The blocks begin on the 1st of January (except the first block), so the
+# steps of resampling 'D', 'M' and 'A' are not divided between the blocks.
+#
+# Input parameters : start - the first date of the time period
+#                    stop  - the last date of the time period
+#                    years - number of years in one block
+#                    step  - the last timestep of block is the 1st of January
+#                            of the next block minus step
+#
+# Output parameters: blocks - list with the first and the last dates of
+#                             blocks
+#------------------------------------------------------------------------------
+def get_blocks(start, stop, years = 1, step = '1H'):
+    start  = pd.Timestamp(start)
+    stop   = pd.Timestamp(stop)
+    blocks = []
+    t_1    = start
+    while t_1 <= stop:
+        t_next = pd.Timestamp(year = t_1.year + years, month = 1, day = 1)
+        t_2    = min(t_next - pd.Timedelta(step), stop)
+        blocks.append((t_1, t_2))
+        t_1    = t_next
+    return blocks
+# end def get_blocks
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Subroutine: block_index
+#------------------------------------------------------------------------------
+# The subroutine needs for getting the timesteps of the time period in the
+# block
+#
+# Input parameters : period - time period (list of timesteps)
+#                    t_1    - the first date of the block
+#                    t_2    - the last date of the block
+#
+# Output parameters: period - timesteps of the period in the block
+#------------------------------------------------------------------------------
+def block_index(period, t_1, t_2):
+    period = pd.DatetimeIndex(period)
+    i_1    = period.searchsorted(pd.Timestamp(t_1), side = 'left')
+    i_2    = period.searchsorted(pd.Timestamp(t_2), side = 'right')
+    return period[i_1:i_2]
+# end def block_index
+#------------------------------------------------------------------------------
+
+
+#------------------------------------------------------------------------------
+# Class: MomentAccumulator
+#------------------------------------------------------------------------------
+# The class with the moments of two datasets (reference and data) for the
+# timesteps where both values are present. The moments of each block are
+# calculated from the deviations of the mean values of block and are joined
+# with the moments of the previous blocks (the parallel algorithm of Chan),
+# so the result does not depend on the division of data into blocks.
+#
+# The values can be the arrays (time x column) or the timeseries and the
+# dataframes (the common timesteps are defined by time_axis.align), the
+# reference can be one column for all columns of data.
+#------------------------------------------------------------------------------
+class MomentAccumulator(object):
+
+    def __init__(self):
+        self.count = None
+
+    # Add the block of data
+    def add(self, ref, data):
+        if isinstance(ref, (pd.Series, pd.DataFrame)) and isinstance(data, (pd.Series, pd.DataFrame)):
+            ref, data = tax.align(ref, data)
+        ref  = np.asarray(ref , dtype = dtp.ACCUM_DTYPE)
+        data = np.asarray(data, dtype = dtp.ACCUM_DTYPE)
+        ref  = ref.reshape(len(ref), -1)
+        data = data.reshape(len(data), -1)
+        ref, data = np.broadcast_arrays(ref, data)
+        valid = ~np.isnan(ref) & ~np.isnan(data)
+
+        # Moments of block
+        count = valid.sum(axis = 0)
+        size  = np.maximum(count, 1)
+        x     = np.where(valid, ref , 0.0)
+        y     = np.where(valid, data, 0.0)
+        mean_x = x.sum(axis = 0) / size
+        mean_y = y.sum(axis = 0) / size
+        dx    = np.where(valid, ref  - mean_x, 0.0)
+        dy    = np.where(valid, data - mean_y, 0.0)
+        block = {'count' : count,
+                 'mean_x': mean_x,
+                 'mean_y': mean_y,
+                 'm2_x'  : (dx ** 2).sum(axis = 0),
+                 'm2_y'  : (dy ** 2).sum(axis = 0),
+                 'c_xy'  : (dx * dy).sum(axis = 0),
+                 'abs'   : np.abs(y - x).sum(axis = 0),
+                 'sq'    : ((y - x) ** 2).sum(axis = 0),
+                 'max_x' : np.where(valid, ref , -np.inf).max(axis = 0, initial = -np.inf),
+                 'max_y' : np.where(valid, data, -np.inf).max(axis = 0, initial = -np.inf),
+                 'min_x' : np.where(valid, ref ,  np.inf).min(axis = 0, initial =  np.inf),
+                 'min_y' : np.where(valid, data,  np.inf).min(axis = 0, initial =  np.inf)}
+
+        if self.count is None:
+            self.__dict__.update(block)
+            return
+        self.merge(block)
+
+    # Join the moments of block with the moments of the previous blocks
+    def merge(self, block):
+        n_a     = self.count.astype(dtp.ACCUM_DTYPE)
+        n_b     = block['count'].astype(dtp.ACCUM_DTYPE)
+        total   = np.maximum(n_a + n_b, 1.0)
+        delta_x = block['mean_x'] - self.mean_x
+        delta_y = block['mean_y'] - self.mean_y
+        factor  = n_a * n_b / total
+        self.m2_x   = self.m2_x + block['m2_x'] + delta_x ** 2 * factor
+        self.m2_y   = self.m2_y + block['m2_y'] + delta_y ** 2 * factor
+        self.c_xy   = self.c_xy + block['c_xy'] + delta_x * delta_y * factor
+        self.mean_x = self.mean_x + delta_x * n_b / total
+        self.mean_y = self.mean_y + delta_y * n_b / total
+        self.count  = self.count + block['count']
+        self.abs    = self.abs + block['abs']
+        self.sq     = self.sq  + block['sq']
+        self.max_x  = np.maximum(self.max_x, block['max_x'])
+        self.max_y  = np.maximum(self.max_y, block['max_y'])
+        self.min_x  = np.minimum(self.min_x, block['min_x'])
+        self.min_y  = np.minimum(self.min_y, block['min_y'])
+
+    # Statistical parameters (NaN if there are no values): x - reference,
+    # y - data, std with ddof = 1
+    def result(self):
+        if self.count is None:
+            raise KeyError('No data for statistics')
+        empty = self.count == 0
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            stat = {'count' : self.count,
+                    'mean_x': np.where(empty, np.nan, self.mean_x),
+                    'mean_y': np.where(empty, np.nan, self.mean_y),
+                    'max_x' : np.where(empty, np.nan, self.max_x),
+                    'max_y' : np.where(empty, np.nan, self.max_y),
+                    'min_x' : np.where(empty, np.nan, self.min_x),
+                    'min_y' : np.where(empty, np.nan, self.min_y),
+                    'std_x' : np.sqrt(self.m2_x / (self.count - 1)),
+                    'std_y' : np.sqrt(self.m2_y / (self.count - 1)),
+                    'mae'   : self.abs / self.count,
+                    'mse'   : self.sq  / self.count,
+                    'rmse'  : np.sqrt(self.sq / self.count),
+                    'corr'  : self.c_xy / np.sqrt(self.m2_x * self.m2_y)}
+        return stat
+# end class MomentAccumulator
+#------------------------------------------------------------------------------